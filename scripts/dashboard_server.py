@@ -66,6 +66,18 @@ class RunTaskStore:
 RUN_TASKS = RunTaskStore()
 
 
+def _int_param(params: dict[str, list[str]], name: str, default: int, low: int, high: int) -> int | None:
+    """Query parameter clamped to [low, high]; None if it is not an integer."""
+    raw = params.get(name, [""])[0].strip()
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return None
+    return max(low, min(value, high))
+
+
 def _extract_output_dir(stdout: str) -> str:
     for line in stdout.splitlines():
         if line.startswith("Output dir:"):
@@ -106,6 +118,24 @@ def _run_demo_task(task_id: str, config_rel: str) -> None:
         )
 
 
+def _plan_config(config_rel: str) -> ApiResponse:
+    cmd = ["python3", "scripts/run_demo.py", "--config", config_rel, "--plan"]
+    try:
+        proc = subprocess.run(cmd, cwd=str(ROOT), capture_output=True, text=True, check=False)
+    except OSError as exc:
+        return ApiResponse(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)})
+    if proc.returncode != 0:
+        return ApiResponse(
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+            {"error": "Plan failed", "stderr": proc.stderr[-4000:]},
+        )
+    try:
+        plan = json.loads(proc.stdout)
+    except json.JSONDecodeError:
+        return ApiResponse(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Plan output is not JSON"})
+    return ApiResponse(HTTPStatus.OK, {"config_path": config_rel, "plan": plan})
+
+
 class DashboardHandler(SimpleHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(WEB_DIR), **kwargs)
@@ -229,6 +259,16 @@ class DashboardHandler(SimpleHTTPRequestHandler):
                 text = ""
             return ApiResponse(HTTPStatus.OK, {"text": text})
 
+        if parsed.path == "/api/plan":
+            params = parse_qs(parsed.query)
+            path_rel = params.get("config_path", [""])[0]
+            if not path_rel:
+                return ApiResponse(HTTPStatus.BAD_REQUEST, {"error": "config_path is required"})
+            cfg = (ROOT / path_rel).resolve()
+            if not cfg.exists() or not cfg.is_file() or ROOT not in cfg.parents:
+                return ApiResponse(HTTPStatus.BAD_REQUEST, {"error": "Invalid config_path: must be a file under project root"})
+            return _plan_config(str(cfg.relative_to(ROOT)))
+
         if parsed.path == "/api/runs":
             runs = self.list_runs()
             return ApiResponse(HTTPStatus.OK, {"runs": runs})
@@ -331,6 +371,16 @@ class DashboardHandler(SimpleHTTPRequestHandler):
                         payload = {"failed_models": []}
             return ApiResponse(HTTPStatus.OK, payload)
 
+        if parsed.path == "/api/task_timings":
+            params = parse_qs(parsed.query)
+            run_id = params.get("run_id", [""])[0]
+            if not run_id:
+                return ApiResponse(HTTPStatus.BAD_REQUEST, {"error": "run_id is required"})
+            limit = _int_param(params, "limit", default=20, low=1, high=1000)
+            if limit is None:
+                return ApiResponse(HTTPStatus.BAD_REQUEST, {"error": "limit must be an integer"})
+            return ApiResponse(HTTPStatus.OK, self.task_timings(run_id, limit=limit))
+
         if parsed.path == "/api/dataset_profile":
             params = parse_qs(parsed.query)
             run_id = params.get("run_id", [""])[0]
@@ -430,6 +480,27 @@ class DashboardHandler(SimpleHTTPRequestHandler):
             "oldest_run": run_ids[0] if run_ids else "",
         }
 
+    def task_timings(self, run_id: str, limit: int = 20) -> dict:
+        """Slowest tasks first, plus the per-category totals from run_summary.json."""
+        run_dir = OUTPUTS_DIR / run_id
+        summary = self.read_json_safe(run_dir / "run_summary.json", default={})
+        csv_path = run_dir / "task_timings.csv"
+        # Older runs only have the timings inside run_summary.json.
+        rows = self.read_csv(csv_path) if csv_path.exists() else summary.get("task_timings", [])
+
+        def actual_s(row: dict) -> float:
+            try:
+                return float(row.get("actual_s"))
+            except (TypeError, ValueError):
+                return -1.0
+
+        rows = sorted(rows, key=actual_s, reverse=True)
+        return {
+            "rows": rows[:limit],
+            "task_count": len(rows),
+            "by_category": summary.get("task_timings_by_category", {}),
+        }
+
     @staticmethod
     def read_json_safe(path: Path, default: dict | list) -> dict | list:
         if not path.exists():
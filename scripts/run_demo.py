@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import argparse
+import json
 import math
+import os
 import random
 import sys
 from pathlib import Path
@@ -10,8 +12,11 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from src.core.checkpoint import RunCheckpoint
 from src.core.orchestrator import run_experiment
-from src.data.csv_loader import CSVLoadResult, load_scada_nwp_series
+from src.core.planner import build_plan
+from src.data.dataset_cache import DEFAULT_CACHE_DIR
+from src.data.site_loader import load_sites, merge_site_stats, site_sources_from_config
 from src.utils.io import read_yaml
 
 
@@ -37,47 +42,42 @@ def build_demo_dataset(sites: list[str], length: int) -> dict[str, list[float]]:
 def _load_real_dataset(config: dict) -> tuple[dict, dict]:
     exp_cfg = config.get("experiment", {})
     data_cfg = config.get("data", {})
-    scada_csv = data_cfg.get("scada_csv")
-    nwp_csv = data_cfg.get("nwp_csv")
-    if not scada_csv or not nwp_csv:
-        raise ValueError("For real_csv mode, both data.scada_csv and data.nwp_csv are required")
-
-    site_id = str(exp_cfg.get("sites", ["site_real_01"])[0])
-    target_col = str(data_cfg.get("target_col", "Total_Power"))
-    timestamp_col = str(data_cfg.get("timestamp_col", "Timestamp"))
-    max_rows = data_cfg.get("max_rows")
-    max_rows_int = int(max_rows) if max_rows is not None else None
-
-    result: CSVLoadResult = load_scada_nwp_series(
-        scada_csv=scada_csv,
-        nwp_csv=nwp_csv,
-        site_id=site_id,
-        target_col=target_col,
-        timestamp_col=timestamp_col,
-        max_rows=max_rows_int,
-    )
-    feature_cols = data_cfg.get("feature_cols")
-    if feature_cols:
-        wanted = [str(c) for c in feature_cols]
-        filtered_exog = [{k: v for k, v in row.items() if k in wanted} for row in result.exog_rows]
-    else:
-        filtered_exog = result.exog_rows
-
-    stats = dict(result.stats)
-    if filtered_exog and feature_cols:
-        stats["n_exog_features"] = len(filtered_exog[0].keys())
-        stats["feature_cols"] = ",".join(sorted(filtered_exog[0].keys()))
+    cache_dir = str(data_cfg.get("cache_dir", DEFAULT_CACHE_DIR)) if data_cfg.get("cache", True) else None
+    sources = site_sources_from_config(exp_cfg, data_cfg, cache_dir=cache_dir)
+    results = load_sites(sources, workers=int(data_cfg.get("load_workers", os.cpu_count() or 1)))
 
     payload = {
         site_id: {
             "series": result.series,
-            "exog": filtered_exog,
+            "exog": result.exog,
             "timestamps": result.timestamps,
         }
+        for site_id, result in results.items()
     }
+    if len(results) == 1:
+        stats = dict(next(iter(results.values())).stats)
+    else:
+        stats = merge_site_stats(results)
     return payload, stats
 
 
+def _load_dataset(config: dict) -> tuple[dict, dict]:
+    exp_cfg = config.get("experiment", {})
+    data_source = str(exp_cfg.get("data_source", "synthetic"))
+    if data_source == "real_csv":
+        return _load_real_dataset(config)
+
+    sites = list(exp_cfg.get("sites", ["site_a", "site_b"]))
+    length = int(exp_cfg.get("series_length", 240))
+    dataset = build_demo_dataset(sites=sites, length=length)
+    dataset_stats = {
+        "source": "synthetic",
+        "sites": ",".join(sites),
+        "series_length": length,
+    }
+    return dataset, dataset_stats
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run wind power racecourse demo")
     parser.add_argument(
@@ -85,26 +85,29 @@ def main() -> None:
         default="configs/experiments/demo.yaml",
         help="Path to YAML experiment config",
     )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Print the per-task work, time and memory estimate as JSON instead of running",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_DIR",
+        help="Continue an interrupted run in RUN_DIR from its checkpoints (uses the config saved there)",
+    )
     args = parser.parse_args()
 
-    config = read_yaml(args.config)
-    exp_cfg = config.get("experiment", {})
-    data_source = str(exp_cfg.get("data_source", "synthetic"))
-
-    dataset_stats: dict = {}
-    if data_source == "real_csv":
-        dataset, dataset_stats = _load_real_dataset(config)
+    if args.resume:
+        config = RunCheckpoint(args.resume).manifest()["config"]
     else:
-        sites = list(exp_cfg.get("sites", ["site_a", "site_b"]))
-        length = int(exp_cfg.get("series_length", 240))
-        dataset = build_demo_dataset(sites=sites, length=length)
-        dataset_stats = {
-            "source": "synthetic",
-            "sites": ",".join(sites),
-            "series_length": length,
-        }
+        config = read_yaml(args.config)
+    dataset, dataset_stats = _load_dataset(config)
+
+    if args.plan:
+        print(json.dumps(build_plan(config=config, dataset=dataset), ensure_ascii=False, indent=2))
+        return
 
-    result = run_experiment(config=config, dataset=dataset, dataset_stats=dataset_stats)
+    result = run_experiment(config=config, dataset=dataset, dataset_stats=dataset_stats, resume_dir=args.resume)
 
     print("Demo finished.")
     print(f"Output dir: {result['output_dir']}")
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.cpu_budget import available_cpus
+from src.core.orchestrator import DEFAULT_QUEUE_DIR, _run_single_task
+from src.core.work_queue import WorkQueue, serve
+from src.utils.logger import get_logger
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run backtests published by an `executor: queue` experiment")
+    parser.add_argument(
+        "--queue-dir",
+        default=DEFAULT_QUEUE_DIR,
+        help="Queue directory shared with the coordinator (experiment.queue_dir)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=available_cpus(),
+        help="Threads each backtest may use (default: CPUs available to this process)",
+    )
+    parser.add_argument("--poll", type=float, default=0.5, help="Seconds between looks at an empty queue")
+    parser.add_argument("--max-tasks", type=int, default=None, help="Exit after this many tasks")
+    parser.add_argument("--idle-exit", type=float, default=None, help="Exit after this many seconds without work")
+    args = parser.parse_args()
+
+    logger = get_logger("wpf.worker")
+    queue = WorkQueue(args.queue_dir)
+    threads = max(1, args.threads)
+    logger.info("Worker serving %s with %s threads per task", queue.root, threads)
+    try:
+        done = serve(
+            queue,
+            lambda task: _run_single_task({**task, "num_threads": threads}),
+            poll_interval=args.poll,
+            max_tasks=args.max_tasks,
+            idle_exit=args.idle_exit,
+        )
+    except KeyboardInterrupt:
+        # The lease of an interrupted task expires and the coordinator requeues it.
+        return
+    logger.info("Worker finished %s tasks", done)
+
+
+if __name__ == "__main__":
+    main()
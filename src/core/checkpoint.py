@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any
+
+from src.core.predictions import PredictionBlock
+from src.utils.io import ensure_dir, read_json_gz, write_json_gz
+
+CHECKPOINT_DIR = "checkpoints"
+
+
+def _task_file(model_label: str, site_id: str) -> str:
+    digest = hashlib.sha256(f"{site_id}\0{model_label}".encode("utf-8")).hexdigest()[:24]
+    return f"task-{digest}.json.gz"
+
+
+class RunCheckpoint:
+    """Per-task checkpoints under `<run_dir>/checkpoints/`, so an interrupted run can resume.
+
+    `manifest.json.gz` records the config and the sites' content fingerprints.
+    Every finished backtest is saved as it is emitted (predictions plus
+    timings), and each adaptive search once it settles, keyed by its position
+    in the config. Entries are written atomically; a run killed mid-write
+    loses at most the task in flight.
+    """
+
+    def __init__(self, run_dir: str | Path) -> None:
+        self.run_dir = Path(run_dir)
+        self.path = self.run_dir / CHECKPOINT_DIR
+
+    def exists(self) -> bool:
+        return (self.path / "manifest.json.gz").exists()
+
+    def start(self, config: dict, fingerprints: dict[str, str]) -> None:
+        ensure_dir(self.path)
+        write_json_gz(self.path / "manifest.json.gz", {"config": config, "fingerprints": fingerprints})
+
+    def manifest(self) -> dict:
+        manifest = read_json_gz(self.path / "manifest.json.gz")
+        if not isinstance(manifest, dict):
+            raise FileNotFoundError(f"No checkpoint manifest under {self.path}")
+        return manifest
+
+    def save_task(self, preds: PredictionBlock, timings: dict[str, Any] | None) -> None:
+        write_json_gz(
+            self.path / _task_file(preds.model_name, preds.site_id),
+            {"timings": timings, "preds": preds.to_dict()},
+        )
+
+    def load_tasks(self) -> list[tuple[PredictionBlock, dict[str, Any] | None]]:
+        """Checkpointed backtests in the order they finished; unreadable entries are skipped."""
+        entries = []
+        for path in self.path.glob("task-*.json.gz"):
+            entry = read_json_gz(path)
+            if isinstance(entry, dict) and "preds" in entry:
+                entries.append((path.stat().st_mtime_ns, path.name, entry))
+        entries.sort(key=lambda e: (e[0], e[1]))
+        return [(PredictionBlock.from_dict(e["preds"]), e.get("timings")) for _, _, e in entries]
+
+    def save_search(self, index: int, state: dict) -> None:
+        write_json_gz(self.path / f"search-{index}.json.gz", state)
+
+    def load_search(self, index: int) -> dict | None:
+        state = read_json_gz(self.path / f"search-{index}.json.gz")
+        return state if isinstance(state, dict) else None
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from collections import deque
+import json
+import os
+from pathlib import Path
+from statistics import median
+import time
+
+from src.core.runner import count_backtest_work
+from src.utils.io import ensure_dir
+
+DEFAULT_TIMINGS_PATH = "outputs/cache/task_timings.jsonl"
+
+# Rough seconds per fit and per predicted origin by model category, used only when a
+# model has never been timed on this machine. They order tasks sensibly; history wins.
+_PRIOR_FIT_S = {"boost": 0.5, "forest": 0.5, "nn": 1.0, "linear": 0.002, "baseline": 0.00002}
+_PRIOR_PREDICT_S = {"boost": 0.002, "forest": 0.005, "nn": 0.0005, "linear": 0.0001, "baseline": 0.00002}
+# Recent matching records averaged into an estimate.
+_HISTORY_WINDOW = 5
+# The history file is rewritten without unused records once it has this many lines
+# and at least half of them are unused.
+_COMPACT_MIN_LINES = 1000
+_SIGNATURE_KEYS = ("model_name", "params", "n_series", "n_origins", "n_fits", "n_horizons", "refit")
+
+
+def params_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def refit_key(refit_each_origin: bool, refit_every: int | str | None) -> str:
+    if refit_every is not None:
+        return f"every:{refit_every}"
+    return "each_origin" if refit_each_origin else "once"
+
+
+def task_signature(
+    model_name: str,
+    params: dict,
+    n_series: int,
+    n_origins: int,
+    n_fits: int,
+    n_horizons: int,
+    refit: str,
+) -> dict:
+    """What a timing is keyed and scaled by: the model, its params and the backtest size."""
+    return {
+        "model_name": model_name,
+        "params": params_key(params),
+        "n_series": int(n_series),
+        "n_origins": int(n_origins),
+        "n_fits": int(n_fits),
+        "n_horizons": int(n_horizons),
+        "refit": refit,
+    }
+
+
+def estimate_trial(
+    store: TaskTimingStore,
+    model_name: str,
+    params: dict,
+    category: str,
+    n_series: int,
+    train_size: int,
+    horizons: list[int],
+    refit_each_origin: bool,
+    refit_every: int | str | None,
+    timestamps: list[str] | None = None,
+) -> dict:
+    """Signature, expected seconds and estimate source for one (model variant, site) trial."""
+    n_origins, n_fits = count_backtest_work(n_series, train_size, horizons, refit_each_origin, refit_every, timestamps)
+    signature = task_signature(
+        model_name,
+        params,
+        n_series=n_series,
+        n_origins=n_origins,
+        n_fits=n_fits,
+        n_horizons=len(horizons),
+        refit=refit_key(refit_each_origin, refit_every),
+    )
+    expected_s, source = store.estimate(signature, category)
+    return {"signature": signature, "expected_s": expected_s, "estimate_source": source}
+
+
+class TaskTimingStore:
+    """JSONL history of measured trial times on this machine.
+
+    An estimate reads at most the last `_HISTORY_WINDOW` records of a signature,
+    of a model and params, or of a model, so the history is indexed by those on
+    load and only their recent records are kept. Once older records make up most
+    of the file it is rewritten without them; the estimates do not change.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_TIMINGS_PATH) -> None:
+        self.path = Path(path)
+        # Keyed by the full signature, (model_name, params) and (model_name,): (load order, record).
+        self._groups: dict[tuple, deque[tuple[int, dict]]] | None = None
+        self._seq = 0
+        self._file_lines = 0
+
+    def _index(self) -> dict[tuple, deque[tuple[int, dict]]]:
+        if self._groups is None:
+            self._groups = {}
+            self._seq = self._file_lines = 0
+            if self.path.exists():
+                with self.path.open("r", encoding="utf-8") as f:
+                    for line in f:
+                        self._file_lines += 1
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            # A run killed mid-write leaves a partial last line.
+                            continue
+                        if isinstance(record, dict):
+                            self._add(record)
+        return self._groups
+
+    def _add(self, record: dict) -> None:
+        signature = tuple(record.get(k) for k in _SIGNATURE_KEYS)
+        for key in (signature, signature[:2], signature[:1]):
+            self._groups.setdefault(key, deque(maxlen=_HISTORY_WINDOW)).append((self._seq, record))
+        self._seq += 1
+
+    def _recent(self, key: tuple) -> list[dict]:
+        return [record for _, record in self._index().get(key, ())]
+
+    def records(self) -> list[dict]:
+        """The kept history, oldest first: the last `_HISTORY_WINDOW` records of each signature."""
+        kept = [entry for key, group in self._index().items() if len(key) == len(_SIGNATURE_KEYS) for entry in group]
+        return [record for _, record in sorted(kept, key=lambda entry: entry[0])]
+
+    def append(self, entries: list[dict]) -> None:
+        if not entries:
+            return
+        self._index()
+        ensure_dir(self.path.parent)
+        now = time.strftime("%Y-%m-%dT%H:%M:%S")
+        lines = "".join(json.dumps({**e, "recorded_at": now}, sort_keys=True) + "\n" for e in entries)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(lines)
+        self._file_lines += len(entries)
+        for line in lines.splitlines():
+            self._add(json.loads(line))
+        if self._file_lines >= max(_COMPACT_MIN_LINES, 2 * len(self.records())):
+            self._compact()
+
+    def _compact(self) -> None:
+        # Re-read first so records other runs appended since the load are kept.
+        self._groups = None
+        records = self.records()
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+        tmp.write_text("".join(json.dumps(r, sort_keys=True) + "\n" for r in records), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._file_lines = len(records)
+
+    def estimate(self, signature: dict, category: str) -> tuple[float, str]:
+        """Expected wall seconds for a trial and where the number came from.
+
+        Exact signature matches are used as measured. Otherwise the same model and
+        params are scaled from other series lengths, then any params of the same
+        model; with no history at all a per-category prior is used.
+        """
+        key = tuple(signature[k] for k in _SIGNATURE_KEYS)
+        exact = self._recent(key)
+        if exact:
+            return median(float(r["fit_s"]) + float(r["predict_s"]) for r in exact), "history"
+        same_params = self._recent(key[:2])
+        if same_params:
+            return self._scaled(same_params, signature), "history_scaled"
+        same_model = self._recent(key[:1])
+        if same_model:
+            return self._scaled(same_model, signature), "model_scaled"
+        fit_s = _PRIOR_FIT_S.get(category, 0.01) * signature["n_fits"]
+        predict_s = _PRIOR_PREDICT_S.get(category, 0.0001) * signature["n_origins"]
+        return fit_s + predict_s, "prior"
+
+    @staticmethod
+    def _scaled(records: list[dict], signature: dict) -> float:
+        # Fit cost scales with the number of fits and (roughly linearly) the training length;
+        # predict cost with origins x horizons.
+        estimates = []
+        for r in records:
+            per_fit = float(r["fit_s"]) / max(1, int(r["n_fits"]))
+            length_ratio = signature["n_series"] / max(1, int(r["n_series"]))
+            per_pred = float(r["predict_s"]) / max(1, int(r["n_origins"]) * int(r["n_horizons"]))
+            estimates.append(
+                per_fit * signature["n_fits"] * length_ratio
+                + per_pred * signature["n_origins"] * signature["n_horizons"]
+            )
+        return median(estimates)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+import os
+import threading
+from typing import ContextManager
+
+from src.utils.logger import get_logger
+
+_warned_no_threadpoolctl = False
+
+
+def available_cpus() -> int:
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def resolve_cpu_budget(value: int | str | None) -> int:
+    """`experiment.cpu_budget`: a thread count, or "auto"/None for every available core."""
+    if value is None or (isinstance(value, str) and value.strip().lower() == "auto"):
+        return available_cpus()
+    budget = int(value)
+    if budget < 1:
+        raise ValueError("cpu_budget must be >= 1 or 'auto'")
+    return budget
+
+
+def blas_thread_limit(n_threads: int | None) -> ContextManager:
+    """Cap BLAS/OpenMP pools (numpy lstsq, sklearn MLP) for the current process, if threadpoolctl is installed."""
+    if n_threads is None:
+        return nullcontext()
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        global _warned_no_threadpoolctl
+        if not _warned_no_threadpoolctl:
+            _warned_no_threadpoolctl = True
+            get_logger("wpf.cpu_budget").warning(
+                "threadpoolctl is not installed; BLAS/OpenMP pools are not capped by cpu_budget"
+            )
+        return nullcontext()
+    return threadpool_limits(limits=max(1, int(n_threads)))
+
+
+class CpuBudget:
+    """Splits a fixed number of threads between the trials that are running.
+
+    Trials are registered with `start` when they are admitted and removed with
+    `finish`. Each `acquire` leases the caller's fair share of the budget
+    (capped by what other leases leave free, minimum one thread), so leases
+    never sum past the budget while there are fewer trials than threads.
+    Shares grow as trials finish: a long trial that acquires per fit ends up
+    with the whole budget once it is the only one left.
+    """
+
+    def __init__(self, total: int) -> None:
+        self.total = max(1, int(total))
+        self._lock = threading.Lock()
+        self._running: dict[object, None] = {}
+        self._leases: dict[object, int] = {}
+
+    def start(self, key: object) -> None:
+        with self._lock:
+            self._running[key] = None
+
+    def finish(self, key: object) -> None:
+        with self._lock:
+            self._running.pop(key, None)
+            self._leases.pop(key, None)
+
+    def _fair_share(self, key: object) -> int:
+        keys = list(self._running) or [key]
+        base, extra = divmod(self.total, len(keys))
+        rank = keys.index(key) if key in self._running else len(keys) - 1
+        return base + (1 if rank < extra else 0)
+
+    def acquire(self, key: object) -> int:
+        with self._lock:
+            self._leases.pop(key, None)
+            free = self.total - sum(self._leases.values())
+            n = max(1, min(self._fair_share(key), free))
+            self._leases[key] = n
+            return n
+
+    def release(self, key: object) -> None:
+        with self._lock:
+            self._leases.pop(key, None)
+
+    def leaser(self, key: object) -> Callable[[], ContextManager[int]]:
+        """Per-fit lease factory for trials running in this process."""
+
+        @contextmanager
+        def lease() -> Iterator[int]:
+            n = self.acquire(key)
+            try:
+                yield n
+            finally:
+                self.release(key)
+
+        return lease
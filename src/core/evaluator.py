@@ -1,21 +1,13 @@
 from __future__ import annotations
 
-import math
+from collections.abc import Iterable
 from datetime import datetime
+import math
+from operator import itemgetter, methodcaller
 
+import numpy as np
 
-def _mae(y_true: list[float], y_pred: list[float]) -> float:
-    return sum(abs(a - b) for a, b in zip(y_true, y_pred)) / len(y_true)
-
-
-def _rmse(y_true: list[float], y_pred: list[float]) -> float:
-    mse = sum((a - b) ** 2 for a, b in zip(y_true, y_pred)) / len(y_true)
-    return math.sqrt(mse)
-
-
-def _nmae(y_true: list[float], y_pred: list[float]) -> float:
-    denom = max(sum(abs(v) for v in y_true), 1e-12)
-    return sum(abs(a - b) for a, b in zip(y_true, y_pred)) / denom
+from src.core.predictions import PredictionBlock
 
 
 def _season_from_ts(ts: str) -> str:
@@ -35,70 +27,188 @@ def _season_from_ts(ts: str) -> str:
     return "winter"
 
 
-def _wind_bin(value: float | None) -> str:
-    if value is None:
-        return "unknown"
-    if value < 4.0:
-        return "low"
-    if value < 8.0:
-        return "mid"
-    return "high"
-
-
-def evaluate(pred_rows: list[dict]) -> list[dict]:
-    grouped: dict[tuple[str, str, int, str, str], dict[str, list[float]]] = {}
-
-    for row in pred_rows:
-        base = (row["site_id"], row["model_name"], row["horizon"])
-        y_true = float(row["y_true"])
-        y_pred = float(row["y_pred"])
-
-        ts = str(row.get("timestamp", ""))
-        season = _season_from_ts(ts)
-        wind_raw = row.get("wind_speed")
-        wind_val = None
-        if wind_raw not in ("", None):
-            try:
-                wind_val = float(wind_raw)
-            except (TypeError, ValueError):
-                wind_val = None
-        wind_bin = _wind_bin(wind_val)
-
-        segments = [("overall", "all"), ("season", season), ("wind_bin", wind_bin)]
-        for seg_key, seg_value in segments:
-            key = (*base, seg_key, seg_value)
-            grouped.setdefault(key, {"y_true": [], "y_pred": []})
-            grouped[key]["y_true"].append(y_true)
-            grouped[key]["y_pred"].append(y_pred)
-
-    metrics: list[dict] = []
-    for (site_id, model_name, horizon, seg_key, seg_value), values in grouped.items():
-        y_true = values["y_true"]
-        y_pred = values["y_pred"]
-        if not y_true:
-            continue
-        metrics.append(
-            {
-                "site_id": site_id,
-                "model_name": model_name,
-                "horizon": horizon,
-                "segment_key": seg_key,
-                "segment_value": seg_value,
-                "MAE": round(_mae(y_true, y_pred), 6),
-                "RMSE": round(_rmse(y_true, y_pred), 6),
-                "nMAE": round(_nmae(y_true, y_pred), 6),
-                "samples": len(y_true),
-            }
+# Segment codes: every row counts towards "overall", its season and its wind bin.
+_SEGMENTS: tuple[tuple[str, str], ...] = (
+    ("overall", "all"),
+    ("season", "spring"),
+    ("season", "summer"),
+    ("season", "autumn"),
+    ("season", "winter"),
+    ("season", "unknown"),
+    ("wind_bin", "low"),
+    ("wind_bin", "mid"),
+    ("wind_bin", "high"),
+    ("wind_bin", "unknown"),
+)
+_SEGMENT_CODE = {seg: code for code, seg in enumerate(_SEGMENTS)}
+_N_SEGMENTS = len(_SEGMENTS)
+_WIND_LOW, _WIND_MID, _WIND_HIGH, _WIND_UNKNOWN = (_SEGMENT_CODE[("wind_bin", b)] for b in ("low", "mid", "high", "unknown"))
+
+_BASE_KEY = itemgetter("site_id", "model_name", "horizon")
+_Y_TRUE = itemgetter("y_true")
+_Y_PRED = itemgetter("y_pred")
+_TIMESTAMP = methodcaller("get", "timestamp", "")
+_WIND_SPEED = methodcaller("get", "wind_speed")
+
+
+def _wind_value(raw: object) -> float | None:
+    if raw.__class__ is float:
+        return raw
+    if raw in ("", None):
+        return None
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+class MetricAccumulator:
+    """Running error sums per (site, model, horizon, segment).
+
+    Rows can be fed as tasks finish and then dropped: memory grows with the
+    number of groups, not with the number of predictions. Each batch is
+    reduced with NumPy; timestamps are parsed once per distinct value.
+    """
+
+    def __init__(self) -> None:
+        # (site, model, horizon, segment code) -> group id, in first-seen order.
+        self._groups: dict[tuple, int] = {}
+        self._bases: dict[tuple, int] = {}
+        self._base_keys: list[tuple] = []
+        self._season_codes: dict[object, int] = {}
+        # Per group: sum |err|, sum err^2, sum |y_true|, count.
+        self._sums = np.zeros((4, 64), dtype=float)
+        # base id * _N_SEGMENTS + segment code -> group id, -1 until first seen.
+        self._group_of = np.full(0, -1, dtype=np.int64)
+        self.n_rows = 0
+
+    def _season_codes_for(self, stamps: list) -> np.ndarray:
+        # Each distinct timestamp is parsed once per accumulator, however many models share it.
+        for ts in set(stamps).difference(self._season_codes):
+            self._season_codes[ts] = _SEGMENT_CODE[("season", _season_from_ts(str(ts)))]
+        return np.fromiter(map(self._season_codes.__getitem__, stamps), dtype=np.int64, count=len(stamps))
+
+    def _base_ids(self, keys: list[tuple]) -> np.ndarray:
+        for key in set(keys).difference(self._bases):
+            self._bases[key] = len(self._base_keys)
+            self._base_keys.append(key)
+        return np.fromiter(map(self._bases.__getitem__, keys), dtype=np.int64, count=len(keys))
+
+    def update(self, preds: PredictionBlock | Iterable[dict]) -> None:
+        """Fold in one batch of predictions: a `PredictionBlock` or prediction row dicts."""
+        if isinstance(preds, PredictionBlock):
+            self._update_block(preds)
+        else:
+            self._update_rows(preds if isinstance(preds, list) else list(preds))
+
+    def _update_block(self, block: PredictionBlock) -> None:
+        if len(block) == 0:
+            return
+        horizons, h_inverse = np.unique(block.horizon, return_inverse=True)
+        base_ids = self._base_ids([(block.site_id, block.model_name, h) for h in horizons.tolist()])[h_inverse]
+        stamps, ts_inverse = np.unique(block.timestamp_index, return_inverse=True)
+        season = self._season_codes_for([block.timestamps[i] if i >= 0 else "" for i in stamps.tolist()])[ts_inverse]
+        wind_known = ~np.isnan(block.wind_speed)
+        self._accumulate(base_ids, block.y_true, block.y_pred, season, wind_known, block.wind_speed)
+
+    def _update_rows(self, rows: list[dict]) -> None:
+        n = len(rows)
+        if n == 0:
+            return
+        base_ids = self._base_ids(list(map(_BASE_KEY, rows)))
+        y_true = np.array(list(map(_Y_TRUE, rows)), dtype=float)
+        y_pred = np.array(list(map(_Y_PRED, rows)), dtype=float)
+        season = self._season_codes_for(list(map(_TIMESTAMP, rows)))
+
+        speeds = list(map(_WIND_SPEED, rows))
+        if set(map(type, speeds)) == {float}:
+            wind = np.array(speeds, dtype=float)
+            wind_known = np.ones(n, dtype=bool)
+        else:
+            winds = np.array(list(map(_wind_value, speeds)), dtype=object)
+            wind_known = winds != None  # noqa: E711 - elementwise
+            wind = np.where(wind_known, winds, 0.0).astype(float)
+        self._accumulate(base_ids, y_true, y_pred, season, wind_known, wind)
+
+    def _accumulate(
+        self,
+        base_ids: np.ndarray,
+        y_true: np.ndarray,
+        y_pred: np.ndarray,
+        season: np.ndarray,
+        wind_known: np.ndarray,
+        wind: np.ndarray,
+    ) -> None:
+        n = len(base_ids)
+        wind_code = np.where(
+            ~wind_known, _WIND_UNKNOWN, np.where(wind < 4.0, _WIND_LOW, np.where(wind < 8.0, _WIND_MID, _WIND_HIGH))
         )
 
-    seg_order = {"overall": 0, "season": 1, "wind_bin": 2}
-    return sorted(
-        metrics,
-        key=lambda x: (
-            x["site_id"],
-            seg_order.get(str(x["segment_key"]), 99),
-            str(x["segment_value"]),
-            int(x["horizon"]),
-            float(x["MAE"]),
-        ),
-    )
+        local = np.empty((n, 3), dtype=np.int64)
+        local[:, 0] = base_ids * _N_SEGMENTS
+        local[:, 1] = local[:, 0] + season
+        local[:, 2] = local[:, 0] + wind_code
+        local = local.ravel()
+        if len(self._group_of) < len(self._base_keys) * _N_SEGMENTS:
+            grown = np.full(2 * len(self._base_keys) * _N_SEGMENTS, -1, dtype=np.int64)
+            grown[: len(self._group_of)] = self._group_of
+            self._group_of = grown
+        group_ids = self._group_of[local]
+        unseen = group_ids < 0
+        if unseen.any():
+            # Number new groups in the order rows first reach them (overall, season, wind per row).
+            uniq, first = np.unique(local[unseen], return_index=True)
+            for code in uniq[np.argsort(first, kind="stable")]:
+                base, seg = divmod(int(code), _N_SEGMENTS)
+                self._group_of[code] = len(self._groups)
+                self._groups[(*self._base_keys[base], seg)] = len(self._groups)
+            group_ids = self._group_of[local]
+            if len(self._groups) > self._sums.shape[1]:
+                grown_sums = np.zeros((4, 2 * len(self._groups)), dtype=float)
+                grown_sums[:, : self._sums.shape[1]] = self._sums
+                self._sums = grown_sums
+
+        err = y_true - y_pred
+        # add.at applies contributions in row order, so the sums match a sequential loop.
+        np.add.at(self._sums[0], group_ids, np.repeat(np.abs(err), 3))
+        np.add.at(self._sums[1], group_ids, np.repeat(err**2, 3))
+        np.add.at(self._sums[2], group_ids, np.repeat(np.abs(y_true), 3))
+        self._sums[3] += np.bincount(group_ids, minlength=self._sums.shape[1])
+        self.n_rows += n
+
+    def metric_rows(self) -> list[dict]:
+        metrics: list[dict] = []
+        for (site_id, model_name, horizon, seg), gid in self._groups.items():
+            abs_err, sq_err, abs_true, n = self._sums[:, gid]
+            seg_key, seg_value = _SEGMENTS[seg]
+            metrics.append(
+                {
+                    "site_id": site_id,
+                    "model_name": model_name,
+                    "horizon": horizon,
+                    "segment_key": seg_key,
+                    "segment_value": seg_value,
+                    "MAE": round(float(abs_err / n), 6),
+                    "RMSE": round(math.sqrt(sq_err / n), 6),
+                    "nMAE": round(float(abs_err / max(abs_true, 1e-12)), 6),
+                    "samples": int(n),
+                }
+            )
+
+        seg_order = {"overall": 0, "season": 1, "wind_bin": 2}
+        return sorted(
+            metrics,
+            key=lambda x: (
+                x["site_id"],
+                seg_order.get(str(x["segment_key"]), 99),
+                str(x["segment_value"]),
+                int(x["horizon"]),
+                float(x["MAE"]),
+            ),
+        )
+
+
+def evaluate(preds: PredictionBlock | Iterable[dict]) -> list[dict]:
+    acc = MetricAccumulator()
+    acc.update(preds)
+    return acc.metric_rows()
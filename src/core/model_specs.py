@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from itertools import product
+import math
+import random
+
+import numpy as np
+
+from src.core.search import ADAPTIVE_METHODS, TPE, SearchSpec, TPESpec, build_search, build_tpe
+from src.data.exog import ExogMatrix, as_exog_matrix
+
+
+def format_model_label(name: str, params: dict) -> str:
+    if not params:
+        return name
+    param_str = ",".join(f"{k}={params[k]}" for k in sorted(params.keys()))
+    return f"{name}[{param_str}]"
+
+
+def _frozen(values) -> np.ndarray:
+    # A private read-only copy, so model variants can share design matrices built from it.
+    arr = np.array(values, dtype=float)
+    arr.flags.writeable = False
+    return arr
+
+
+def site_payload(raw_payload: dict | list) -> tuple[np.ndarray, ExogMatrix | None, list[str] | None]:
+    if isinstance(raw_payload, dict) and "series" in raw_payload:
+        exog = as_exog_matrix(raw_payload.get("exog"))
+        if exog is not None:
+            exog = ExogMatrix(_frozen(exog.values), exog.columns)
+        return _frozen(raw_payload["series"]), exog, raw_payload.get("timestamps")
+    return _frozen(raw_payload), None, None
+
+
+def is_adaptive(model_cfg: dict) -> bool:
+    return str((model_cfg.get("search") or {}).get("method", "")).lower() in ADAPTIVE_METHODS
+
+
+def build_adaptive_search(model_cfg: dict, seed: int) -> SearchSpec | TPESpec:
+    if str(model_cfg["search"]["method"]).lower() == TPE:
+        return build_tpe(model_cfg, seed=seed)
+    return build_search(model_cfg, seed=seed)
+
+
+def budget_series_length(n_series: int, train_size: int, horizons: list[int], budget: float) -> int:
+    """Series length whose backtest covers the first `budget` share of the origins (at least one)."""
+    max_h = max(horizons)
+    n_origins = max(0, n_series - max_h + 1 - train_size)
+    return min(n_series, train_size + max_h - 1 + max(1, math.ceil(budget * n_origins)))
+
+
+def expand_model_specs(models_cfg: list[dict], seed: int = 42) -> list[dict]:
+    rng = random.Random(seed)
+    expanded: list[dict] = []
+    for m in models_cfg:
+        if is_adaptive(m):
+            # Candidates are run by `run_experiment` through src/core/search.py.
+            continue
+        name = m["name"]
+        if "params_grid" in m and m["params_grid"]:
+            grid: dict = m["params_grid"]
+            keys = sorted(grid.keys())
+            values = [list(grid[k]) for k in keys]
+            all_combos = list(product(*values))
+            search_cfg = m.get("search", {})
+            method = str(search_cfg.get("method", "grid")).lower()
+            max_trials = int(search_cfg.get("max_trials", 0))
+            if method == "random":
+                if max_trials <= 0:
+                    max_trials = min(10, len(all_combos))
+                trial_count = min(max_trials, len(all_combos))
+                chosen = rng.sample(all_combos, k=trial_count)
+            else:
+                chosen = all_combos
+                if max_trials > 0:
+                    chosen = chosen[:max_trials]
+
+            for combo in chosen:
+                params = {k: v for k, v in zip(keys, combo)}
+                expanded.append(
+                    {
+                        "name": name,
+                        "params": params,
+                        "label": format_model_label(name, params),
+                    }
+                )
+            continue
+
+        params = dict(m.get("params", {}))
+        expanded.append(
+            {
+                "name": name,
+                "params": params,
+                "label": format_model_label(name, params),
+            }
+        )
+    return expanded
+
+
+def model_category(model_name: str) -> str:
+    name = model_name.lower()
+    if name in ("lightgbm", "xgboost"):
+        return "boost"
+    if name in ("random_forest",):
+        return "forest"
+    if name in ("mlp",):
+        return "nn"
+    if name in ("linear_ar", "linear_exog"):
+        return "linear"
+    return "baseline"
@@ -1,123 +1,319 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections.abc import Callable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack
 from datetime import datetime
-from itertools import product
-import random
-import threading
+import math
+import multiprocessing
+import shutil
+import time
+from typing import ContextManager
 
-from src.core.evaluator import evaluate
+from src.core.checkpoint import RunCheckpoint
+from src.core.cost_model import DEFAULT_TIMINGS_PATH, TaskTimingStore, estimate_trial
+from src.core.cpu_budget import CpuBudget, available_cpus, blas_thread_limit, resolve_cpu_budget
+from src.core.evaluator import MetricAccumulator
 from src.core.leaderboard import build_leaderboard
+from src.core.model_specs import (
+    budget_series_length,
+    build_adaptive_search,
+    expand_model_specs,
+    format_model_label,
+    is_adaptive,
+    model_category,
+    site_payload,
+)
+from src.core.prediction_writer import PREDICTION_FORMATS, open_prediction_writer
+from src.core.predictions import PredictionBlock
 from src.core.reporting import build_markdown_report
-from src.core.runner import run_backtest
+from src.core.result_cache import (
+    DEFAULT_RESULT_CACHE_DIR,
+    DEFAULT_RESULT_CACHE_MAX_MB,
+    has_cached_result,
+    load_cached_result,
+    prune_result_cache,
+    result_cache_key,
+    save_cached_result,
+    site_fingerprint,
+)
+from src.core.runner import parse_refit_every, run_backtest
+from src.core.search import (
+    ORIGINS,
+    TPE,
+    SearchSpec,
+    TPESpec,
+    rung_params,
+    run_search,
+    score_predictions,
+)
+from src.core.shared_dataset import SharedDataset, attach_site
 from src.core.stability import build_stability_leaderboard
+from src.core.telemetry import RssWatch, summarize_task_timings
+from src.core.work_queue import DEFAULT_LEASE_TIMEOUT_S, WorkQueue, run_queued
 from src.data.dataset_registry import DatasetRegistry
 from src.models.registry import create_model
 from src.utils.io import write_csv, write_json
 from src.utils.logger import get_logger
 
-
-def _format_model_label(name: str, params: dict) -> str:
-    if not params:
-        return name
-    param_str = ",".join(f"{k}={params[k]}" for k in sorted(params.keys()))
-    return f"{name}[{param_str}]"
+# The expansion helpers moved to src/core/model_specs.py; their old names stay importable here.
+_format_model_label = format_model_label
+_expand_model_specs_with_seed = expand_model_specs
+_model_category = model_category
 
 
 def _expand_model_specs(models_cfg: list[dict]) -> list[dict]:
-    return _expand_model_specs_with_seed(models_cfg=models_cfg, seed=42)
-
-
-def _expand_model_specs_with_seed(models_cfg: list[dict], seed: int) -> list[dict]:
-    rng = random.Random(seed)
-    expanded: list[dict] = []
-    for m in models_cfg:
-        name = m["name"]
-        if "params_grid" in m and m["params_grid"]:
-            grid: dict = m["params_grid"]
-            keys = sorted(grid.keys())
-            values = [list(grid[k]) for k in keys]
-            all_combos = list(product(*values))
-            search_cfg = m.get("search", {})
-            method = str(search_cfg.get("method", "grid")).lower()
-            max_trials = int(search_cfg.get("max_trials", 0))
-            if method == "random":
-                if max_trials <= 0:
-                    max_trials = min(10, len(all_combos))
-                trial_count = min(max_trials, len(all_combos))
-                chosen = rng.sample(all_combos, k=trial_count)
-            else:
-                chosen = all_combos
-                if max_trials > 0:
-                    chosen = chosen[:max_trials]
-
-            for combo in chosen:
-                params = {k: v for k, v in zip(keys, combo)}
-                expanded.append(
-                    {
-                        "name": name,
-                        "params": params,
-                        "label": _format_model_label(name, params),
-                    }
-                )
-            continue
+    return expand_model_specs(models_cfg=models_cfg, seed=42)
 
-        params = dict(m.get("params", {}))
-        expanded.append(
-            {
-                "name": name,
-                "params": params,
-                "label": _format_model_label(name, params),
-            }
-        )
-    return expanded
+
+def _run_single_task(task: dict, thread_lease: Callable[[], ContextManager[int]] | None = None) -> dict:
+    with RssWatch() as rss:
+        res = _run_task_body(task, thread_lease)
+    res["timings"]["peak_rss_mb"] = rss.peak_mb
+    if "queued_at" in task:
+        # Wall clock, so the wait is also measured for tasks that crossed to a queue worker.
+        res["timings"]["queue_wait_s"] = max(0.0, res["started_at"] - task["queued_at"])
+    del res["started_at"]
+    return res
 
 
-def _run_single_task(task: dict) -> dict:
+def _run_task_body(task: dict, thread_lease: Callable[[], ContextManager[int]] | None) -> dict:
     model_name = task["model_name"]
     params = task["params"]
     model_label = task["model_label"]
     site_id = task["site_id"]
-    series = task["series"]
-    exog_rows = task.get("exog_rows")
-    timestamps = task.get("timestamps")
+    result_cache = task.get("result_cache")
+    started_at = time.time()
+    started = time.perf_counter()
+    if result_cache is not None:
+        preds = load_cached_result(*result_cache)
+        if preds is not None:
+            elapsed = time.perf_counter() - started
+            timings = {"fit_s": 0.0, "predict_s": 0.0, "n_fits": 0, "n_predicts": 0, "total_s": elapsed}
+            return {
+                "ok": True,
+                "preds": preds,
+                "site_id": site_id,
+                "model_label": model_label,
+                "timings": timings,
+                "result_cache": "hit",
+                "started_at": started_at,
+            }
+    if "dataset" in task:
+        series, exog, timestamps = attach_site(task["dataset"], site_id)
+    else:
+        series, exog, timestamps = task["series"], task.get("exog"), task.get("timestamps")
+    series_length = task.get("series_length")
+    if series_length is not None:
+        # Partial-budget search trial: backtest only the first origins.
+        series = series[:series_length]
+        exog = exog[:series_length] if exog is not None else None
+        timestamps = timestamps[:series_length] if timestamps is not None else None
     horizons = task["horizons"]
     train_size = task["train_size"]
     refit_each_origin = task["refit_each_origin"]
+    refit_every = task.get("refit_every")
+    timings: dict[str, float] = {}
 
     model = create_model(model_name, params=params)
-    preds = run_backtest(
-        series=series,
-        site_id=site_id,
-        model=model,
-        model_label=model_label,
-        horizons=horizons,
-        train_size=train_size,
-        exog_rows=exog_rows,
-        timestamps=timestamps,
-        refit_each_origin=refit_each_origin,
-    )
-    return {"ok": True, "preds": preds, "site_id": site_id, "model_label": model_label}
+    # A fixed allotment (serial and process trials) applies for the whole trial; thread
+    # trials instead lease their current share around each fit.
+    num_threads = task.get("num_threads")
+    if num_threads is not None:
+        model.set_num_threads(num_threads)
+    with blas_thread_limit(num_threads):
+        preds = run_backtest(
+            series=series,
+            site_id=site_id,
+            model=model,
+            model_label=model_label,
+            horizons=horizons,
+            train_size=train_size,
+            exog=exog,
+            timestamps=timestamps,
+            refit_each_origin=refit_each_origin,
+            refit_every=refit_every,
+            thread_lease=thread_lease,
+            timings=timings,
+        )
+    timings["total_s"] = time.perf_counter() - started
+    if result_cache is not None:
+        try:
+            save_cached_result(*result_cache, preds=preds, timings=timings)
+        except OSError:
+            # A full or read-only cache only costs the reuse, not the trial.
+            pass
+    return {
+        "ok": True,
+        "preds": preds,
+        "site_id": site_id,
+        "model_label": model_label,
+        "timings": timings,
+        "result_cache": "miss" if result_cache is not None else None,
+        "started_at": started_at,
+    }
+
+
+def _model_name(model_label: str) -> str:
+    return model_label.split("[", 1)[0]
+
+
+def _timing_row(
+    model_name: str,
+    model_label: str,
+    site_id: str,
+    stage: str,
+    expected_s: float,
+    estimate_source: str,
+    timings: dict,
+    n_predictions: int | None = None,
+    result_cache: str | None = None,
+    worker: str | None = None,
+) -> dict:
+    """One `task_timings.csv` row; measured fields are None when the task produced no timings."""
+
+    def measured(key: str, digits: int = 4) -> float | None:
+        value = timings.get(key)
+        return round(value, digits) if value is not None else None
+
+    predict_s = timings.get("predict_s")
+    return {
+        "model_label": model_label,
+        "site_id": site_id,
+        "category": model_category(model_name),
+        "stage": stage,
+        "expected_s": round(expected_s, 4),
+        "estimate_source": estimate_source,
+        "actual_s": measured("total_s"),
+        "fit_s": measured("fit_s"),
+        "predict_s": measured("predict_s"),
+        "n_fits": timings.get("n_fits"),
+        "n_predicts": timings.get("n_predicts"),
+        "n_predictions": n_predictions if timings else None,
+        "preds_per_s": round(n_predictions / predict_s, 1) if n_predictions and predict_s else None,
+        "queue_wait_s": measured("queue_wait_s"),
+        "peak_rss_mb": timings.get("peak_rss_mb"),
+        "result_cache": result_cache,
+        "worker": worker,
+    }
+
+
+DEFAULT_QUEUE_DIR = "outputs/queue"
+
+EXECUTORS = ("thread", "process", "auto", "queue")
+
+# Categories whose fit/predict loops are pure Python and hold the GIL; `auto` runs them
+# in processes. Boosting, forests and MLPs spend their time in native code that releases it.
+_PROCESS_CATEGORIES = ("linear", "baseline")
+
+
+def _task_backend(executor: str, category: str) -> str:
+    if executor == "auto":
+        return "process" if category in _PROCESS_CATEGORIES else "thread"
+    return executor
 
 
-def _model_category(model_name: str) -> str:
-    name = model_name.lower()
-    if name in ("lightgbm", "xgboost"):
-        return "boost"
-    if name in ("random_forest",):
-        return "forest"
-    if name in ("mlp",):
-        return "nn"
-    if name in ("linear_ar", "linear_exog"):
-        return "linear"
-    return "baseline"
+def _run_tasks_parallel(
+    tasks: list[dict],
+    max_workers: int,
+    category_limits: dict[str, int],
+    executor: str,
+    budget: CpuBudget | None = None,
+    more: Callable[[], list[dict]] | None = None,
+) -> Iterator[tuple[dict | None, dict, BaseException | None]]:
+    """Run tasks on thread and/or process pools, yielding (result, task, error) as they finish.
+
+    A single coordinator admits tasks in order while fewer than `max_workers`
+    are running in total and their category is under its limit, so the
+    `model_type_limits` semantics hold across both pool types. With a CPU
+    budget, thread trials lease their share per fit and process trials get a
+    fixed share when they are submitted. `more`, if given, is asked for new
+    tasks whenever fewer than `max_workers` are running or pending (it may look
+    at the results yielded so far); an empty list means it has nothing left to add.
+    """
+    budget = budget or CpuBudget(available_cpus())
+    pending = list(enumerate(tasks))
+    next_key = len(pending)
+    running: dict[Future, tuple[dict, str, int]] = {}
+    running_by_cat: dict[str, int] = {}
+
+    with ExitStack() as stack:
+        pools: dict[str, Executor] = {}
+
+        def pool(backend: str) -> Executor:
+            if backend not in pools:
+                if backend == "thread":
+                    pools[backend] = stack.enter_context(ThreadPoolExecutor(max_workers=max_workers))
+                else:
+                    # spawn, not fork: the thread pool may already be running when workers start.
+                    pools[backend] = stack.enter_context(
+                        ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+                    )
+            return pools[backend]
+
+        while True:
+            # Top up until every worker has a task, even if each call yields only one.
+            while more is not None and len(running) + len(pending) < max_workers:
+                new_tasks = more()
+                if not new_tasks:
+                    more = None
+                    break
+                pending.extend((next_key + i, task) for i, task in enumerate(new_tasks))
+                next_key += len(new_tasks)
+            if not pending and not running:
+                break
+
+            waiting: list[tuple[int, dict]] = []
+            admitted: list[tuple[int, dict, str]] = []
+            for key, task in pending:
+                cat = model_category(task["model_name"])
+                n_running = len(running) + len(admitted)
+                if n_running >= max_workers or running_by_cat.get(cat, 0) >= category_limits.get(cat, max_workers):
+                    waiting.append((key, task))
+                    continue
+                admitted.append((key, task, cat))
+                running_by_cat[cat] = running_by_cat.get(cat, 0) + 1
+                budget.start(key)
+            pending = waiting
+
+            # Shares are computed once the whole batch is registered, so the first admitted
+            # trial does not take the entire budget.
+            for key, task, cat in admitted:
+                if _task_backend(executor, cat) == "process":
+                    fut = pool("process").submit(_run_single_task, {**task, "num_threads": budget.acquire(key)})
+                else:
+                    fut = pool("thread").submit(_run_single_task, task, budget.leaser(key))
+                running[fut] = (task, cat, key)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                task, cat, key = running.pop(fut)
+                running_by_cat[cat] -= 1
+                budget.finish(key)
+                try:
+                    yield fut.result(), task, None
+                except Exception as exc:
+                    yield None, task, exc
 
 
 def run_experiment(
     config: dict,
     dataset: dict,
     dataset_stats: dict | None = None,
+    resume_dir: str | None = None,
 ) -> dict:
+    """Run every model variant on every site and write the run directory.
+
+    With `resume_dir`, continue an interrupted run in that directory: backtests
+    found in its checkpoints are reused and only the rest are run.
+    """
     logger = get_logger("wpf.orchestrator")
 
     exp_cfg = config.get("experiment", {})
@@ -127,129 +323,489 @@ def run_experiment(
     dataset_version = exp_cfg.get("dataset_version", "demo_dataset_v1")
     train_size = int(exp_cfg.get("train_size", 120))
     refit_each_origin = bool(exp_cfg.get("refit_each_origin", True))
+    refit_every = exp_cfg.get("refit_every")
+    if refit_every is not None:
+        parse_refit_every(refit_every)
     skip_failed_models = bool(exp_cfg.get("skip_failed_models", True))
     max_workers = int(exp_cfg.get("max_workers", 1))
     model_type_limits = exp_cfg.get("model_type_limits", {}) or {}
+    cpu_budget = resolve_cpu_budget(exp_cfg.get("cpu_budget", "auto"))
+    schedule = str(exp_cfg.get("schedule", "cost")).lower()
+    if schedule not in ("cost", "config"):
+        raise ValueError(f"experiment.schedule must be 'cost' or 'config', got {schedule!r}")
+    timing_history = exp_cfg.get("timing_history", DEFAULT_TIMINGS_PATH)
+    timing_store = TaskTimingStore(timing_history) if timing_history else None
+    result_cache_dir = exp_cfg.get("result_cache", DEFAULT_RESULT_CACHE_DIR)
+    executor = str(exp_cfg.get("executor", "thread")).lower()
+    if executor not in EXECUTORS:
+        raise ValueError(f"experiment.executor must be one of {EXECUTORS}, got {executor!r}")
+    work_queue = None
+    if executor == "queue":
+        work_queue = WorkQueue(
+            exp_cfg.get("queue_dir", DEFAULT_QUEUE_DIR),
+            lease_timeout=float(exp_cfg.get("queue_lease_timeout", DEFAULT_LEASE_TIMEOUT_S)),
+        )
+    predictions_format = str(exp_cfg.get("predictions_format", "csv")).lower()
+    if predictions_format not in PREDICTION_FORMATS:
+        raise ValueError(
+            f"experiment.predictions_format must be one of {PREDICTION_FORMATS}, got {predictions_format!r}"
+        )
     search_seed = int(exp_cfg.get("search_seed", 42))
     horizons = list(exp_cfg.get("horizons", [1, 2, 4]))
     sites = list(exp_cfg.get("sites", list(dataset.keys())))
-    model_specs = _expand_model_specs_with_seed(models_cfg=models_cfg, seed=search_seed)
+    model_specs = expand_model_specs(models_cfg=models_cfg, seed=search_seed)
+    searches = [build_adaptive_search(m, seed=search_seed) for m in models_cfg if is_adaptive(m)]
 
-    run_tag = datetime.now().strftime("%Y%m%d_%H%M%S")
-    out_dir = f"outputs/runs/{exp_name}_{run_tag}"
+    if resume_dir is not None:
+        out_dir = str(resume_dir)
+    else:
+        run_tag = datetime.now().strftime("%Y%m%d_%H%M%S")
+        out_dir = f"outputs/runs/{exp_name}_{run_tag}"
+    checkpoint = RunCheckpoint(out_dir)
 
     logger.info(
-        "Experiment=%s, sites=%s, model_variants=%s",
+        "Experiment=%s, sites=%s, model_variants=%s, adaptive_searches=%s",
         exp_name,
         sites,
         len(model_specs),
+        len(searches),
     )
 
-    tasks: list[dict] = []
-    for model_cfg in model_specs:
-        model_name = model_cfg["name"]
-        params = model_cfg["params"]
-        model_label = model_cfg["label"]
-        for site_id in sites:
-            raw_payload = dataset[site_id]
-            if isinstance(raw_payload, dict) and "series" in raw_payload:
-                series = list(raw_payload["series"])
-                exog_rows = raw_payload.get("exog")
-                timestamps = raw_payload.get("timestamps")
+    # Series and exog are converted to arrays once per site and shared by every task.
+    site_payloads = {site_id: site_payload(dataset[site_id]) for site_id in sites}
+    fingerprints = {site_id: site_fingerprint(*payload) for site_id, payload in site_payloads.items()}
+    if resume_dir is not None:
+        saved = checkpoint.manifest()["fingerprints"]
+        changed = sorted(site_id for site_id in sites if saved.get(site_id) != fingerprints[site_id])
+        if changed:
+            raise ValueError(f"Cannot resume {out_dir}: data for sites {changed} differs from the checkpointed run")
+        restored = checkpoint.load_tasks()
+        logger.info("Resuming %s: %s checkpointed backtests", out_dir, len(restored))
+    else:
+        checkpoint.start(config, fingerprints)
+        restored = []
+
+    site_work = {
+        site_id: (len(series), timestamps) for site_id, (series, _, timestamps) in site_payloads.items()
+    }
+    # The dataset is placed in shared memory once; tasks carry only its handle and a site id.
+    shared = SharedDataset(site_payloads)
+    if work_queue is not None:
+        # Remote workers cannot map our shared memory, so they read the sites from the queue directory.
+        queue_dataset = work_queue.publish_dataset(site_payloads)
+        logger.info("Queue executor: publishing tasks to %s", work_queue.root)
+    del site_payloads
+    logger.info("Shared dataset: %.1f MB for %s sites", shared.nbytes / 1e6, len(sites))
+
+    estimator = timing_store or TaskTimingStore(DEFAULT_TIMINGS_PATH)
+
+    def make_task(name: str, params: dict, label: str, site_id: str, series_length: int | None = None) -> dict:
+        n_series, timestamps = site_work[site_id]
+        task = {
+            "model_name": name,
+            "params": params,
+            "model_label": label,
+            "site_id": site_id,
+            "dataset": shared.handle,
+            "horizons": horizons,
+            "train_size": train_size,
+            "refit_each_origin": refit_each_origin,
+            "refit_every": refit_every,
+        }
+        if series_length is not None:
+            task["series_length"] = series_length
+            n_series = series_length
+            timestamps = timestamps[:series_length] if timestamps is not None else None
+        task.update(
+            estimate_trial(
+                estimator,
+                name,
+                params,
+                model_category(name),
+                n_series=n_series,
+                train_size=train_size,
+                horizons=horizons,
+                refit_each_origin=refit_each_origin,
+                refit_every=refit_every,
+                timestamps=timestamps,
+            )
+        )
+        if result_cache_dir:
+            key = result_cache_key(
+                name,
+                params,
+                label,
+                site_id,
+                fingerprints[site_id],
+                horizons=horizons,
+                train_size=train_size,
+                refit_each_origin=refit_each_origin,
+                refit_every=refit_every,
+                series_length=series_length,
+            )
+            task["result_cache"] = (str(result_cache_dir), key)
+            if has_cached_result(result_cache_dir, key):
+                task["expected_s"], task["estimate_source"] = 0.0, "result_cache"
+        return task
+
+    def schedule_tasks(batch: list[dict]) -> list[dict]:
+        if schedule == "cost" and max_workers > 1:
+            # Longest expected first, so an expensive trial does not start last and become the tail.
+            batch.sort(key=lambda t: -t["expected_s"])
+        return batch
+
+    category_limits = {
+        cat: max(1, int(model_type_limits.get(cat, max_workers)))
+        for cat in ("boost", "forest", "nn", "linear", "baseline")
+    }
+
+    def enqueue(batch: list[dict]) -> list[dict]:
+        # Stamped when handed to an executor; the task reports how long it waited to start.
+        now = time.time()
+        for task in batch:
+            task["queued_at"] = now
+        return batch
+
+    def execute(
+        batch: list[dict], more: Callable[[], list[dict]] | None = None
+    ) -> Iterator[tuple[dict | None, dict, BaseException | None]]:
+        batch = enqueue(batch)
+        feed = None
+        if more is not None:
+
+            def feed() -> list[dict]:
+                return enqueue(more())
+
+        if work_queue is not None:
+            # Workers take whatever is queued; `max_workers` only bounds how far `more` runs ahead.
+            yield from run_queued(work_queue, batch, queue_dataset, feed, max_in_flight=max_workers)
+            return
+        if max_workers <= 1:
+            pending = list(batch)
+            while True:
+                if not pending and feed is not None:
+                    pending = feed()
+                if not pending:
+                    return
+                task = pending.pop(0)
+                try:
+                    res = _run_single_task({**task, "num_threads": cpu_budget})
+                except Exception as exc:
+                    yield None, task, exc
+                else:
+                    yield res, task, None
+        budget = CpuBudget(cpu_budget)
+        # BLAS pools are process-wide, so trials sharing this process split them evenly.
+        with blas_thread_limit(max(1, cpu_budget // max_workers)):
+            yield from _run_tasks_parallel(batch, max_workers, category_limits, executor, budget, feed)
+
+    # Prediction rows go to disk and the metric sums as each task finishes,
+    # so memory does not grow with the number of predictions.
+    pred_writer = open_prediction_writer(out_dir, predictions_format)
+    if resume_dir is not None and pred_writer.path.is_dir():
+        # Columnar parts are rewritten from the checkpoints below.
+        shutil.rmtree(pred_writer.path)
+    metric_acc = MetricAccumulator()
+    # (model_label, site_id) of every backtest whose predictions are on disk.
+    emitted: set[tuple[str, str]] = set()
+
+    def emit_predictions(preds: PredictionBlock, timings: dict | None = None, save: bool = True) -> None:
+        key = (preds.model_name, preds.site_id)
+        if key in emitted:
+            return
+        pred_writer.write(preds)
+        metric_acc.update(preds)
+        emitted.add(key)
+        if save:
+            checkpoint.save_task(preds, timings)
+
+    failed_models: list[dict] = []
+    task_timings: list[dict] = []
+    history_entries: list[dict] = []
+    search_rows: list[dict] = []
+    search_summary: list[dict] = []
+    cache_counts = {"hit": 0, "miss": 0}
+
+    def record_timing(task: dict, res: dict | None, stage: str = "final") -> None:
+        measured = res["timings"] if res is not None else {}
+        cache_status = res.get("result_cache") if res is not None else None
+        if cache_status is not None:
+            cache_counts[cache_status] += 1
+        if measured and cache_status != "hit":
+            history_entries.append(
+                {**task["signature"], "fit_s": measured["fit_s"], "predict_s": measured["predict_s"]}
+            )
+        task_timings.append(
+            _timing_row(
+                task["model_name"],
+                task["model_label"],
+                task["site_id"],
+                stage,
+                task["expected_s"],
+                task["estimate_source"],
+                measured,
+                n_predictions=len(res["preds"]) if res is not None else None,
+                result_cache=cache_status,
+                worker=res.get("worker") if res is not None else None,
+            )
+        )
+
+    def record_failure(task: dict, exc: BaseException) -> None:
+        if not skip_failed_models:
+            raise exc
+        msg = str(exc)
+        failed_models.append(
+            {
+                "model_name": task["model_name"],
+                "model_label": task["model_label"],
+                "site_id": task["site_id"],
+                "error": msg,
+            }
+        )
+        logger.warning(
+            "Skip model %s on site %s: %s",
+            task["model_label"],
+            task["site_id"],
+            msg,
+        )
+
+    def record_search_failure(task: dict, exc: BaseException) -> None:
+        if not skip_failed_models:
+            raise exc
+        logger.warning("Search trial %s on site %s failed: %s", task["model_label"], task["site_id"], exc)
+
+    def evaluate_rung(spec: SearchSpec, work: list[tuple[dict, float]]) -> list[float]:
+        # One trial per (candidate, site) at the rung budget; the candidate's score is
+        # its MAE averaged over sites and horizons, like the leaderboard's avg_MAE.
+        batch: list[dict] = []
+        for idx, (params, budget) in enumerate(work):
+            label = format_model_label(spec.name, params)
+            for site_id in sites:
+                series_length = None
+                if spec.resource == ORIGINS and budget < 1.0:
+                    series_length = budget_series_length(site_work[site_id][0], train_size, horizons, budget)
+                task = make_task(spec.name, rung_params(params, spec.resource, budget), label, site_id, series_length)
+                task["search_index"] = idx
+                batch.append(task)
+        site_scores: list[list[float]] = [[] for _ in work]
+        for res, task, exc in execute(schedule_tasks(batch)):
+            record_timing(task, res, stage="search")
+            if exc is not None:
+                record_search_failure(task, exc)
+                site_scores[task["search_index"]].append(math.inf)
             else:
-                series = list(raw_payload)
-                exog_rows = None
-                timestamps = None
-            tasks.append(
+                site_scores[task["search_index"]].append(score_predictions(res["preds"]))
+        return [sum(scores) / len(scores) for scores in site_scores]
+
+    def run_tpe(spec: TPESpec) -> tuple[list[dict], int, bool]:
+        # Trials are proposed one at a time whenever a worker frees up, from every result
+        # told so far; there is no generation barrier. Each trial is a full backtest, so
+        # the best `keep` trials' predictions go straight onto the leaderboard.
+        sampler = spec.sampler()
+        started = time.monotonic()
+        trials: list[dict] = []
+        timed_out = False
+
+        def propose() -> list[dict]:
+            nonlocal timed_out
+            if len(trials) >= spec.max_trials:
+                return []
+            if spec.time_budget_s is not None and time.monotonic() - started >= spec.time_budget_s:
+                timed_out = True
+                return []
+            params = sampler.suggest(exclude=[t["params"] for t in trials])
+            label = format_model_label(spec.name, params)
+            trials.append({"params": params, "label": label, "scores": [], "preds": []})
+            batch = [make_task(spec.name, params, label, site_id) for site_id in sites]
+            for task in batch:
+                task["search_index"] = len(trials) - 1
+            return batch
+
+        kept: list[int] = []
+        for res, task, exc in execute([], more=propose):
+            record_timing(task, res, stage="search")
+            idx = task["search_index"]
+            trial = trials[idx]
+            if exc is not None:
+                record_search_failure(task, exc)
+                trial["scores"].append(math.inf)
+            else:
+                trial["scores"].append(score_predictions(res["preds"]))
+                trial["preds"].append((res["preds"], res["timings"]))
+            if len(trial["scores"]) < len(sites):
+                continue
+            trial["score"] = sum(trial["scores"]) / len(sites)
+            trial["finished_s"] = round(time.monotonic() - started, 3)
+            sampler.tell(trial["params"], trial["score"])
+            if math.isfinite(trial["score"]):
+                kept = sorted(kept + [idx], key=lambda i: trials[i]["score"])
+                for dropped in kept[spec.keep :]:
+                    trials[dropped]["preds"] = []
+                kept = kept[: spec.keep]
+
+        for idx, trial in enumerate(trials):
+            search_rows.append(
                 {
-                    "model_name": model_name,
-                    "params": params,
-                    "model_label": model_label,
-                    "site_id": site_id,
-                    "series": series,
-                    "exog_rows": exog_rows,
-                    "timestamps": timestamps,
-                    "horizons": horizons,
-                    "train_size": train_size,
-                    "refit_each_origin": refit_each_origin,
+                    "model_name": spec.name,
+                    "method": TPE,
+                    "trial": idx,
+                    "bracket": 0,
+                    "rung": 0,
+                    "budget": 1.0,
+                    "model_label": trial["label"],
+                    "score_MAE": round(trial["score"], 6) if math.isfinite(trial["score"]) else None,
+                    "promoted": idx in kept,
+                    "finished_s": trial.get("finished_s"),
                 }
             )
+        for idx in kept:
+            for preds, timings in trials[idx]["preds"]:
+                emit_predictions(preds, timings)
+        finished = [{"name": spec.name, "params": trials[i]["params"], "label": trials[i]["label"]} for i in kept]
+        return finished, len(trials), timed_out
 
-    all_preds: list[dict] = []
-    failed_models: list[dict] = []
-    if max_workers <= 1:
-        for task in tasks:
-            try:
-                res = _run_single_task(task)
-                all_preds.extend(res["preds"])
-            except Exception as exc:
-                if not skip_failed_models:
-                    raise
-                failed_models.append(
-                    {
-                        "model_name": task["model_name"],
-                        "model_label": task["model_label"],
-                        "site_id": task["site_id"],
-                        "error": str(exc),
-                    }
-                )
-                logger.warning(
-                    "Skip model %s on site %s: %s",
-                    task["model_label"],
-                    task["site_id"],
-                    exc,
+    def run_one_search(spec: SearchSpec | TPESpec) -> None:
+        started = time.monotonic()
+        if isinstance(spec, TPESpec):
+            finished, n_trials, timed_out = run_tpe(spec)
+            model_specs.extend(finished)
+            labels = [m["label"] for m in finished]
+            search_summary.append(
+                {
+                    "model_name": spec.name,
+                    "method": TPE,
+                    "max_trials": spec.max_trials,
+                    "trials": n_trials,
+                    "n_startup": spec.n_startup,
+                    "gamma": spec.gamma,
+                    "time_budget_s": spec.time_budget_s,
+                    "finalists": labels,
+                    "elapsed_s": round(time.monotonic() - started, 3),
+                    "stopped_by_time_budget": timed_out,
+                }
+            )
+            logger.info("Search %s (tpe): best=%s", spec.name, labels)
+            return
+
+        finalists, history, timed_out = run_search(spec, lambda work, spec=spec: evaluate_rung(spec, work))
+        labels = [format_model_label(spec.name, params) for params in finalists]
+        model_specs.extend(
+            {"name": spec.name, "params": params, "label": label} for params, label in zip(finalists, labels)
+        )
+        for trial, row in enumerate(history):
+            search_rows.append(
+                {
+                    "model_name": spec.name,
+                    "method": spec.method,
+                    "trial": trial,
+                    "bracket": row["bracket"],
+                    "rung": row["rung"],
+                    "budget": round(row["budget"], 6),
+                    "model_label": format_model_label(spec.name, row["params"]),
+                    "score_MAE": round(row["score"], 6) if math.isfinite(row["score"]) else None,
+                    "promoted": row["promoted"],
+                    "finished_s": None,
+                }
+            )
+        search_summary.append(
+            {
+                "model_name": spec.name,
+                "method": spec.method,
+                "eta": spec.eta,
+                "resource": spec.resource,
+                "time_budget_s": spec.time_budget_s,
+                "brackets": len(spec.brackets),
+                "candidates": sum(len(b.candidates) for b in spec.brackets),
+                "partial_trials": len(history),
+                "finalists": labels,
+                "elapsed_s": round(time.monotonic() - started, 3),
+                "stopped_by_time_budget": timed_out,
+            }
+        )
+        logger.info(
+            "Search %s (%s): %s partial trials, finalists=%s",
+            spec.name,
+            spec.method,
+            len(history),
+            labels,
+        )
+
+    with shared, pred_writer:
+        for preds, timings in restored:
+            emit_predictions(preds, save=False)
+            task_timings.append(
+                _timing_row(
+                    _model_name(preds.model_name),
+                    preds.model_name,
+                    preds.site_id,
+                    "final",
+                    0.0,
+                    "checkpoint",
+                    timings or {},
+                    n_predictions=len(preds),
                 )
-    else:
-        semaphores: dict[str, threading.Semaphore] = {}
-        for cat in ("boost", "forest", "nn", "linear", "baseline"):
-            limit = int(model_type_limits.get(cat, max_workers))
-            semaphores[cat] = threading.Semaphore(max(1, limit))
-
-        def submit_with_limit(task: dict) -> dict:
-            cat = _model_category(task["model_name"])
-            sem = semaphores.get(cat)
-            if sem is None:
-                return _run_single_task(task)
-            with sem:
-                return _run_single_task(task)
-
-        with ThreadPoolExecutor(max_workers=max_workers) as ex:
-            future_map = {ex.submit(submit_with_limit, task): task for task in tasks}
-            for fut in as_completed(future_map):
-                try:
-                    res = fut.result()
-                    all_preds.extend(res["preds"])
-                except Exception as exc:
-                    if not skip_failed_models:
-                        raise
-                    msg = str(exc)
-                    task = future_map[fut]
-                    failed_models.append(
-                        {
-                            "model_name": task["model_name"],
-                            "model_label": task["model_label"],
-                            "site_id": task["site_id"],
-                            "error": msg,
-                        }
-                    )
-                    logger.warning(
-                        "Skip model %s on site %s: %s",
-                        task["model_label"],
-                        task["site_id"],
-                        msg,
-                    )
+            )
+
+        for search_index, spec in enumerate(searches):
+            state = checkpoint.load_search(search_index) if resume_dir is not None else None
+            if state is not None and state["model_name"] == spec.name:
+                model_specs.extend(state["finalists"])
+                search_rows.extend(state["trials"])
+                search_summary.append(state["summary"])
+                logger.info("Search %s restored from checkpoint: finalists=%s", spec.name, state["summary"]["finalists"])
+                continue
+            first_row = len(search_rows)
+            n_specs = len(model_specs)
+            run_one_search(spec)
+            checkpoint.save_search(
+                search_index,
+                {
+                    "model_name": spec.name,
+                    "finalists": model_specs[n_specs:],
+                    "trials": search_rows[first_row:],
+                    "summary": search_summary[-1],
+                },
+            )
+
+        tasks = [
+            make_task(model_cfg["name"], model_cfg["params"], model_cfg["label"], site_id)
+            for model_cfg in model_specs
+            for site_id in sites
+            # TPE finalists and checkpointed backtests are already on disk.
+            if (model_cfg["label"], site_id) not in emitted
+        ]
+        for res, task, exc in execute(schedule_tasks(tasks)):
+            record_timing(task, res)
+            if exc is not None:
+                record_failure(task, exc)
+            else:
+                emit_predictions(res["preds"], res["timings"])
+
+    if timing_store is not None:
+        timing_store.append(history_entries)
+    cache_pruned = None
+    if result_cache_dir:
+        max_mb = exp_cfg.get("result_cache_max_mb", DEFAULT_RESULT_CACHE_MAX_MB)
+        max_age_days = exp_cfg.get("result_cache_max_age_days")
+        cache_pruned = prune_result_cache(
+            result_cache_dir,
+            max_mb=float(max_mb) if max_mb is not None else None,
+            max_age_days=float(max_age_days) if max_age_days is not None else None,
+        )
 
-    if not all_preds:
+    if not metric_acc.n_rows:
         raise RuntimeError("No successful model predictions generated. Check dependencies and configs.")
 
-    metric_rows = evaluate(all_preds)
+    metric_rows = metric_acc.metric_rows()
     leaderboard = build_leaderboard(metric_rows)
     stability_rows = build_stability_leaderboard(metric_rows)
 
-    write_csv(f"{out_dir}/predictions.csv", all_preds)
     write_csv(f"{out_dir}/metrics.csv", metric_rows)
+    write_csv(f"{out_dir}/task_timings.csv", task_timings)
     write_csv(f"{out_dir}/leaderboard.csv", leaderboard)
     write_csv(f"{out_dir}/stability_leaderboard.csv", stability_rows)
+    if search_rows:
+        write_csv(f"{out_dir}/search_trials.csv", search_rows)
     if failed_models:
         write_json(f"{out_dir}/failed_models.json", {"failed_models": failed_models})
     if dataset_stats:
@@ -264,11 +820,33 @@ def run_experiment(
             "models": model_specs,
             "output_dir": out_dir,
             "refit_each_origin": refit_each_origin,
+            "refit_every": refit_every,
             "max_workers": max_workers,
+            "executor": executor,
+            "cpu_budget": cpu_budget,
             "model_type_limits": model_type_limits,
             "skip_failed_models": skip_failed_models,
             "failed_models": failed_models,
             "dataset_stats": dataset_stats or {},
+            "schedule": schedule,
+            "expected_total_s": round(sum(t["expected_s"] for t in task_timings), 4),
+            "actual_total_s": round(sum(t["actual_s"] or 0.0 for t in task_timings), 4),
+            "task_timings": task_timings,
+            "task_timings_by_category": summarize_task_timings(task_timings),
+            "search": search_summary,
+            "predictions": {"format": predictions_format, "path": str(pred_writer.path)},
+            "checkpoint": {"dir": str(checkpoint.path), "resumed_tasks": len(restored)},
+            "queue": (
+                {"dir": str(work_queue.root), "lease_timeout_s": work_queue.lease_timeout}
+                if work_queue is not None
+                else None
+            ),
+            "result_cache": {
+                "dir": str(result_cache_dir) if result_cache_dir else None,
+                "hits": cache_counts["hit"],
+                "misses": cache_counts["miss"],
+                "pruned": cache_pruned,
+            },
         },
     )
     report_md = build_markdown_report(
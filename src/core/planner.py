@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import heapq
+
+from src.core.cost_model import DEFAULT_TIMINGS_PATH, TaskTimingStore, estimate_trial
+from src.core.model_specs import (
+    budget_series_length,
+    build_adaptive_search,
+    expand_model_specs,
+    format_model_label,
+    is_adaptive,
+    model_category,
+    site_payload,
+)
+from src.core.result_cache import DEFAULT_RESULT_CACHE_DIR, has_cached_result, result_cache_key, site_fingerprint
+from src.core.search import ORIGINS, TPESpec, rung_params
+
+# Rough resident size of the interpreter with numpy/sklearn imported, per process.
+_BASE_PROCESS_MB = 150.0
+# Bytes held per prediction (a PredictionBlock row) while its task is in flight.
+_PRED_ROW_BYTES = 36
+# Copies of the design matrix a fit keeps alive (features, targets, estimator internals).
+_DESIGN_COPIES = {"boost": 3.0, "forest": 3.0, "nn": 3.0, "linear": 2.0, "baseline": 0.0}
+
+
+def _site_sizes(dataset: dict, sites: list[str]) -> dict[str, tuple[int, int, list[str] | None]]:
+    sizes: dict[str, tuple[int, int, list[str] | None]] = {}
+    for site_id in sites:
+        series, exog, timestamps = site_payload(dataset[site_id])
+        sizes[site_id] = (len(series), len(exog.columns) if exog is not None else 0, timestamps)
+    return sizes
+
+
+def _fit_memory_mb(model_name: str, category: str, params: dict, n_series: int, n_exog: int) -> float:
+    n_features = int(params.get("lags", 12)) + 1
+    if model_name != "linear_ar":
+        # Exog models default to every exog column when feature_cols is not given.
+        n_features += len(params.get("feature_cols") or []) or n_exog
+    return _DESIGN_COPIES.get(category, 1.0) * n_series * n_features * 8 / 1e6
+
+
+def simulate_wall_time(tasks: list[dict], max_workers: int, category_limits: dict[str, int]) -> float:
+    """Makespan of running `tasks` in order under the orchestrator's admission rules."""
+    if max_workers <= 1:
+        return sum(t["expected_s"] for t in tasks)
+    now = 0.0
+    pending = list(tasks)
+    running: list[tuple[float, int, str]] = []
+    by_cat: dict[str, int] = {}
+    seq = 0
+    while pending or running:
+        waiting = []
+        for task in pending:
+            cat = task["category"]
+            if len(running) >= max_workers or by_cat.get(cat, 0) >= category_limits.get(cat, max_workers):
+                waiting.append(task)
+                continue
+            heapq.heappush(running, (now + task["expected_s"], seq, cat))
+            seq += 1
+            by_cat[cat] = by_cat.get(cat, 0) + 1
+        pending = waiting
+        now, _, cat = heapq.heappop(running)
+        by_cat[cat] -= 1
+    return now
+
+
+def build_plan(config: dict, dataset: dict, timing_store: TaskTimingStore | None = None) -> dict:
+    """Per-trial work, time and memory estimate for a config, without fitting anything.
+
+    Mirrors `run_experiment`: the same model expansion and seeds, origin and
+    refit counts from the runner, and timings from the run history.
+    """
+    exp_cfg = config.get("experiment", {})
+    models_cfg = config.get("models", [])
+    train_size = int(exp_cfg.get("train_size", 120))
+    refit_each_origin = bool(exp_cfg.get("refit_each_origin", True))
+    refit_every = exp_cfg.get("refit_every")
+    max_workers = int(exp_cfg.get("max_workers", 1))
+    model_type_limits = exp_cfg.get("model_type_limits", {}) or {}
+    horizons = list(exp_cfg.get("horizons", [1, 2, 4]))
+    sites = list(exp_cfg.get("sites", list(dataset.keys())))
+    schedule = str(exp_cfg.get("schedule", "cost")).lower()
+    seed = int(exp_cfg.get("search_seed", 42))
+    model_specs = expand_model_specs(models_cfg=models_cfg, seed=seed)
+    if timing_store is None:
+        timing_store = TaskTimingStore(exp_cfg.get("timing_history") or DEFAULT_TIMINGS_PATH)
+
+    sizes = _site_sizes(dataset, sites)
+    result_cache_dir = exp_cfg.get("result_cache", DEFAULT_RESULT_CACHE_DIR)
+    fingerprints = (
+        {site_id: site_fingerprint(*site_payload(dataset[site_id])) for site_id in sites} if result_cache_dir else {}
+    )
+    # (name, params, label, budget, resource, stage) per variant; adaptive searches contribute
+    # every rung, assuming promotions keep the first candidates of each bracket.
+    variants = [(spec["name"], spec["params"], spec["label"], 1.0, ORIGINS, "final") for spec in model_specs]
+    searches = [build_adaptive_search(m, seed=seed) for m in models_cfg if is_adaptive(m)]
+    for search in searches:
+        if isinstance(search, TPESpec):
+            # Sizes only: the sampler's startup draws stand in for the proposals.
+            sampler = search.sampler()
+            drawn: list[dict] = []
+            for i in range(search.max_trials):
+                drawn.append(sampler.suggest(exclude=drawn))
+                stage = "final" if i < search.keep else "search"
+                variants.append((search.name, drawn[-1], format_model_label(search.name, drawn[-1]), 1.0, ORIGINS, stage))
+            continue
+        for bracket in search.brackets:
+            for rung in bracket.rungs:
+                stage = "final" if rung.budget >= 1.0 else "search"
+                for params in bracket.candidates[: rung.n_candidates]:
+                    label = format_model_label(search.name, params)
+                    variants.append((search.name, params, label, rung.budget, search.resource, stage))
+
+    tasks: list[dict] = []
+    for name, base_params, label, budget, resource, stage in variants:
+        category = model_category(name)
+        params = rung_params(base_params, resource, budget)
+        for site_id in sites:
+            n_series, n_exog, timestamps = sizes[site_id]
+            series_length = None
+            if resource == ORIGINS and budget < 1.0:
+                n_series = series_length = budget_series_length(n_series, train_size, horizons, budget)
+                timestamps = timestamps[:n_series] if timestamps is not None else None
+            est = estimate_trial(
+                timing_store,
+                name,
+                params,
+                category,
+                n_series=n_series,
+                train_size=train_size,
+                horizons=horizons,
+                refit_each_origin=refit_each_origin,
+                refit_every=refit_every,
+                timestamps=timestamps,
+            )
+            sig = est["signature"]
+            if result_cache_dir:
+                key = result_cache_key(
+                    name,
+                    params,
+                    label,
+                    site_id,
+                    fingerprints[site_id],
+                    horizons=horizons,
+                    train_size=train_size,
+                    refit_each_origin=refit_each_origin,
+                    refit_every=refit_every,
+                    series_length=series_length,
+                )
+                if has_cached_result(result_cache_dir, key):
+                    est = {**est, "expected_s": 0.0, "estimate_source": "result_cache"}
+            tasks.append(
+                {
+                    "model_label": label,
+                    "model_name": name,
+                    "category": category,
+                    "site_id": site_id,
+                    "stage": stage,
+                    "budget": round(budget, 6),
+                    "n_series": n_series,
+                    "n_origins": sig["n_origins"],
+                    "n_fits": sig["n_fits"],
+                    "n_predictions": sig["n_origins"] * len(horizons),
+                    "expected_s": round(est["expected_s"], 4),
+                    "estimate_source": est["estimate_source"],
+                    "fit_memory_mb": round(_fit_memory_mb(name, category, params, n_series, n_exog), 2),
+                }
+            )
+    if schedule == "cost" and max_workers > 1:
+        tasks.sort(key=lambda t: -t["expected_s"])
+
+    category_limits = {
+        cat: max(1, int(model_type_limits.get(cat, max_workers)))
+        for cat in ("boost", "forest", "nn", "linear", "baseline")
+    }
+    dataset_mb = sum(n * (1 + n_exog) * 8 + n * 64 for n, n_exog, _ in sizes.values()) / 1e6
+    n_predictions = sum(t["n_predictions"] for t in tasks)
+    concurrent_fit_mb = sum(sorted((t["fit_memory_mb"] for t in tasks), reverse=True)[: max(1, max_workers)])
+    executor = str(exp_cfg.get("executor", "thread")).lower()
+    n_processes = 1 + (max_workers if executor in ("process", "auto") and max_workers > 1 else 0)
+    # Parent copy + shared-memory copy of the dataset, the largest fits running together,
+    # the prediction rows of the largest tasks finishing together (rows are streamed to
+    # disk as each task completes), and interpreter overhead per process.
+    in_flight_rows = sum(sorted((t["n_predictions"] for t in tasks), reverse=True)[: max(1, max_workers)])
+    peak_mb = (
+        2 * dataset_mb
+        + concurrent_fit_mb
+        + in_flight_rows * _PRED_ROW_BYTES / 1e6
+        + _BASE_PROCESS_MB * n_processes
+    )
+
+    return {
+        "experiment": exp_cfg.get("name", "demo_experiment"),
+        "n_sites": len(sites),
+        "n_model_variants": len(model_specs),
+        "n_adaptive_searches": len(searches),
+        "n_tasks": len(tasks),
+        "max_workers": max_workers,
+        "executor": executor,
+        "schedule": schedule,
+        "total_origins": sum(t["n_origins"] for t in tasks),
+        "total_fits": sum(t["n_fits"] for t in tasks),
+        "total_predictions": n_predictions,
+        "estimated_serial_s": round(sum(t["expected_s"] for t in tasks), 2),
+        "estimated_wall_s": round(simulate_wall_time(tasks, max_workers, category_limits), 2),
+        "dataset_mb": round(dataset_mb, 2),
+        "estimated_peak_mb": round(peak_mb, 1),
+        "tasks_with_history": sum(1 for t in tasks if t["estimate_source"] != "prior"),
+        "tasks_cached": sum(1 for t in tasks if t["estimate_source"] == "result_cache"),
+        "tasks": tasks,
+    }
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from itertools import count
+import os
+from pathlib import Path
+import tempfile
+from typing import Any
+from urllib.parse import quote
+
+import numpy as np
+
+from src.core.predictions import PREDICTION_COLUMNS, PredictionBlock
+from src.utils.io import CsvRowWriter, ensure_dir
+
+PREDICTION_FORMATS = ("csv", "parquet", "arrow")
+
+
+class ColumnarPredictionWriter:
+    """Predictions as Parquet or Arrow IPC files, partitioned by site and model.
+
+    Every `write` adds one file per block (one site and model) under
+    `root/site_id=<site>/model_name=<model>/` (hive layout, names URI-encoded),
+    written to a temp name and renamed, so an interrupted run leaves only
+    complete parts. `site_id`/`model_name` are dictionary-encoded and a
+    missing wind speed is null. Read back with `pyarrow.parquet.read_table(root)`
+    or `pyarrow.dataset` with hive partitioning.
+    """
+
+    def __init__(self, root: str | Path, fmt: str) -> None:
+        if fmt not in ("parquet", "arrow"):
+            raise ValueError(f"columnar predictions format must be 'parquet' or 'arrow', got {fmt!r}")
+        try:
+            import pyarrow as pa
+        except ImportError as exc:
+            raise RuntimeError(f"predictions_format {fmt!r} requires the pyarrow package") from exc
+        self._pa = pa
+        self.path = Path(root)
+        self.format = fmt
+        self.n_rows = 0
+        self._parts = count()
+        self._schema = pa.schema(
+            [
+                ("site_id", pa.dictionary(pa.int32(), pa.string())),
+                ("model_name", pa.dictionary(pa.int32(), pa.string())),
+                ("origin_index", pa.int64()),
+                ("horizon", pa.int64()),
+                ("timestamp", pa.string()),
+                ("wind_speed", pa.float64()),
+                ("y_true", pa.float64()),
+                ("y_pred", pa.float64()),
+            ]
+        )
+
+    def _table(self, block: PredictionBlock):
+        pa = self._pa
+        n = len(block)
+        columns = {
+            "site_id": pa.DictionaryArray.from_arrays(pa.array([0] * n, pa.int32()), [block.site_id]),
+            "model_name": pa.DictionaryArray.from_arrays(pa.array([0] * n, pa.int32()), [block.model_name]),
+            "origin_index": pa.array(block.origin_index, pa.int64()),
+            "horizon": pa.array(block.horizon, pa.int64()),
+            "timestamp": pa.array(block.timestamp_strings(), pa.string()),
+            "wind_speed": pa.array(block.wind_speed, pa.float64(), mask=np.isnan(block.wind_speed)),
+            "y_true": pa.array(block.y_true, pa.float64()),
+            "y_pred": pa.array(block.y_pred, pa.float64()),
+        }
+        return pa.Table.from_pydict(columns, schema=self._schema)
+
+    def _write_table(self, table, target: Path) -> None:
+        ensure_dir(target.parent)
+        fd, tmp = tempfile.mkstemp(prefix=f".{target.name}.", dir=target.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if self.format == "parquet":
+                    import pyarrow.parquet as pq
+
+                    pq.write_table(table, f)
+                else:
+                    import pyarrow.feather as feather
+
+                    feather.write_feather(table, f, compression="uncompressed")
+                # The part is complete on disk before it becomes visible under its final name.
+                f.flush()
+            os.replace(tmp, target)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def write(self, preds: PredictionBlock | list[dict[str, Any]]) -> None:
+        blocks = [preds] if isinstance(preds, PredictionBlock) else _blocks_from_rows(preds)
+        for block in blocks:
+            if len(block) == 0:
+                continue
+            target = (
+                self.path
+                / f"site_id={quote(block.site_id, safe='')}"
+                / f"model_name={quote(block.model_name, safe='')}"
+                / f"part-{next(self._parts):05d}.{self.format}"
+            )
+            self._write_table(self._table(block), target)
+            self.n_rows += len(block)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> ColumnarPredictionWriter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def _blocks_from_rows(rows: list[dict[str, Any]]) -> list[PredictionBlock]:
+    partitions: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    for row in rows:
+        partitions.setdefault((str(row["site_id"]), str(row["model_name"])), []).append(row)
+    return [PredictionBlock.from_rows(part) for part in partitions.values()]
+
+
+class CsvPredictionWriter(CsvRowWriter):
+    """`predictions.csv`, written straight from block columns."""
+
+    def write(self, preds: PredictionBlock | list[dict[str, Any]]) -> None:
+        if isinstance(preds, PredictionBlock):
+            self.write_columns(preds.columns())
+        else:
+            super().write(preds)
+
+
+def open_prediction_writer(out_dir: str | Path, fmt: str = "csv") -> CsvPredictionWriter | ColumnarPredictionWriter:
+    """Writer for a run's prediction rows: `predictions.csv`, or a partitioned `predictions/` directory."""
+    fmt = str(fmt).lower()
+    if fmt not in PREDICTION_FORMATS:
+        raise ValueError(f"experiment.predictions_format must be one of {PREDICTION_FORMATS}, got {fmt!r}")
+    if fmt == "csv":
+        return CsvPredictionWriter(Path(out_dir) / "predictions.csv")
+    return ColumnarPredictionWriter(Path(out_dir) / "predictions", fmt)
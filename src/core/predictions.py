@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+PREDICTION_COLUMNS = (
+    "site_id",
+    "model_name",
+    "origin_index",
+    "horizon",
+    "timestamp",
+    "wind_speed",
+    "y_true",
+    "y_pred",
+)
+
+
+class PredictionBlock:
+    """One backtest's predictions as typed columns instead of a dict per row.
+
+    `site_id`/`model_name` are stored once and timestamps as indices into a
+    shared list (-1 for none), so a row costs about 36 bytes. A missing wind
+    speed is NaN. Iterating yields the familiar row dicts, so code that only
+    needs a few rows (or tests) can keep treating a block as a list.
+    """
+
+    __slots__ = (
+        "site_id",
+        "model_name",
+        "origin_index",
+        "horizon",
+        "timestamp_index",
+        "y_true",
+        "y_pred",
+        "wind_speed",
+        "timestamps",
+    )
+
+    def __init__(
+        self,
+        site_id: str,
+        model_name: str,
+        origin_index: np.ndarray,
+        horizon: np.ndarray,
+        y_true: np.ndarray,
+        y_pred: np.ndarray,
+        wind_speed: np.ndarray | None = None,
+        timestamp_index: np.ndarray | None = None,
+        timestamps: Sequence[str] | None = None,
+    ) -> None:
+        n = len(origin_index)
+        self.site_id = str(site_id)
+        self.model_name = str(model_name)
+        self.origin_index = np.asarray(origin_index, dtype=np.int32)
+        self.horizon = np.asarray(horizon, dtype=np.int32)
+        self.y_true = np.asarray(y_true, dtype=float)
+        self.y_pred = np.asarray(y_pred, dtype=float)
+        self.wind_speed = np.full(n, np.nan) if wind_speed is None else np.asarray(wind_speed, dtype=float)
+        self.timestamp_index = (
+            np.full(n, -1, dtype=np.int32) if timestamp_index is None else np.asarray(timestamp_index, dtype=np.int32)
+        )
+        self.timestamps = timestamps if timestamps is not None else []
+        for name in ("horizon", "y_true", "y_pred", "wind_speed", "timestamp_index"):
+            if len(getattr(self, name)) != n:
+                raise ValueError(f"PredictionBlock column {name!r} has {len(getattr(self, name))} rows, expected {n}")
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Mapping[str, Any]]) -> PredictionBlock:
+        """Block from prediction row dicts of one site and model."""
+        if not rows:
+            raise ValueError("PredictionBlock.from_rows needs at least one row to name the site and model")
+        first = rows[0]
+        stamps: dict[str, int] = {}
+        ts_index = [stamps.setdefault(str(r.get("timestamp", "")), len(stamps)) for r in rows]
+        return cls(
+            site_id=first["site_id"],
+            model_name=first["model_name"],
+            origin_index=[int(r["origin_index"]) for r in rows],
+            horizon=[int(r["horizon"]) for r in rows],
+            y_true=[float(r["y_true"]) for r in rows],
+            y_pred=[float(r["y_pred"]) for r in rows],
+            wind_speed=[np.nan if r.get("wind_speed") in ("", None) else float(r["wind_speed"]) for r in rows],
+            timestamp_index=ts_index,
+            timestamps=list(stamps),
+        )
+
+    def __len__(self) -> int:
+        return len(self.origin_index)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            int(getattr(self, name).nbytes)
+            for name in ("origin_index", "horizon", "timestamp_index", "y_true", "y_pred", "wind_speed")
+        )
+
+    def timestamp_strings(self) -> list[str]:
+        stamps = self.timestamps
+        return [stamps[i] if i >= 0 else "" for i in self.timestamp_index.tolist()]
+
+    def columns(self) -> dict[str, list]:
+        """Plain Python columns in `PREDICTION_COLUMNS` order, as they appear in a row dict."""
+        n = len(self)
+        wind = self.wind_speed.tolist()
+        return {
+            "site_id": [self.site_id] * n,
+            "model_name": [self.model_name] * n,
+            "origin_index": self.origin_index.tolist(),
+            "horizon": self.horizon.tolist(),
+            "timestamp": self.timestamp_strings(),
+            "wind_speed": ["" if w != w else w for w in wind],
+            "y_true": self.y_true.tolist(),
+            "y_pred": self.y_pred.tolist(),
+        }
+
+    def to_rows(self) -> list[dict]:
+        cols = self.columns()
+        return [dict(zip(PREDICTION_COLUMNS, values)) for values in zip(*cols.values())]
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.to_rows())
+
+    def __getitem__(self, i: int) -> dict:
+        i = range(len(self))[i]
+        wind = float(self.wind_speed[i])
+        ts = int(self.timestamp_index[i])
+        return {
+            "site_id": self.site_id,
+            "model_name": self.model_name,
+            "origin_index": int(self.origin_index[i]),
+            "horizon": int(self.horizon[i]),
+            "timestamp": self.timestamps[ts] if ts >= 0 else "",
+            "wind_speed": "" if wind != wind else wind,
+            "y_true": float(self.y_true[i]),
+            "y_pred": float(self.y_pred[i]),
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PredictionBlock):
+            return NotImplemented
+        return (
+            self.site_id == other.site_id
+            and self.model_name == other.model_name
+            and np.array_equal(self.origin_index, other.origin_index)
+            and np.array_equal(self.horizon, other.horizon)
+            and np.array_equal(self.y_true, other.y_true, equal_nan=True)
+            and np.array_equal(self.y_pred, other.y_pred, equal_nan=True)
+            and np.array_equal(self.wind_speed, other.wind_speed, equal_nan=True)
+            and self.timestamp_strings() == other.timestamp_strings()
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-friendly form holding only the timestamps this block refers to."""
+        used = np.unique(self.timestamp_index[self.timestamp_index >= 0])
+        ts_index = np.where(self.timestamp_index >= 0, np.searchsorted(used, self.timestamp_index), -1)
+        return {
+            "site_id": self.site_id,
+            "model_name": self.model_name,
+            "origin_index": self.origin_index.tolist(),
+            "horizon": self.horizon.tolist(),
+            "y_true": self.y_true.tolist(),
+            "y_pred": self.y_pred.tolist(),
+            "wind_speed": self.wind_speed.tolist(),
+            "timestamp_index": ts_index.tolist(),
+            "timestamps": [self.timestamps[i] for i in used.tolist()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> PredictionBlock:
+        return cls(
+            site_id=data["site_id"],
+            model_name=data["model_name"],
+            origin_index=data["origin_index"],
+            horizon=data["horizon"],
+            y_true=data["y_true"],
+            y_pred=data["y_pred"],
+            wind_speed=data["wind_speed"],
+            timestamp_index=data["timestamp_index"],
+            timestamps=list(data["timestamps"]),
+        )
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from functools import lru_cache
+import hashlib
+from importlib import metadata
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any
+
+import numpy as np
+
+from src.core.cost_model import params_key
+from src.core.predictions import PredictionBlock
+from src.data.exog import ExogMatrix
+from src.utils.io import read_json_gz, write_json_gz
+
+# Bump when the entry layout changes; old entries are then ignored.
+CACHE_VERSION = 2
+DEFAULT_RESULT_CACHE_DIR = "outputs/cache/results"
+DEFAULT_RESULT_CACHE_MAX_MB = 2048.0
+
+# Numerical libraries whose releases can change a model's predictions.
+_KEY_LIBRARIES = ("numpy", "scikit-learn", "lightgbm", "xgboost")
+
+_SRC_ROOT = Path(__file__).resolve().parents[1]
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash of every module under src/, so any change to models or the runner invalidates old results."""
+    digest = hashlib.sha256()
+    for path in sorted(_SRC_ROOT.rglob("*.py")):
+        digest.update(str(path.relative_to(_SRC_ROOT)).encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+@lru_cache(maxsize=1)
+def library_versions() -> dict[str, str | None]:
+    """Installed versions of the libraries the models run on; None for one that is not installed."""
+    versions: dict[str, str | None] = {}
+    for name in _KEY_LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def site_fingerprint(series: np.ndarray, exog: ExogMatrix | None, timestamps: list[str] | None) -> str:
+    """Content hash of one site's series, exog matrix and timestamps."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(series, dtype=float).tobytes())
+    if exog is not None:
+        digest.update(json.dumps(list(exog.columns)).encode("utf-8"))
+        digest.update(np.ascontiguousarray(exog.values, dtype=float).tobytes())
+    if timestamps is not None:
+        digest.update("\n".join(timestamps).encode("utf-8"))
+    return digest.hexdigest()[:24]
+
+
+def result_cache_key(
+    model_name: str,
+    params: dict,
+    model_label: str,
+    site_id: str,
+    dataset_fingerprint: str,
+    horizons: list[int],
+    train_size: int,
+    refit_each_origin: bool,
+    refit_every: int | str | None,
+    series_length: int | None = None,
+) -> str:
+    """Key for one backtest: everything that determines its prediction rows."""
+    inputs = {
+        "version": CACHE_VERSION,
+        "code": code_version(),
+        "libraries": library_versions(),
+        "model_name": model_name,
+        "params": params_key(params),
+        "model_label": model_label,
+        "site_id": site_id,
+        "dataset": dataset_fingerprint,
+        "horizons": [int(h) for h in horizons],
+        "train_size": int(train_size),
+        "refit_each_origin": bool(refit_each_origin),
+        "refit_every": refit_every,
+        "series_length": series_length,
+    }
+    blob = json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:32]
+
+
+def _entry_path(cache_dir: str | Path, key: str) -> Path:
+    return Path(cache_dir) / key[:2] / f"{key}.json.gz"
+
+
+def has_cached_result(cache_dir: str | Path, key: str) -> bool:
+    return _entry_path(cache_dir, key).exists()
+
+
+def save_cached_result(cache_dir: str | Path, key: str, preds: PredictionBlock, timings: dict[str, Any]) -> Path:
+    """Store a backtest's predictions (and how long they took) under `key`."""
+    return write_json_gz(_entry_path(cache_dir, key), {"key": key, "timings": timings, "preds": preds.to_dict()})
+
+
+def load_cached_result(cache_dir: str | Path, key: str) -> PredictionBlock | None:
+    """Predictions stored under `key`, or None if the entry is absent or unreadable."""
+    path = _entry_path(cache_dir, key)
+    entry = read_json_gz(path)
+    if not isinstance(entry, dict) or entry.get("key") != key or "preds" not in entry:
+        return None
+    try:
+        # A hit counts as a use, so pruning drops the least recently used entries first.
+        os.utime(path)
+    except OSError:
+        pass
+    return PredictionBlock.from_dict(entry["preds"])
+
+
+def prune_result_cache(
+    cache_dir: str | Path,
+    max_mb: float | None = None,
+    max_age_days: float | None = None,
+    now: float | None = None,
+) -> dict[str, float]:
+    """Delete entries unused for `max_age_days`, then the least recently used until the cache fits in `max_mb`."""
+    entries = []
+    for path in Path(cache_dir).glob("*/*.json.gz"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, str(path), stat.st_size))
+    entries.sort()
+    now = time.time() if now is None else now
+    total = sum(size for _, _, size in entries)
+    removed, freed = 0, 0
+    for mtime, path, size in entries:
+        too_old = max_age_days is not None and now - mtime > max_age_days * 86400
+        too_big = max_mb is not None and total > max_mb * 2**20
+        if not (too_old or too_big):
+            # Oldest first: nothing after this entry is older or needed to fit.
+            break
+        Path(path).unlink(missing_ok=True)
+        total -= size
+        removed += 1
+        freed += size
+    return {"removed": removed, "freed_mb": round(freed / 2**20, 2), "size_mb": round(total / 2**20, 2)}
@@ -1,65 +1,224 @@
 from __future__ import annotations
 
-from src.models.base import ForecastModel
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from datetime import datetime
+import re
+import time
+from typing import ContextManager
+
+import numpy as np
+
+from src.core.predictions import PredictionBlock
+from src.data.exog import ExogMatrix, as_exog_matrix
+from src.models.base import FloatSeries, ForecastModel
+
+
+def _readonly_series(series: FloatSeries) -> np.ndarray:
+    arr = np.asarray(series, dtype=float).view()
+    arr.flags.writeable = False
+    return arr
+
+
+def _wind_speed_column(exog: ExogMatrix | None) -> np.ndarray | None:
+    # Hub-height wind speed for segmenting, falling back to 10 m where it is missing.
+    if exog is None:
+        return None
+    wind = exog.column("wind_speed100_10")
+    fallback = exog.column("wind_speed10_10")
+    if wind is None:
+        return fallback
+    if fallback is None:
+        return wind
+    return np.where(np.isnan(wind), fallback, wind)
+
+
+def _prediction_block(
+    series: np.ndarray,
+    site_id: str,
+    model_label: str,
+    origins: list[int],
+    horizons: list[int],
+    y_pred: np.ndarray,
+    wind: np.ndarray | None,
+    timestamps: list[str] | None,
+) -> PredictionBlock:
+    # Rows are origin-major, horizons in the order given; row (origin, h) targets origin + h - 1.
+    origin_arr = np.repeat(np.asarray(origins, dtype=np.int64), len(horizons))
+    h_arr = np.tile(np.asarray(horizons, dtype=np.int64), len(origins))
+    idx = origin_arr + h_arr - 1
+    if wind is not None:
+        wind_speed = np.full(len(idx), np.nan)
+        inside = idx < len(wind)
+        wind_speed[inside] = wind[idx[inside]]
+    else:
+        wind_speed = None
+    ts_index = np.where(idx < len(timestamps), idx, -1) if timestamps else None
+    return PredictionBlock(
+        site_id=site_id,
+        model_name=model_label,
+        origin_index=origin_arr,
+        horizon=h_arr,
+        y_true=series[idx],
+        y_pred=y_pred,
+        wind_speed=wind_speed,
+        timestamp_index=ts_index,
+        timestamps=timestamps,
+    )
+
+
+@contextmanager
+def _leased_threads(model: ForecastModel, thread_lease: Callable[[], ContextManager[int]] | None) -> Iterator[None]:
+    # Hold a CPU-budget lease for one fit and the predictions made from it, and size the
+    # model's pools to it: fitted estimators keep their n_jobs when predicting.
+    if thread_lease is None:
+        yield
+        return
+    with thread_lease() as n_threads:
+        model.set_num_threads(n_threads)
+        yield
+
+
+def _record_timings(
+    timings: dict[str, float] | None, fit_s: float, predict_s: float, n_fits: int, n_predicts: int, n_origins: int
+) -> None:
+    if timings is not None:
+        timings.update(
+            {"fit_s": fit_s, "predict_s": predict_s, "n_fits": n_fits, "n_predicts": n_predicts, "n_origins": n_origins}
+        )
+
+
+_DURATION_UNITS = {"min": 60.0, "m": 60.0, "h": 3600.0, "d": 86400.0, "w": 604800.0}
+
+
+def parse_refit_every(value: int | str) -> tuple[str, float]:
+    """Parse `experiment.refit_every` into ("origins", n) or ("seconds", s).
+
+    Integers (or digit strings) count origins; strings such as "12h", "1d",
+    "30min" or "2w" are wall-clock durations measured on the timestamps.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid refit_every: {value!r}")
+    if isinstance(value, (int, float)):
+        if int(value) < 1:
+            raise ValueError("refit_every must be >= 1 origin")
+        return "origins", float(int(value))
+    text = str(value).strip().lower()
+    if text.isdigit():
+        return parse_refit_every(int(text))
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*(min|m|h|d|w)", text)
+    if not match or float(match.group(1)) <= 0:
+        raise ValueError(f"Invalid refit_every: {value!r} (use origins like 96 or durations like 12h, 1d)")
+    return "seconds", float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+
+
+def _refit_positions(
+    origins: list[int],
+    refit_each_origin: bool,
+    refit_every: int | str | None,
+    timestamps: list[str] | None,
+) -> list[int]:
+    # Positions in `origins` at which the model is (re)fitted; position 0 always fits.
+    if not origins:
+        return []
+    if refit_every is None:
+        return list(range(len(origins))) if refit_each_origin else [0]
+
+    unit, step = parse_refit_every(refit_every)
+    if unit == "origins":
+        return list(range(0, len(origins), int(step)))
+
+    if not timestamps or len(timestamps) <= origins[-1]:
+        raise ValueError("Time-based refit_every requires timestamps for every origin")
+    positions = [0]
+    last = datetime.strptime(timestamps[origins[0]].strip(), "%Y/%m/%d %H:%M")
+    for pos in range(1, len(origins)):
+        ts = datetime.strptime(timestamps[origins[pos]].strip(), "%Y/%m/%d %H:%M")
+        if (ts - last).total_seconds() >= step:
+            positions.append(pos)
+            last = ts
+    return positions
+
+
+def count_backtest_work(
+    n_series: int,
+    train_size: int,
+    horizons: list[int],
+    refit_each_origin: bool = True,
+    refit_every: int | str | None = None,
+    timestamps: list[str] | None = None,
+) -> tuple[int, int]:
+    """(origins, fits) that `run_backtest` will perform, without running anything."""
+    origins = list(range(train_size, n_series - max(horizons) + 1))
+    return len(origins), len(_refit_positions(origins, refit_each_origin, refit_every, timestamps))
 
 
 def run_backtest(
-    series: list[float],
+    series: FloatSeries,
     site_id: str,
     model: ForecastModel,
     model_label: str,
     horizons: list[int],
     train_size: int,
-    exog_rows: list[dict[str, float]] | None = None,
+    exog: ExogMatrix | Sequence[Mapping[str, float] | None] | None = None,
     timestamps: list[str] | None = None,
     refit_each_origin: bool = True,
-) -> list[dict]:
+    refit_every: int | str | None = None,
+    thread_lease: Callable[[], ContextManager[int]] | None = None,
+    timings: dict[str, float] | None = None,
+) -> PredictionBlock:
+    """Walk-forward backtest from `train_size`; one prediction per (origin, horizon).
+
+    If `timings` is given it receives `fit_s`, `predict_s`, `n_fits`,
+    `n_predicts` (model predict calls) and `n_origins` for the call.
+    """
     if not horizons:
         raise ValueError("horizons must not be empty")
 
     max_h = max(horizons)
-    rows: list[dict] = []
-    if not refit_each_origin:
-        exog_history = exog_rows[:train_size] if exog_rows else None
-        model.fit(series[:train_size], exog_history=exog_history)
-
-    for origin in range(train_size, len(series) - max_h + 1):
-        history = series[:origin]
-        if refit_each_origin:
-            exog_history = exog_rows[:origin] if exog_rows else None
-            model.fit(history, exog_history=exog_history)
-        for h in horizons:
-            y_true = series[origin + h - 1]
-            idx = origin + h - 1
-            exog_future = exog_rows[idx] if exog_rows and idx < len(exog_rows) else None
-            exog_future_seq = (
-                [exog_rows[origin + step] if origin + step < len(exog_rows) else None for step in range(h)]
-                if exog_rows
-                else None
-            )
-            y_pred = model.predict(
-                history,
-                h,
-                exog_future=exog_future,
-                exog_future_seq=exog_future_seq,
-            )
-            wind_speed = None
-            if exog_future:
-                if "wind_speed100_10" in exog_future:
-                    wind_speed = exog_future["wind_speed100_10"]
-                elif "wind_speed10_10" in exog_future:
-                    wind_speed = exog_future["wind_speed10_10"]
-
-            rows.append(
-                {
-                    "site_id": site_id,
-                    "model_name": model_label,
-                    "origin_index": origin,
-                    "horizon": h,
-                    "timestamp": timestamps[idx] if timestamps and idx < len(timestamps) else "",
-                    "wind_speed": float(wind_speed) if wind_speed is not None else "",
-                    "y_true": float(y_true),
-                    "y_pred": float(y_pred),
-                }
-            )
-    return rows
+    # Histories below are read-only views into one array; no per-origin copies.
+    series = _readonly_series(series)
+    exog = as_exog_matrix(exog)
+    wind = _wind_speed_column(exog)
+    origins = list(range(train_size, len(series) - max_h + 1))
+    refit_positions = _refit_positions(origins, refit_each_origin, refit_every, timestamps)
+    # y_pred[i, j]: origin i, horizon j.
+    y_pred = np.empty((len(origins), len(horizons)), dtype=float)
+    fit_s = 0.0
+    predict_s = 0.0
+
+    if len(refit_positions) == len(origins):
+        for i, origin in enumerate(origins):
+            history = series[:origin]
+            exog_history = exog[:origin] if exog is not None else None
+            t0 = time.perf_counter()
+            with _leased_threads(model, thread_lease):
+                model.fit(history, exog_history=exog_history)
+                t1 = time.perf_counter()
+                # One rollout to max_h serves every requested horizon.
+                exog_future = exog[origin : origin + max_h] if exog is not None else None
+                path = model.predict_path(history, max_h, exog_future=exog_future)
+            fit_s += t1 - t0
+            predict_s += time.perf_counter() - t1
+            for j, h in enumerate(horizons):
+                y_pred[i, j] = path[h - 1]
+        _record_timings(timings, fit_s, predict_s, len(refit_positions), len(origins), len(origins))
+        return _prediction_block(series, site_id, model_label, origins, horizons, y_pred.ravel(), wind, timestamps)
+
+    # Between refits the fitted model is fixed, so each segment is predicted in one batch.
+    bounds = refit_positions + [len(origins)]
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        fit_origin = origins[start]
+        exog_history = exog[:fit_origin] if exog is not None else None
+        t0 = time.perf_counter()
+        with _leased_threads(model, thread_lease):
+            model.fit(series[:fit_origin], exog_history=exog_history)
+            t1 = time.perf_counter()
+            segment = origins[start:stop]
+            batch = model.predict_batch(series, segment, horizons, exog=exog)
+        fit_s += t1 - t0
+        predict_s += time.perf_counter() - t1
+        for j, h in enumerate(horizons):
+            y_pred[start:stop, j] = batch[h]
+    _record_timings(timings, fit_s, predict_s, len(refit_positions), len(refit_positions), len(origins))
+    return _prediction_block(series, site_id, model_label, origins, horizons, y_pred.ravel(), wind, timestamps)
@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from itertools import product
+import math
+import random
+import time
+
+import numpy as np
+
+from src.core.predictions import PredictionBlock
+
+BRACKET_METHODS = ("halving", "hyperband")
+TPE = "tpe"
+ADAPTIVE_METHODS = BRACKET_METHODS + (TPE,)
+# Default resource: the share of backtest origins a rung evaluates. Any integer model
+# param (n_estimators, max_iter) can be used instead, scaled by the rung budget.
+ORIGINS = "origins"
+
+
+@dataclass(frozen=True)
+class Range:
+    """A continuous `params_grid` entry: `{low: .., high: .., log: true, type: int}`."""
+
+    low: float
+    high: float
+    log: bool = False
+    integer: bool = False
+
+
+@dataclass(frozen=True)
+class Rung:
+    n_candidates: int
+    budget: float
+
+
+@dataclass(frozen=True)
+class Bracket:
+    rungs: tuple[Rung, ...]
+    candidates: tuple[dict, ...]
+
+
+@dataclass(frozen=True)
+class SearchSpec:
+    """One `models` entry searched with successive halving or hyperband."""
+
+    name: str
+    method: str
+    eta: int
+    resource: str
+    time_budget_s: float | None
+    brackets: tuple[Bracket, ...]
+
+
+def grid_combos(grid: dict) -> list[dict]:
+    if any(isinstance(v, (dict, Range)) for v in grid.values()):
+        raise ValueError("Continuous params_grid ranges are only supported by search.method: tpe")
+    keys = sorted(grid.keys())
+    return [dict(zip(keys, combo)) for combo in product(*(list(grid[k]) for k in keys))]
+
+
+def _max_steps(eta: int, ratio: float) -> int:
+    # Largest s with eta**s <= ratio, in integers so 27 ** (1/3) does not round down.
+    s = 0
+    while eta ** (s + 1) <= ratio * (1 + 1e-9):
+        s += 1
+    return s
+
+
+def _rungs(n_candidates: int, eta: int, steps: int) -> tuple[Rung, ...]:
+    return tuple(Rung(max(1, n_candidates // eta**i), float(eta) ** (i - steps)) for i in range(steps + 1))
+
+
+def halving_rungs(n_candidates: int, eta: int, min_budget: float | None = None) -> tuple[Rung, ...]:
+    """Rungs of one successive-halving bracket; each keeps the best 1/eta and multiplies the budget by eta.
+
+    The last rung always runs at the full budget. Without `min_budget` there are
+    as many rungs as halvings the candidate count allows.
+    """
+    steps = _max_steps(eta, n_candidates)
+    if min_budget is not None:
+        steps = min(steps, _max_steps(eta, 1.0 / min_budget))
+    return _rungs(n_candidates, eta, steps)
+
+
+def hyperband_brackets(eta: int, min_budget: float) -> list[tuple[int, tuple[Rung, ...]]]:
+    """(candidates, rungs) per hyperband bracket, from most exploratory to plain full-budget search."""
+    s_max = _max_steps(eta, 1.0 / min_budget)
+    brackets = []
+    for s in range(s_max, -1, -1):
+        n = math.ceil((s_max + 1) / (s + 1) * eta**s)
+        brackets.append((n, _rungs(n, eta, s)))
+    return brackets
+
+
+def build_search(model_cfg: dict, seed: int) -> SearchSpec:
+    """Sample candidates and lay out the rungs for a `search.method: halving|hyperband` entry."""
+    name = model_cfg["name"]
+    search_cfg = model_cfg.get("search", {}) or {}
+    method = str(search_cfg.get("method", "")).lower()
+    if method not in BRACKET_METHODS:
+        raise ValueError(f"{name}: search.method must be one of {BRACKET_METHODS} for bracket search")
+    grid = model_cfg.get("params_grid") or {}
+    combos = grid_combos(grid) if grid else [dict(model_cfg.get("params", {}))]
+    eta = int(search_cfg.get("eta", 3))
+    if eta < 2:
+        raise ValueError(f"{name}: search.eta must be >= 2")
+    min_budget = search_cfg.get("min_budget")
+    if min_budget is not None:
+        min_budget = float(min_budget)
+        if not 0.0 < min_budget <= 1.0:
+            raise ValueError(f"{name}: search.min_budget must be in (0, 1]")
+    resource = str(search_cfg.get("resource", ORIGINS))
+    if resource != ORIGINS and not all(isinstance(c.get(resource), int) for c in combos):
+        raise ValueError(f"{name}: search.resource '{resource}' must be an integer param of every candidate")
+    time_budget_s = search_cfg.get("time_budget_s")
+    max_trials = int(search_cfg.get("max_trials", 0))
+    rng = random.Random(f"{seed}:{name}")
+
+    if method == "halving":
+        if 0 < max_trials < len(combos):
+            combos = rng.sample(combos, k=max_trials)
+        brackets = (Bracket(halving_rungs(len(combos), eta, min_budget), tuple(combos)),)
+    else:
+        capped = []
+        for n, rungs in hyperband_brackets(eta, min_budget or 1.0 / eta**3):
+            n = min(n, len(combos), max_trials or n)
+            steps = min(len(rungs) - 1, _max_steps(eta, n))
+            capped.append(Bracket(_rungs(n, eta, steps), tuple(rng.sample(combos, k=n))))
+        brackets = tuple(capped)
+
+    return SearchSpec(
+        name=name,
+        method=method,
+        eta=eta,
+        resource=resource,
+        time_budget_s=float(time_budget_s) if time_budget_s is not None else None,
+        brackets=brackets,
+    )
+
+
+def rung_params(params: dict, resource: str, budget: float) -> dict:
+    if resource == ORIGINS or budget >= 1.0:
+        return params
+    return {**params, resource: max(1, round(params[resource] * budget))}
+
+
+def score_predictions(preds: PredictionBlock) -> float:
+    """MAE averaged over horizons for one trial's predictions; inf if there are none."""
+    if len(preds) == 0:
+        return math.inf
+    horizons, first, inverse = np.unique(preds.horizon, return_index=True, return_inverse=True)
+    abs_err = np.zeros(len(horizons))
+    # add.at sums in row order; horizons are averaged in the order they first appear.
+    np.add.at(abs_err, inverse, np.abs(preds.y_true - preds.y_pred))
+    counts = np.bincount(inverse, minlength=len(horizons))
+    order = np.argsort(first, kind="stable")
+    score = sum(float(abs_err[i] / counts[i]) for i in order) / len(horizons)
+    return score if math.isfinite(score) else math.inf
+
+
+def run_search(
+    spec: SearchSpec,
+    evaluate: Callable[[list[tuple[dict, float]]], list[float]],
+) -> tuple[list[dict], list[dict], bool]:
+    """Run every bracket's partial-budget rungs; return (finalists, history, stopped_by_time_budget).
+
+    `evaluate` scores (params, budget) pairs, lower is better. Brackets advance
+    in lockstep so one call covers the current rung of all of them and the
+    pool stays full. Finalists are the candidates promoted to each bracket's
+    full-budget rung, which the caller runs as ordinary trials. Once
+    `time_budget_s` has passed no further rung starts, and each bracket keeps
+    its best candidates so far.
+    """
+    started = time.monotonic()
+    alive = [list(b.candidates[: b.rungs[0].n_candidates]) for b in spec.brackets]
+    history: list[dict] = []
+    timed_out = False
+    step = 0
+    while True:
+        active = [i for i, b in enumerate(spec.brackets) if step < len(b.rungs) - 1]
+        if not active:
+            break
+        if spec.time_budget_s is not None and time.monotonic() - started >= spec.time_budget_s:
+            timed_out = True
+            break
+        work = [(i, params) for i in active for params in alive[i]]
+        scores = evaluate([(params, spec.brackets[i].rungs[step].budget) for i, params in work])
+        for i in active:
+            ranked = sorted(
+                (score, pos, params)
+                for pos, ((j, params), score) in enumerate(zip(work, scores))
+                if j == i
+            )
+            keep = spec.brackets[i].rungs[step + 1].n_candidates
+            alive[i] = [params for _, _, params in ranked[:keep]]
+            for rank, (score, _, params) in enumerate(ranked):
+                history.append(
+                    {
+                        "bracket": i,
+                        "rung": step,
+                        "budget": spec.brackets[i].rungs[step].budget,
+                        "params": params,
+                        "score": score,
+                        "promoted": rank < keep,
+                    }
+                )
+        step += 1
+
+    finalists: list[dict] = []
+    for i, bracket in enumerate(spec.brackets):
+        for params in alive[i][: bracket.rungs[-1].n_candidates]:
+            if params not in finalists:
+                finalists.append(params)
+    return finalists, history, timed_out
+
+
+def parse_space(grid: dict) -> dict[str, list | Range]:
+    """`params_grid` as a search space: lists stay discrete choices, mappings become ranges."""
+    space: dict[str, list | Range] = {}
+    for key in sorted(grid):
+        value = grid[key]
+        if isinstance(value, dict):
+            low, high = float(value["low"]), float(value["high"])
+            log = bool(value.get("log", False))
+            if not low < high:
+                raise ValueError(f"params_grid.{key}: low must be < high")
+            if log and low <= 0:
+                raise ValueError(f"params_grid.{key}: log ranges need low > 0")
+            space[key] = Range(low, high, log, str(value.get("type", "float")).lower() == "int")
+        else:
+            values = list(value)
+            if not values:
+                raise ValueError(f"params_grid.{key}: no values")
+            space[key] = values
+    return space
+
+
+def _to_unit(dim: Range, value: float) -> float:
+    return math.log(value) if dim.log else float(value)
+
+
+def _from_unit(dim: Range, t: float) -> int | float:
+    value = math.exp(t) if dim.log else t
+    value = min(dim.high, max(dim.low, value))
+    if dim.integer:
+        return int(round(value))
+    # Four significant digits keep model labels readable.
+    return min(dim.high, max(dim.low, float(f"{value:.4g}")))
+
+
+class TPESampler:
+    """Tree-structured Parzen estimator over a space of discrete lists and ranges.
+
+    Until `n_startup` trials have been told, proposals are uniform. After that
+    the finished trials are split at the `gamma` quantile of their score into
+    good and bad; each param gets a Parzen density for both groups and, of
+    `n_ei_candidates` draws from the good density, the value with the highest
+    good/bad ratio is proposed. Params are modelled independently.
+    """
+
+    def __init__(
+        self,
+        space: dict[str, list | Range],
+        seed: int | str,
+        n_startup: int = 5,
+        gamma: float = 0.25,
+        n_ei_candidates: int = 24,
+    ) -> None:
+        self.space = space
+        self.rng = random.Random(seed)
+        self.n_startup = max(1, int(n_startup))
+        self.gamma = float(gamma)
+        self.n_ei_candidates = int(n_ei_candidates)
+        self.observations: list[tuple[dict, float]] = []
+
+    def tell(self, params: dict, score: float) -> None:
+        self.observations.append((params, score))
+
+    def suggest(self, exclude: list[dict] | None = None) -> dict:
+        """Next params to try, avoiding `exclude` (finished and running trials) where the space allows."""
+        exclude = exclude or []
+        for _ in range(10):
+            params = self._draw()
+            if params not in exclude:
+                return params
+        # The model keeps proposing tried points: explore instead.
+        if all(isinstance(dim, list) for dim in self.space.values()):
+            unseen = [p for p in grid_combos(self.space) if p not in exclude]
+            return self.rng.choice(unseen) if unseen else params
+        for _ in range(10):
+            params = {key: self._uniform(dim) for key, dim in self.space.items()}
+            if params not in exclude:
+                break
+        return params
+
+    def _draw(self) -> dict:
+        if len(self.observations) < self.n_startup:
+            return {key: self._uniform(dim) for key, dim in self.space.items()}
+        ranked = sorted(self.observations, key=lambda o: o[1])
+        n_good = max(1, math.ceil(self.gamma * len(ranked)))
+        good = [p for p, _ in ranked[:n_good]]
+        bad = [p for p, _ in ranked[n_good:]]
+        return {key: self._propose(key, dim, good, bad) for key, dim in self.space.items()}
+
+    def _uniform(self, dim: list | Range):
+        if isinstance(dim, list):
+            return self.rng.choice(dim)
+        return _from_unit(dim, self.rng.uniform(_to_unit(dim, dim.low), _to_unit(dim, dim.high)))
+
+    def _propose(self, key: str, dim: list | Range, good: list[dict], bad: list[dict]):
+        if isinstance(dim, list):
+            # Counts with a +1 prior so unseen choices keep some mass.
+            w_good = [1.0 + sum(1 for p in good if p[key] == v) for v in dim]
+            w_bad = [1.0 + sum(1 for p in bad if p[key] == v) for v in dim]
+            l = [w / sum(w_good) for w in w_good]
+            g = [w / sum(w_bad) for w in w_bad]
+            draws = self.rng.choices(range(len(dim)), weights=w_good, k=self.n_ei_candidates)
+            return dim[max(draws, key=lambda i: l[i] / g[i])]
+
+        lo, hi = _to_unit(dim, dim.low), _to_unit(dim, dim.high)
+        good_pts = [_to_unit(dim, p[key]) for p in good]
+        bad_pts = [_to_unit(dim, p[key]) for p in bad]
+        best, best_ratio = None, -math.inf
+        for _ in range(self.n_ei_candidates):
+            # Sample the good mixture: the uniform prior or a kernel around a good point.
+            centre = self.rng.choice(good_pts + [None])
+            t = self.rng.uniform(lo, hi)
+            if centre is not None:
+                # Truncated kernel: redraw rather than clip, so mass does not pile up on the bounds.
+                for _ in range(10):
+                    g = self.rng.gauss(centre, _bandwidth(lo, hi, len(good_pts)))
+                    if lo <= g <= hi:
+                        t = g
+                        break
+            value = _from_unit(dim, t)
+            t = _to_unit(dim, value)
+            ratio = _parzen(t, good_pts, lo, hi) / _parzen(t, bad_pts, lo, hi)
+            if ratio > best_ratio:
+                best, best_ratio = value, ratio
+        return best
+
+
+def _bandwidth(lo: float, hi: float, n_points: int) -> float:
+    return max((hi - lo) / math.sqrt(n_points + 1), (hi - lo) / 100)
+
+
+def _parzen(t: float, points: list[float], lo: float, hi: float) -> float:
+    sigma = _bandwidth(lo, hi, len(points))
+    density = 1.0 / (hi - lo)
+    for mu in points:
+        density += math.exp(-0.5 * ((t - mu) / sigma) ** 2) / (sigma * math.sqrt(2 * math.pi))
+    return density / (len(points) + 1)
+
+
+@dataclass(frozen=True)
+class TPESpec:
+    """One `models` entry searched with asynchronous TPE."""
+
+    name: str
+    space: dict
+    max_trials: int
+    time_budget_s: float | None
+    n_startup: int
+    gamma: float
+    keep: int
+    seed: str
+
+    def sampler(self) -> TPESampler:
+        return TPESampler(self.space, seed=self.seed, n_startup=self.n_startup, gamma=self.gamma)
+
+
+def build_tpe(model_cfg: dict, seed: int) -> TPESpec:
+    name = model_cfg["name"]
+    search_cfg = model_cfg.get("search", {}) or {}
+    space = parse_space(model_cfg.get("params_grid") or {})
+    if not space:
+        raise ValueError(f"{name}: search.method tpe needs a params_grid")
+    max_trials = int(search_cfg.get("max_trials", 20))
+    if all(isinstance(dim, list) for dim in space.values()):
+        max_trials = min(max_trials, math.prod(len(dim) for dim in space.values()))
+    if max_trials < 1:
+        raise ValueError(f"{name}: search.max_trials must be >= 1")
+    gamma = float(search_cfg.get("gamma", 0.25))
+    if not 0.0 < gamma < 1.0:
+        raise ValueError(f"{name}: search.gamma must be in (0, 1)")
+    time_budget_s = search_cfg.get("time_budget_s")
+    return TPESpec(
+        name=name,
+        space=space,
+        max_trials=max_trials,
+        time_budget_s=float(time_budget_s) if time_budget_s is not None else None,
+        n_startup=int(search_cfg.get("n_startup", min(10, max(2, max_trials // 4)))),
+        gamma=gamma,
+        keep=max(1, int(search_cfg.get("keep", 1))),
+        seed=f"{seed}:{name}",
+    )
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+import threading
+
+import numpy as np
+
+from src.data.exog import ExogMatrix
+
+_ALIGN = 64
+
+
+@dataclass(frozen=True)
+class _ArrayRef:
+    offset: int
+    shape: tuple[int, ...]
+    dtype: str
+
+
+@dataclass(frozen=True)
+class _SiteLayout:
+    series: _ArrayRef
+    exog: _ArrayRef | None
+    exog_columns: tuple[str, ...]
+    timestamps: _ArrayRef | None
+
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    """Picklable reference to a published dataset: the shared block name plus array offsets."""
+
+    shm_name: str
+    sites: dict[str, _SiteLayout]
+
+
+class SharedDataset:
+    """Every site's series, exog matrix and timestamps copied once into one shared-memory block.
+
+    The owning process publishes the dataset and unlinks it on close; tasks
+    carry `handle` and call `attach_site`, which maps the block zero-copy and
+    returns read-only views, once per process.
+    """
+
+    def __init__(self, site_payloads: dict[str, tuple[np.ndarray, ExogMatrix | None, list[str] | None]]) -> None:
+        arrays: list[tuple[str, str, np.ndarray]] = []
+        for site_id, (series, exog, timestamps) in site_payloads.items():
+            arrays.append((site_id, "series", np.ascontiguousarray(series, dtype=float)))
+            if exog is not None:
+                arrays.append((site_id, "exog", np.ascontiguousarray(exog.values, dtype=float)))
+            if timestamps is not None:
+                arrays.append((site_id, "timestamps", np.asarray(timestamps, dtype=str)))
+
+        refs: dict[tuple[str, str], _ArrayRef] = {}
+        size = 0
+        for site_id, kind, arr in arrays:
+            refs[(site_id, kind)] = _ArrayRef(size, tuple(arr.shape), arr.dtype.str)
+            size += -(-arr.nbytes // _ALIGN) * _ALIGN
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for site_id, kind, arr in arrays:
+            ref = refs[(site_id, kind)]
+            np.ndarray(ref.shape, dtype=ref.dtype, buffer=self._shm.buf, offset=ref.offset)[...] = arr
+        self.nbytes = size
+        self.handle = DatasetHandle(
+            shm_name=self._shm.name,
+            sites={
+                site_id: _SiteLayout(
+                    series=refs[(site_id, "series")],
+                    exog=refs.get((site_id, "exog")),
+                    exog_columns=tuple(exog.columns) if exog is not None else (),
+                    timestamps=refs.get((site_id, "timestamps")),
+                )
+                for site_id, (_, exog, _) in site_payloads.items()
+            },
+        )
+
+    def close(self) -> None:
+        _detach(self.handle.shm_name)
+        try:
+            self._shm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes away with it.
+            pass
+        self._shm.unlink()
+
+    def __enter__(self) -> SharedDataset:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+# Per-process attachments: shm name -> (block, site_id -> (series, exog, timestamps)).
+_ATTACHED: dict[str, tuple[shared_memory.SharedMemory, dict]] = {}
+_ATTACH_LOCK = threading.Lock()
+
+
+def _view(buf: memoryview, ref: _ArrayRef) -> np.ndarray:
+    arr = np.ndarray(ref.shape, dtype=ref.dtype, buffer=buf, offset=ref.offset)
+    arr.flags.writeable = False
+    return arr
+
+
+def attach_site(handle: DatasetHandle, site_id: str) -> tuple[np.ndarray, ExogMatrix | None, list[str] | None]:
+    """Zero-copy (series, exog, timestamps) for one site of a published dataset."""
+    with _ATTACH_LOCK:
+        entry = _ATTACHED.get(handle.shm_name)
+        if entry is None:
+            entry = (shared_memory.SharedMemory(name=handle.shm_name), {})
+            _ATTACHED[handle.shm_name] = entry
+        shm, sites = entry
+        site = sites.get(site_id)
+        if site is None:
+            layout = handle.sites[site_id]
+            exog = None
+            if layout.exog is not None:
+                exog = ExogMatrix(_view(shm.buf, layout.exog), layout.exog_columns)
+            # Runner code indexes timestamps as a list; convert once per process.
+            timestamps = _view(shm.buf, layout.timestamps).tolist() if layout.timestamps is not None else None
+            site = (_view(shm.buf, layout.series), exog, timestamps)
+            sites[site_id] = site
+        return site
+
+
+def _detach(shm_name: str) -> None:
+    with _ATTACH_LOCK:
+        entry = _ATTACHED.pop(shm_name, None)
+    if entry is not None:
+        entry[1].clear()
+        try:
+            entry[0].close()
+        except BufferError:
+            pass
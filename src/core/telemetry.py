@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+
+RSS_SAMPLE_INTERVAL_S = 0.05
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss_bytes() -> int | None:
+    """Resident set size of this process now; None where it cannot be read."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    # Not Linux: fall back to the process high-water mark.
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+class _RssSampler:
+    # One daemon thread per process samples RSS for every open RssWatch; it exits when none is left.
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._watches: set[RssWatch] = set()
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+
+    def add(self, watch: RssWatch) -> None:
+        with self._lock:
+            self._watches.add(watch)
+            self._wake.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+                self._thread.start()
+
+    def remove(self, watch: RssWatch) -> None:
+        with self._lock:
+            self._watches.discard(watch)
+            if not self._watches:
+                self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            rss = current_rss_bytes()
+            with self._lock:
+                if not self._watches:
+                    self._thread = None
+                    return
+                for watch in self._watches:
+                    watch.observe(rss)
+            self._wake.wait(RSS_SAMPLE_INTERVAL_S)
+
+
+_SAMPLER = _RssSampler()
+
+
+class RssWatch:
+    """Peak resident set size of this process while the `with` block runs, sampled every 50 ms.
+
+    RSS is per process, so blocks that overlap on threads of one process see
+    the same peak; in process-pool and queue workers it is the task's own.
+    `peak_bytes` is None where RSS cannot be read.
+    """
+
+    def __init__(self) -> None:
+        self.peak_bytes: int | None = None
+
+    def observe(self, rss: int | None) -> None:
+        if rss is not None and (self.peak_bytes is None or rss > self.peak_bytes):
+            self.peak_bytes = rss
+
+    @property
+    def peak_mb(self) -> float | None:
+        return round(self.peak_bytes / 2**20, 1) if self.peak_bytes is not None else None
+
+    def __enter__(self) -> RssWatch:
+        self.observe(current_rss_bytes())
+        _SAMPLER.add(self)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        _SAMPLER.remove(self)
+        self.observe(current_rss_bytes())
+
+
+def _total(rows: list[dict], key: str) -> float:
+    return sum(r[key] for r in rows if r.get(key) is not None)
+
+
+def summarize_task_timings(rows: list[dict]) -> dict[str, dict]:
+    """Per model category totals of `task_timings` rows, for `run_summary.json`."""
+    by_category: dict[str, list[dict]] = {}
+    for row in rows:
+        by_category.setdefault(row["category"], []).append(row)
+    summary = {}
+    for category, group in sorted(by_category.items()):
+        measured = [r for r in group if r.get("actual_s") is not None]
+        predict_s = _total(group, "predict_s")
+        n_predictions = _total(group, "n_predictions")
+        # Cache hits and restored checkpoints predict in 0 s; they would inflate the throughput.
+        timed_predictions = _total([r for r in group if (r.get("predict_s") or 0.0) > 0], "n_predictions")
+        waits = [r["queue_wait_s"] for r in group if r.get("queue_wait_s") is not None]
+        rss = [r["peak_rss_mb"] for r in group if r.get("peak_rss_mb") is not None]
+        slowest = max(measured, key=lambda r: r["actual_s"], default=None)
+        summary[category] = {
+            "tasks": len(group),
+            "actual_s": round(_total(group, "actual_s"), 4),
+            "fit_s": round(_total(group, "fit_s"), 4),
+            "predict_s": round(predict_s, 4),
+            "n_fits": int(_total(group, "n_fits")),
+            "n_predicts": int(_total(group, "n_predicts")),
+            "n_predictions": int(n_predictions),
+            "preds_per_s": round(timed_predictions / predict_s, 1) if predict_s > 0 else None,
+            "mean_queue_wait_s": round(sum(waits) / len(waits), 4) if waits else None,
+            "max_queue_wait_s": round(max(waits), 4) if waits else None,
+            "max_peak_rss_mb": max(rss) if rss else None,
+            "slowest_task": (
+                {"model_label": slowest["model_label"], "site_id": slowest["site_id"], "actual_s": slowest["actual_s"]}
+                if slowest is not None
+                else None
+            ),
+        }
+    return summary
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+import hashlib
+import os
+from pathlib import Path
+import socket
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from src.core.predictions import PredictionBlock
+from src.data.exog import ExogMatrix
+from src.utils.io import ensure_dir, read_json_gz, write_json_gz
+
+DEFAULT_LEASE_TIMEOUT_S = 60.0
+
+_SUFFIX = ".json.gz"
+# Separates the task id from the claiming worker's token in a lease name.
+_LEASE_SEP = "~"
+
+SitePayloads = dict[str, tuple[np.ndarray, ExogMatrix | None, list[str] | None]]
+
+
+class WorkerTaskError(RuntimeError):
+    """A task that raised on a queue worker; `error_type` names the worker's exception class."""
+
+    def __init__(self, message: str, error_type: str | None = None) -> None:
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def lease_task_id(lease: str) -> str:
+    """The task id a lease name (`<task id>~<token>`) belongs to."""
+    return lease.split(_LEASE_SEP, 1)[0]
+
+
+def _entries(directory: Path) -> list[str]:
+    # Task ids, oldest first; dot-prefixed names are writes still in progress.
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(name[: -len(_SUFFIX)] for name in names if name.endswith(_SUFFIX) and not name.startswith("."))
+
+
+class WorkQueue:
+    """A task queue in a directory that coordinator and workers share (NFS or any shared mount).
+
+    The coordinator writes site data once under `datasets/` and each task as
+    `pending/<id>.json.gz`. A worker claims a task by renaming it to
+    `leased/<id>~<token>.json.gz` with a token of its own (only one rename can
+    win) and keeps touching the lease while it runs; the result lands in
+    `results/<id>.json.gz`. A lease that has not been touched for
+    `lease_timeout` seconds belongs to a lost worker and is renamed back to
+    `pending/` by the coordinator. A worker only renews or completes the lease
+    under its own token, so one that was given up on and finishes late never
+    touches the lease of the worker that took the task over. Every file is
+    written to a temp name and renamed, so nobody reads half an entry.
+    """
+
+    def __init__(self, root: str | Path, lease_timeout: float = DEFAULT_LEASE_TIMEOUT_S) -> None:
+        self.root = Path(root)
+        self.lease_timeout = float(lease_timeout)
+        if self.lease_timeout <= 0:
+            raise ValueError(f"queue lease timeout must be positive, got {lease_timeout!r}")
+        self.pending = ensure_dir(self.root / "pending")
+        self.leased = ensure_dir(self.root / "leased")
+        self.results = ensure_dir(self.root / "results")
+        self.datasets = ensure_dir(self.root / "datasets")
+        self._datasets: dict[str, SitePayloads] = {}
+
+    # Coordinator side.
+
+    def publish_dataset(self, site_payloads: SitePayloads) -> str:
+        """Write the sites' arrays once and return the name tasks refer to them by."""
+        arrays: dict[str, np.ndarray] = {}
+        for i, (site_id, (series, exog, timestamps)) in enumerate(site_payloads.items()):
+            arrays[f"site_{i}"] = np.asarray(site_id, dtype=str)
+            arrays[f"series_{i}"] = np.ascontiguousarray(series, dtype=float)
+            if exog is not None:
+                arrays[f"exog_{i}"] = np.ascontiguousarray(exog.values, dtype=float)
+                arrays[f"exog_columns_{i}"] = np.asarray(list(exog.columns), dtype=str)
+            if timestamps is not None:
+                arrays[f"timestamps_{i}"] = np.asarray(timestamps, dtype=str)
+        digest = hashlib.sha256()
+        for key in sorted(arrays):
+            digest.update(key.encode("utf-8"))
+            digest.update(arrays[key].tobytes())
+        name = f"{digest.hexdigest()[:24]}.npz"
+        target = self.datasets / name
+        if not target.exists():
+            tmp = self.datasets / f".{name}.{uuid.uuid4().hex}"
+            try:
+                with tmp.open("wb") as f:
+                    np.savez(f, **arrays)
+                os.replace(tmp, target)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+        return name
+
+    def publish(self, task: dict) -> str:
+        """Queue one task (JSON-serialisable, with a `dataset` name) and return its id."""
+        # Ids sort in publish order, so workers pick tasks up in the coordinator's schedule.
+        task_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:12]}"
+        write_json_gz(self.pending / f"{task_id}{_SUFFIX}", {**task, "lease_timeout_s": self.lease_timeout})
+        return task_id
+
+    def requeue_expired(self, now: float | None = None) -> list[str]:
+        """Return leases whose worker stopped heartbeating to `pending/`."""
+        now = time.time() if now is None else now
+        requeued = []
+        for lease in _entries(self.leased):
+            task_id = lease_task_id(lease)
+            path = self.leased / f"{lease}{_SUFFIX}"
+            try:
+                if now - path.stat().st_mtime <= self.lease_timeout:
+                    continue
+                os.replace(path, self.pending / f"{task_id}{_SUFFIX}")
+            except FileNotFoundError:
+                # Finished (or re-leased) in the meantime.
+                continue
+            requeued.append(task_id)
+        return requeued
+
+    def take_result(self, task_id: str) -> dict | None:
+        """The result for `task_id` if a worker has delivered one; its queue files are removed."""
+        path = self.results / f"{task_id}{_SUFFIX}"
+        result = read_json_gz(path)
+        if result is None:
+            return None
+        self.cancel(task_id)
+        path.unlink(missing_ok=True)
+        return result
+
+    def cancel(self, task_id: str) -> None:
+        # A requeued task may still be pending or leased by a second worker when the first delivers.
+        (self.pending / f"{task_id}{_SUFFIX}").unlink(missing_ok=True)
+        for lease in _entries(self.leased):
+            if lease_task_id(lease) == task_id:
+                (self.leased / f"{lease}{_SUFFIX}").unlink(missing_ok=True)
+
+    # Worker side.
+
+    def claim(self) -> tuple[str, dict] | None:
+        """Lease the oldest pending task: (lease name, task), or None if there is none."""
+        for task_id in _entries(self.pending):
+            lease = f"{task_id}{_LEASE_SEP}{uuid.uuid4().hex[:12]}"
+            src = self.pending / f"{task_id}{_SUFFIX}"
+            dst = self.leased / f"{lease}{_SUFFIX}"
+            try:
+                # Touch first: the rename keeps the mtime, and the lease clock starts now.
+                os.utime(src)
+                os.replace(src, dst)
+            except FileNotFoundError:
+                continue
+            task = read_json_gz(dst)
+            if task is None:
+                dst.unlink(missing_ok=True)
+                continue
+            return lease, task
+        return None
+
+    def heartbeat(self, lease: str) -> bool:
+        """Renew a lease; False if it has been requeued, cancelled or completed."""
+        try:
+            os.utime(self.leased / f"{lease}{_SUFFIX}")
+        except FileNotFoundError:
+            return False
+        return True
+
+    def complete(self, lease: str, result: dict) -> bool:
+        """Deliver the result of a leased task; False (and nothing written) if the lease was lost."""
+        path = self.leased / f"{lease}{_SUFFIX}"
+        if not path.exists():
+            # Requeued or cancelled: the task is someone else's now, or no longer wanted.
+            return False
+        write_json_gz(self.results / f"{lease_task_id(lease)}{_SUFFIX}", result)
+        path.unlink(missing_ok=True)
+        return True
+
+    def load_dataset(self, name: str) -> SitePayloads:
+        """Sites of a published dataset as read-only arrays, read once per worker."""
+        if name not in self._datasets:
+            sites: SitePayloads = {}
+            with np.load(self.datasets / name, allow_pickle=False) as data:
+                i = 0
+                while f"site_{i}" in data:
+                    series = data[f"series_{i}"]
+                    series.flags.writeable = False
+                    exog = None
+                    if f"exog_{i}" in data:
+                        values = data[f"exog_{i}"]
+                        values.flags.writeable = False
+                        exog = ExogMatrix(values, [str(c) for c in data[f"exog_columns_{i}"]])
+                    timestamps = data[f"timestamps_{i}"].tolist() if f"timestamps_{i}" in data else None
+                    sites[str(data[f"site_{i}"])] = (series, exog, timestamps)
+                    i += 1
+            # A worker serves one run at a time; keep only the latest dataset.
+            self._datasets = {name: sites}
+        return self._datasets[name]
+
+
+def queue_task(task: dict, dataset: str) -> dict:
+    """A coordinator task in the queue's wire form: site data by dataset name instead of in memory."""
+    wire = {k: v for k, v in task.items() if k not in ("dataset", "series", "exog", "timestamps")}
+    wire["dataset"] = dataset
+    if "result_cache" in wire:
+        wire["result_cache"] = list(wire["result_cache"])
+    return wire
+
+
+def run_queued(
+    queue: WorkQueue,
+    tasks: list[dict],
+    dataset: str,
+    more: Callable[[], list[dict]] | None = None,
+    max_in_flight: int = 1,
+    poll_interval: float = 0.2,
+) -> Iterator[tuple[dict | None, dict, BaseException | None]]:
+    """Publish tasks to the queue and yield (result, task, error) as workers deliver them.
+
+    `more` is asked for new tasks whenever fewer than `max_in_flight` are
+    outstanding, like the local pools do when a worker frees up. Expired leases
+    are requeued while waiting; tasks still queued when the caller stops
+    iterating are withdrawn.
+    """
+    outstanding: dict[str, dict] = {}
+
+    def publish(batch: list[dict]) -> None:
+        for task in batch:
+            outstanding[queue.publish(queue_task(task, dataset))] = task
+
+    publish(tasks)
+    try:
+        while True:
+            while more is not None and len(outstanding) < max_in_flight:
+                new_tasks = more()
+                if not new_tasks:
+                    more = None
+                    break
+                publish(new_tasks)
+            if not outstanding:
+                return
+            delivered = False
+            for task_id in list(outstanding):
+                result = queue.take_result(task_id)
+                if result is None:
+                    continue
+                delivered = True
+                task = outstanding.pop(task_id)
+                if result.get("ok"):
+                    yield {**result, "preds": PredictionBlock.from_dict(result["preds"])}, task, None
+                else:
+                    yield None, task, WorkerTaskError(result.get("error", "worker failed"), result.get("error_type"))
+            if not delivered:
+                queue.requeue_expired()
+                time.sleep(poll_interval)
+    finally:
+        for task_id in outstanding:
+            queue.cancel(task_id)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def serve(
+    queue: WorkQueue,
+    run_task: Callable[[dict], dict],
+    stop: threading.Event | None = None,
+    poll_interval: float = 0.5,
+    max_tasks: int | None = None,
+    idle_exit: float | None = None,
+    worker_id: str | None = None,
+) -> int:
+    """Worker loop: claim tasks, run them with `run_task` and deliver the results.
+
+    `run_task` gets the wire task with its site's `series`/`exog`/`timestamps`
+    filled in. A heartbeat thread renews the lease every quarter of its
+    timeout while the task runs. Returns the number of tasks completed.
+    """
+    stop = stop or threading.Event()
+    worker_id = worker_id or default_worker_id()
+    done = 0
+    idle_since = time.monotonic()
+    while not stop.is_set() and (max_tasks is None or done < max_tasks):
+        claimed = queue.claim()
+        if claimed is None:
+            if idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                break
+            stop.wait(poll_interval)
+            continue
+        lease, task = claimed
+        finished = threading.Event()
+
+        def beat(lease: str = lease, every: float = float(task["lease_timeout_s"]) / 4) -> None:
+            while not finished.wait(every) and queue.heartbeat(lease):
+                pass
+
+        beater = threading.Thread(target=beat, name=f"lease-{lease_task_id(lease)}", daemon=True)
+        beater.start()
+        try:
+            series, exog, timestamps = queue.load_dataset(task.pop("dataset"))[task["site_id"]]
+            res = run_task({**task, "series": series, "exog": exog, "timestamps": timestamps})
+            result = {**res, "preds": res["preds"].to_dict(), "worker": worker_id}
+        except Exception as exc:
+            result = {"ok": False, "error": str(exc), "error_type": type(exc).__name__, "worker": worker_id}
+        finally:
+            finished.set()
+            beater.join()
+        queue.complete(lease, result)
+        done += 1
+        idle_since = time.monotonic()
+    return done
@@ -1,36 +1,212 @@
 from __future__ import annotations
 
 import csv
+from array import array
+from collections.abc import Iterator
 from dataclasses import dataclass
-from datetime import datetime
+from itertools import islice
+from datetime import date
 from pathlib import Path
 
+import numpy as np
+
+from src.data.exog import ExogMatrix
+
+# Aligned rows parsed per NumPy block; bounds the raw-string buffer while streaming.
+DEFAULT_CHUNK_ROWS = 8192
+
 
 @dataclass
 class CSVLoadResult:
     site_id: str
-    series: list[float]
+    series: np.ndarray
     timestamps: list[str]
-    exog_rows: list[dict[str, float]]
+    exog: ExogMatrix
     stats: dict[str, float | int | str]
 
 
-def _parse_time(value: str) -> datetime:
-    # Supports input like: 2023/1/1 0:15
-    return datetime.strptime(value.strip(), "%Y/%m/%d %H:%M")
+class _TimestampParser:
+    """Minute keys for timestamps like `2023/1/1 0:15` (format `%Y/%m/%d %H:%M`).
+
+    15-minute data repeats each date prefix 96 times and each clock time once
+    per day, so both halves are parsed once and cached.
+    """
+
+    def __init__(self) -> None:
+        self._days: dict[str, int] = {}
+        self._minutes: dict[str, int] = {}
+
+    def __call__(self, value: str) -> int:
+        day_text, _, time_text = value.partition(" ")
+        day = self._days.get(day_text)
+        if day is None:
+            day = self._parse_day(value, day_text)
+            self._days[day_text] = day
+        minute = self._minutes.get(time_text)
+        if minute is None:
+            minute = self._parse_minute(value, time_text)
+            self._minutes[time_text] = minute
+        return day * 1440 + minute
+
+    @staticmethod
+    def _parse_day(value: str, text: str) -> int:
+        parts = text.split("/")
+        if len(parts) != 3 or not all(p.isdigit() for p in parts):
+            raise ValueError(f"Unrecognised timestamp {value!r}, expected like 2023/1/1 0:15")
+        return date(int(parts[0]), int(parts[1]), int(parts[2])).toordinal()
+
+    @staticmethod
+    def _parse_minute(value: str, text: str) -> int:
+        parts = text.strip().split(":")
+        if len(parts) != 2 or not all(p.isdigit() for p in parts):
+            raise ValueError(f"Unrecognised timestamp {value!r}, expected like 2023/1/1 0:15")
+        hour, minute = int(parts[0]), int(parts[1])
+        if hour > 23 or minute > 59:
+            raise ValueError(f"Unrecognised timestamp {value!r}, expected like 2023/1/1 0:15")
+        return hour * 60 + minute
+
+
+class _NotSorted(Exception):
+    """A file is not strictly increasing in time, so the streaming merge cannot be used."""
+
+
+class _CsvSource:
+    def __init__(self, path: str | Path, timestamp_col: str, kind: str) -> None:
+        self.path = Path(path)
+        self.timestamp_col = timestamp_col
+        self.kind = kind
+        self.rows_read = 0
+
+    def open(self) -> tuple[list[str], Iterator[list[str]], object]:
+        f = self.path.open("r", encoding="utf-8", newline="")
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            f.close()
+            raise ValueError(f"Empty {self.kind} csv: {self.path}")
+        return header, reader, f
+
+    def keyed_rows(
+        self, header: list[str], reader: Iterator[list[str]], parse_time: _TimestampParser, sorted_only: bool
+    ) -> Iterator[tuple[int, str, list[str]]]:
+        # (minute key, timestamp, cells) for rows with a timestamp, in file order.
+        ts_idx = header.index(self.timestamp_col) if self.timestamp_col in header else None
+        last_key = None
+        for cells in reader:
+            if not cells:
+                continue
+            self.rows_read += 1
+            ts = cells[ts_idx].strip() if ts_idx is not None and ts_idx < len(cells) else ""
+            if not ts:
+                continue
+            key = parse_time(ts)
+            if sorted_only and last_key is not None and key <= last_key:
+                raise _NotSorted(f"{self.path} is not strictly increasing at {ts}")
+            last_key = key
+            yield key, ts, cells
+        if self.rows_read == 0:
+            raise ValueError(f"Empty {self.kind} csv: {self.path}")
+
+
+def _merge_sorted(
+    scada: Iterator[tuple[int, str, list[str]]],
+    nwp: Iterator[tuple[int, str, list[str]]],
+) -> Iterator[tuple[str, list[str], list[str]]]:
+    # Inner join of two time-ordered streams; reads only as far as the consumer asks.
+    a = next(scada, None)
+    b = next(nwp, None)
+    while a is not None and b is not None:
+        if a[0] == b[0]:
+            yield a[1], a[2], b[2]
+            a = next(scada, None)
+            b = next(nwp, None)
+        elif a[0] < b[0]:
+            a = next(scada, None)
+        else:
+            b = next(nwp, None)
+    # Drain the remaining side so an empty or unsorted file is still reported.
+    for _ in scada:
+        pass
+    for _ in nwp:
+        pass
+
+
+def _join_unsorted(
+    scada: Iterator[tuple[int, str, list[str]]],
+    nwp: Iterator[tuple[int, str, list[str]]],
+) -> Iterator[tuple[str, list[str], list[str]]]:
+    # Fallback for out-of-order files or repeated timestamps: index both, last row wins.
+    scada_by_key = {key: (ts, cells) for key, ts, cells in scada}
+    nwp_by_key = {key: cells for key, _, cells in nwp}
+    for key in sorted(scada_by_key.keys() & nwp_by_key.keys()):
+        ts, cells = scada_by_key[key]
+        yield ts, cells, nwp_by_key[key]
 
 
-def _read_rows(path: str | Path) -> list[dict[str, str]]:
-    with Path(path).open("r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        return [dict(r) for r in reader]
+def _parse_float_block(cells: list[list[str]], n_cols: int) -> np.ndarray:
+    """Parse a block of numeric strings; blanks and unparseable cells become NaN."""
+    flat = [c if c and not c.isspace() else "nan" for row in cells for c in row]
+    try:
+        values = np.fromiter(map(float, flat), dtype=float, count=len(flat))
+    except ValueError:
+        values = np.array([_to_float(c) for c in flat], dtype=float)
+    return values.reshape(len(cells), n_cols)
 
 
-def _to_float(value: str) -> float | None:
+def _to_float(value: str) -> float:
     try:
-        return float(value.strip())
-    except (ValueError, AttributeError):
-        return None
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def _assemble(
+    aligned: Iterator[tuple[str, list[str], list[str]]],
+    scada_header: list[str],
+    nwp_header: list[str],
+    target_col: str,
+    timestamp_col: str,
+    max_rows: int | None,
+    chunk_rows: int,
+) -> tuple[array, list[str], ExogMatrix, int, int]:
+    target_idx = scada_header.index(target_col) if target_col in scada_header else None
+    exog_idx = [i for i, c in enumerate(nwp_header) if c != timestamp_col]
+    n_cols = len(nwp_header)
+
+    series = array("d")
+    timestamps: list[str] = []
+    blocks: list[np.ndarray] = []
+    pending: list[list[str]] = []
+    n_aligned = 0
+    dropped_target = 0
+    limit = None if max_rows is None else max(0, int(max_rows))
+
+    # islice stops pulling from the join, and so from both files, at the row limit.
+    for ts, scada_cells, nwp_cells in islice(aligned, limit):
+        n_aligned += 1
+        raw = scada_cells[target_idx] if target_idx is not None and target_idx < len(scada_cells) else ""
+        try:
+            y = float(raw.strip())
+        except ValueError:
+            dropped_target += 1
+            continue
+        series.append(y)
+        timestamps.append(ts)
+        if len(nwp_cells) < n_cols:
+            nwp_cells = nwp_cells + [""] * (n_cols - len(nwp_cells))
+        pending.append([nwp_cells[i] for i in exog_idx])
+        if len(pending) >= chunk_rows:
+            blocks.append(_parse_float_block(pending, len(exog_idx)))
+            pending = []
+    if pending:
+        blocks.append(_parse_float_block(pending, len(exog_idx)))
+
+    columns = [nwp_header[i] for i in exog_idx]
+    values = np.vstack(blocks) if blocks else np.empty((0, len(columns)), dtype=float)
+    # Columns with no numeric value at all (ids, free text) are not features.
+    keep = ~np.isnan(values).all(axis=0) if len(values) else np.zeros(len(columns), dtype=bool)
+    exog = ExogMatrix(values[:, keep], [c for c, k in zip(columns, keep) if k])
+    return series, timestamps, exog, n_aligned, dropped_target
 
 
 def load_scada_nwp_series(
@@ -40,60 +216,43 @@ def load_scada_nwp_series(
     target_col: str = "Total_Power",
     timestamp_col: str = "Timestamp",
     max_rows: int | None = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
 ) -> CSVLoadResult:
-    scada_rows = _read_rows(scada_csv)
-    nwp_rows = _read_rows(nwp_csv)
-    if not scada_rows:
-        raise ValueError(f"Empty scada csv: {scada_csv}")
-    if not nwp_rows:
-        raise ValueError(f"Empty nwp csv: {nwp_csv}")
-
-    scada_by_ts: dict[str, dict[str, str]] = {}
-    nwp_by_ts: dict[str, dict[str, str]] = {}
-    for row in scada_rows:
-        ts = row.get(timestamp_col, "").strip()
-        if ts:
-            scada_by_ts[ts] = row
-    for row in nwp_rows:
-        ts = row.get(timestamp_col, "").strip()
-        if ts:
-            nwp_by_ts[ts] = row
-
-    common_ts = sorted(set(scada_by_ts.keys()) & set(nwp_by_ts.keys()), key=_parse_time)
-    if max_rows is not None:
-        common_ts = common_ts[: max(0, int(max_rows))]
-    if not common_ts:
-        raise ValueError("No aligned timestamps between scada and nwp csv")
+    """Inner-join SCADA and NWP rows on timestamp, in time order.
+
+    Files that are already time-ordered (the usual export) are merge-joined
+    while streaming, and reading stops once `max_rows` aligned rows are
+    produced; anything else falls back to indexing both files in full.
+    """
+    scada_src = _CsvSource(scada_csv, timestamp_col, "scada")
+    nwp_src = _CsvSource(nwp_csv, timestamp_col, "nwp")
+    parse_time = _TimestampParser()
 
-    series: list[float] = []
-    aligned_ts: list[str] = []
-    exog_rows: list[dict[str, float]] = []
-    dropped_target_nan = 0
-    exog_feature_cols: list[str] = []
-    for ts in common_ts:
-        raw = scada_by_ts[ts].get(target_col, "").strip()
+    load_mode = "streaming"
+    for sorted_only in (True, False):
+        scada_src.rows_read = nwp_src.rows_read = 0
+        scada_header, scada_reader, scada_f = scada_src.open()
         try:
-            y = float(raw)
+            nwp_header, nwp_reader, nwp_f = nwp_src.open()
         except ValueError:
-            dropped_target_nan += 1
-            continue
-
-        nwp_row = nwp_by_ts[ts]
-        exog: dict[str, float] = {}
-        for k, v in nwp_row.items():
-            if k == timestamp_col:
-                continue
-            fv = _to_float(v)
-            if fv is None:
-                continue
-            exog[k] = fv
-        if not exog_feature_cols and exog:
-            exog_feature_cols = sorted(exog.keys())
-
-        aligned_ts.append(ts)
-        series.append(y)
-        exog_rows.append(exog)
+            scada_f.close()
+            raise
+        try:
+            scada_rows = scada_src.keyed_rows(scada_header, scada_reader, parse_time, sorted_only)
+            nwp_rows = nwp_src.keyed_rows(nwp_header, nwp_reader, parse_time, sorted_only)
+            join = _merge_sorted if sorted_only else _join_unsorted
+            series, aligned_ts, exog, n_aligned, dropped_target_nan = _assemble(
+                join(scada_rows, nwp_rows), scada_header, nwp_header, target_col, timestamp_col, max_rows, chunk_rows
+            )
+            break
+        except _NotSorted:
+            load_mode = "full"
+        finally:
+            scada_f.close()
+            nwp_f.close()
 
+    if n_aligned == 0:
+        raise ValueError("No aligned timestamps between scada and nwp csv")
     if not series:
         raise ValueError(f"No valid target values in {target_col}")
 
@@ -105,22 +264,24 @@ def load_scada_nwp_series(
         "site_id": site_id,
         "target_col": target_col,
         "timestamp_col": timestamp_col,
-        "rows_scada": len(scada_rows),
-        "rows_nwp": len(nwp_rows),
-        "rows_aligned": len(common_ts),
+        # Rows read before the join had enough aligned rows (the whole file without max_rows).
+        "rows_scada": scada_src.rows_read,
+        "rows_nwp": nwp_src.rows_read,
+        "rows_aligned": n_aligned,
         "rows_final": len(series),
         "rows_dropped_target_parse": dropped_target_nan,
-        "n_exog_features": len(exog_feature_cols),
+        "n_exog_features": len(exog.first_row_columns()),
         "target_min": round(min_y, 6),
         "target_max": round(max_y, 6),
         "target_mean": round(mean_y, 6),
         "time_start": aligned_ts[0],
         "time_end": aligned_ts[-1],
+        "load_mode": load_mode,
     }
     return CSVLoadResult(
         site_id=site_id,
-        series=series,
+        series=np.frombuffer(series, dtype=float),
         timestamps=aligned_ts,
-        exog_rows=exog_rows,
+        exog=exog,
         stats=stats,
     )
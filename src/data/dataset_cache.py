@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.data.csv_loader import CSVLoadResult
+from src.data.exog import ExogMatrix
+from src.utils.io import ensure_dir, write_json
+
+# Bump when the on-disk layout or the loader's output changes; old entries are then ignored.
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = "outputs/cache/datasets"
+
+
+def source_fingerprint(path: str | Path, hash_content: bool = False) -> dict[str, Any]:
+    """Identity of a source file: size and mtime, plus a SHA-256 of the bytes if asked."""
+    p = Path(path)
+    st = p.stat()
+    fp: dict[str, Any] = {"path": str(p.resolve()), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if hash_content:
+        digest = hashlib.sha256()
+        with p.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        fp["sha256"] = digest.hexdigest()
+    return fp
+
+
+def dataset_cache_key(
+    sources: list[str | Path],
+    target_col: str,
+    timestamp_col: str,
+    feature_cols: list[str] | None,
+    max_rows: int | None,
+    site_id: str,
+    hash_content: bool = False,
+) -> tuple[str, dict[str, Any]]:
+    """Key for one loaded dataset and the inputs it was derived from."""
+    inputs = {
+        "version": CACHE_VERSION,
+        "sources": [source_fingerprint(s, hash_content=hash_content) for s in sources],
+        "target_col": target_col,
+        "timestamp_col": timestamp_col,
+        "feature_cols": list(feature_cols) if feature_cols else None,
+        "max_rows": max_rows,
+        "site_id": site_id,
+    }
+    if hash_content:
+        # Content hashes identify the files; paths and mtimes may differ between checkouts.
+        for fp in inputs["sources"]:
+            fp.pop("path")
+            fp.pop("mtime_ns")
+    blob = json.dumps(inputs, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:24], inputs
+
+
+def save_cached_dataset(cache_dir: str | Path, key: str, result: CSVLoadResult, inputs: dict[str, Any]) -> Path:
+    """Write `result` as .npy arrays plus manifest.json under `cache_dir/key`."""
+    root = ensure_dir(cache_dir)
+    target = root / key
+    # Build in a sibling temp dir and rename, so readers never see a half-written entry.
+    staging = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=root))
+    try:
+        np.save(staging / "series.npy", np.asarray(result.series, dtype=float))
+        np.save(staging / "timestamps.npy", np.asarray(result.timestamps, dtype=str))
+        np.save(staging / "exog.npy", np.asarray(result.exog.values, dtype=float))
+        write_json(
+            staging / "manifest.json",
+            {
+                "key": key,
+                "inputs": inputs,
+                "site_id": result.site_id,
+                "n_rows": len(result.series),
+                "exog_columns": result.exog.columns,
+                "stats": result.stats,
+            },
+        )
+        try:
+            os.replace(staging, target)
+        except OSError:
+            # Another process stored the same key first; theirs is equivalent.
+            shutil.rmtree(staging, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return target
+
+
+def load_cached_dataset(cache_dir: str | Path, key: str) -> CSVLoadResult | None:
+    """Memory-map a cached dataset, or return None if it is absent or unreadable."""
+    entry = Path(cache_dir) / key
+    manifest_path = entry / "manifest.json"
+    if not manifest_path.exists():
+        return None
+    try:
+        with manifest_path.open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("key") != key:
+            return None
+        series = np.load(entry / "series.npy", mmap_mode="r")
+        exog_values = np.load(entry / "exog.npy", mmap_mode="r")
+        timestamps = np.load(entry / "timestamps.npy", mmap_mode="r").tolist()
+    except (OSError, ValueError):
+        return None
+    if len(series) != manifest["n_rows"] or len(timestamps) != manifest["n_rows"]:
+        return None
+    return CSVLoadResult(
+        site_id=str(manifest["site_id"]),
+        series=series,
+        timestamps=timestamps,
+        exog=ExogMatrix(exog_values, manifest["exog_columns"]),
+        stats=dict(manifest["stats"]),
+    )
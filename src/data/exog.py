@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+
+import numpy as np
+
+
+class ExogMatrix:
+    """Columnar exogenous features: a 2-D float array plus a column-name index.
+
+    Missing values are stored as NaN. Row slices are NumPy views, so
+    per-origin histories and future windows cost nothing to create.
+    """
+
+    def __init__(self, values: np.ndarray, columns: Sequence[str]) -> None:
+        values = np.asarray(values, dtype=float)
+        if values.ndim != 2 or values.shape[1] != len(columns):
+            raise ValueError(f"exog values shape {values.shape} does not match {len(columns)} columns")
+        self.values = values
+        self.columns = [str(c) for c in columns]
+        self.index = {c: i for i, c in enumerate(self.columns)}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, float] | None], columns: Sequence[str] | None = None) -> ExogMatrix:
+        rows = list(rows)
+        if columns is None:
+            seen: dict[str, None] = {}
+            for row in rows:
+                for k in row or {}:
+                    seen.setdefault(str(k), None)
+            columns = list(seen)
+        values = np.full((len(rows), len(columns)), np.nan, dtype=float)
+        for i, row in enumerate(rows):
+            if not row:
+                continue
+            for j, col in enumerate(columns):
+                v = row.get(col)
+                if v is not None:
+                    values[i, j] = float(v)
+        return cls(values, columns)
+
+    def __len__(self) -> int:
+        return int(self.values.shape[0])
+
+    def __getitem__(self, index: slice) -> ExogMatrix:
+        if not isinstance(index, slice):
+            raise TypeError("ExogMatrix supports row slices only; use row() for a single row")
+        view = ExogMatrix.__new__(ExogMatrix)
+        view.values = self.values[index]
+        view.columns = self.columns
+        view.index = self.index
+        return view
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.values.nbytes)
+
+    def column(self, name: str) -> np.ndarray | None:
+        idx = self.index.get(name)
+        return None if idx is None else self.values[:, idx]
+
+    def select(self, columns: Sequence[str]) -> ExogMatrix:
+        # Projection onto the columns that exist, keeping the requested order.
+        kept = [str(c) for c in columns if str(c) in self.index]
+        return ExogMatrix(self.values[:, [self.index[c] for c in kept]], kept)
+
+    def to_array(self, columns: Sequence[str], fill: float = 0.0, n_rows: int | None = None) -> np.ndarray:
+        """Dense copy of `columns`; absent columns, NaNs and rows past the end become `fill`."""
+        n = len(self) if n_rows is None else int(n_rows)
+        out = np.full((n, len(columns)), fill, dtype=float)
+        m = min(n, len(self))
+        for j, col in enumerate(columns):
+            idx = self.index.get(col)
+            if idx is not None:
+                out[:m, j] = self.values[:m, idx]
+        out[np.isnan(out)] = fill
+        return out
+
+    def first_row_columns(self) -> list[str]:
+        """Columns with a value in the first row that has any (the default feature set)."""
+        for row in self.values:
+            present = ~np.isnan(row)
+            if present.any():
+                return [c for c, ok in zip(self.columns, present) if ok]
+        return []
+
+    def row(self, i: int) -> dict[str, float]:
+        return {c: float(v) for c, v in zip(self.columns, self.values[i]) if not np.isnan(v)}
+
+
+def as_exog_matrix(exog: ExogMatrix | Sequence[Mapping[str, float] | None] | None) -> ExogMatrix | None:
+    if exog is None or isinstance(exog, ExogMatrix):
+        return exog
+    if len(exog) == 0:
+        return None
+    return ExogMatrix.from_rows(exog)
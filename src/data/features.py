@@ -1,6 +1,210 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from collections.abc import Sequence
+import threading
+import weakref
+
+import numpy as np
+
+from src.data.exog import ExogMatrix
+
 
 def build_basic_features(series: list[float]) -> list[float]:
     # Demo阶段先保持最小闭环，后续可扩展时序特征/气象特征工程。
     return series
+
+
+def build_lag_matrix(series, lags: int, start: int | None = None, stop: int | None = None) -> np.ndarray:
+    # Row r holds [y[t-1], ..., y[t-lags]] for target index t = start + r.
+    y = np.asarray(series, dtype=float)
+    start = lags if start is None else max(int(start), lags)
+    stop = len(y) if stop is None else min(int(stop), len(y))
+    n_rows = max(0, stop - start)
+    x = np.empty((n_rows, lags), dtype=float)
+    for i in range(1, lags + 1):
+        x[:, i - 1] = y[start - i : stop - i]
+    return x
+
+
+def _build_design(series, lags: int, start: int, stop: int, exog, feature_cols, intercept: bool) -> np.ndarray:
+    lag_x = build_lag_matrix(series, lags, start=start, stop=stop)
+    blocks = [lag_x]
+    if intercept:
+        blocks.insert(0, np.ones((len(lag_x), 1), dtype=float))
+    if feature_cols:
+        if exog is None:
+            blocks.append(np.zeros((len(lag_x), len(feature_cols)), dtype=float))
+        else:
+            blocks.append(exog.to_array(feature_cols, fill=0.0, n_rows=stop)[start:stop])
+    return np.hstack(blocks) if len(blocks) > 1 else lag_x
+
+
+def readonly_root(arr) -> np.ndarray | None:
+    """The buffer-owning array behind a read-only view that starts at its first element, else None."""
+    if not isinstance(arr, np.ndarray):
+        return None
+    root = arr
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if root.flags.writeable or root.dtype != np.float64 or root.strides != arr.strides:
+        return None
+    if arr.__array_interface__["data"][0] != root.__array_interface__["data"][0]:
+        return None
+    return root
+
+
+class _SiteDesign:
+    # [1, y[t-1], ..., y[t-max_lag], exog feature columns] for every target index t of a site.
+
+    __slots__ = ("series_ref", "exog_ref", "exog_cols", "max_lag", "feature_cols", "matrix")
+
+    def __init__(
+        self,
+        s_root: np.ndarray,
+        e_root: np.ndarray | None,
+        exog_cols: tuple,
+        max_lag: int,
+        feature_cols: tuple,
+        evict,
+    ) -> None:
+        self.series_ref = weakref.ref(s_root, evict)
+        self.exog_ref = weakref.ref(e_root, evict) if e_root is not None else None
+        self.exog_cols = exog_cols
+        self.max_lag = max_lag
+        self.feature_cols = feature_cols
+        n = len(s_root)
+        matrix = np.full((n, 1 + max_lag + len(feature_cols)), np.nan, dtype=float)
+        matrix[:, 0] = 1.0
+        for i in range(1, max_lag + 1):
+            # Rows t < i have no y[t-i]; no fit with that many lags starts before row i.
+            matrix[i:, i] = s_root[: n - i]
+        if feature_cols:
+            if e_root is None:
+                matrix[:, 1 + max_lag :] = 0.0
+            else:
+                matrix[:, 1 + max_lag :] = ExogMatrix(e_root, exog_cols).to_array(feature_cols, fill=0.0, n_rows=n)
+        matrix.flags.writeable = False
+        self.matrix = matrix
+
+    def exog_root(self) -> np.ndarray | None:
+        return self.exog_ref() if self.exog_ref is not None else None
+
+    def alive(self) -> bool:
+        return self.series_ref() is not None and (self.exog_ref is None or self.exog_ref() is not None)
+
+    def covers(
+        self,
+        s_root: np.ndarray,
+        e_root: np.ndarray | None,
+        exog_cols: tuple,
+        lags: int,
+        feature_cols: tuple,
+    ) -> bool:
+        if self.series_ref() is not s_root or lags > self.max_lag:
+            return False
+        if not feature_cols:
+            return True
+        same_exog = self.exog_root() is e_root and self.exog_cols == exog_cols
+        return same_exog and all(c in self.feature_cols for c in feature_cols)
+
+
+class DesignMatrixCache:
+    """Lag/exog design matrices shared by every model variant fitting on the same site.
+
+    One matrix per site holds an intercept column, the lags up to the largest
+    count any variant asked for and every exog feature column asked for, over
+    the whole series. It is keyed by the read-only array behind the training
+    slices, so a fit on `series[:n]` takes its rows and columns from it:
+    a view when the variant's columns are adjacent (lag-only models), one
+    gather otherwise. A variant needing more lags or new feature columns
+    rebuilds the site's matrix wider. Writable inputs are never cached. Roots
+    are held by weak reference, and the least recently used sites go once
+    there are `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 16) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, _SiteDesign] = OrderedDict()
+        # Re-entrant: a weakref callback can fire while the lock is held.
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.builds = 0
+
+    def rows(
+        self,
+        series,
+        lags: int,
+        start: int,
+        exog: ExogMatrix | None = None,
+        feature_cols: Sequence[str] = (),
+        intercept: bool = False,
+    ) -> np.ndarray:
+        """Rows `start..len(series)` of [1?, y[t-1..t-lags], exog columns]."""
+        start = max(int(start), lags)
+        stop = len(series)
+        feature_cols = tuple(feature_cols)
+        s_root = readonly_root(series)
+        e_root = readonly_root(exog.values) if exog is not None and feature_cols else None
+        if s_root is None or (exog is not None and feature_cols and e_root is None):
+            return _build_design(series, lags, start, stop, exog, feature_cols, intercept)
+
+        exog_cols = tuple(exog.columns) if e_root is not None else ()
+        key = id(s_root)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.covers(s_root, e_root, exog_cols, lags, feature_cols):
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                max_lag, wanted = lags, feature_cols
+                if entry is not None and entry.series_ref() is s_root:
+                    max_lag = max(lags, entry.max_lag)
+                    if not feature_cols:
+                        # Keep the columns built so far for the variants that use them.
+                        e_root, exog_cols = entry.exog_root(), entry.exog_cols
+                        wanted = entry.feature_cols
+                    elif entry.exog_root() is e_root and entry.exog_cols == exog_cols:
+                        wanted = entry.feature_cols + tuple(c for c in feature_cols if c not in entry.feature_cols)
+                evict = lambda _ref, key=key: self._discard(key)  # noqa: E731
+                entry = _SiteDesign(s_root, e_root, exog_cols, max_lag, wanted, evict)
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                self.builds += 1
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        columns = ([0] if intercept else []) + list(range(1, lags + 1))
+        columns += [1 + entry.max_lag + entry.feature_cols.index(c) for c in feature_cols]
+        if not columns:
+            return entry.matrix[start:stop, :0]
+        if columns == list(range(columns[0], columns[-1] + 1)):
+            return entry.matrix[start:stop, columns[0] : columns[-1] + 1]
+        out = entry.matrix[start:stop, columns]
+        out.flags.writeable = False
+        return out
+
+    def _discard(self, key: int) -> None:
+        # Fired when a root dies; the entry may since have been rebuilt on live arrays.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not entry.alive():
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_DESIGN_CACHE = DesignMatrixCache()
+
+
+def design_rows(
+    series,
+    lags: int,
+    start: int,
+    exog: ExogMatrix | None = None,
+    feature_cols: Sequence[str] = (),
+    intercept: bool = False,
+) -> np.ndarray:
+    """Design matrix rows for one fit, served from the process-wide cache when the inputs allow."""
+    return _DESIGN_CACHE.rows(series, lags, start, exog=exog, feature_cols=feature_cols, intercept=intercept)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+import numpy as np
+
+from src.data.csv_loader import CSVLoadResult, load_scada_nwp_series
+from src.data.dataset_cache import dataset_cache_key, load_cached_dataset, save_cached_dataset
+
+
+@dataclass(frozen=True)
+class SiteSource:
+    site_id: str
+    scada_csv: str
+    nwp_csv: str
+    target_col: str = "Total_Power"
+    timestamp_col: str = "Timestamp"
+    max_rows: int | None = None
+    feature_cols: tuple[str, ...] | None = None
+    # Dataset cache settings; cache_dir None disables the cache.
+    cache_dir: str | None = None
+    cache_hash: bool = False
+
+
+def site_sources_from_config(exp_cfg: dict, data_cfg: dict, cache_dir: str | None) -> list[SiteSource]:
+    """One source per site from `data.sites`, or the single `data.scada_csv`/`nwp_csv` pair.
+
+    Entries in `data.sites` may override `target_col`, `timestamp_col`,
+    `max_rows` and `feature_cols`; otherwise the `data` level values apply.
+    """
+
+    def _source(site_id: str, entry: dict) -> SiteSource:
+        scada_csv = entry.get("scada_csv")
+        nwp_csv = entry.get("nwp_csv")
+        if not scada_csv or not nwp_csv:
+            raise ValueError(f"Site {site_id}: both scada_csv and nwp_csv are required")
+        max_rows = entry.get("max_rows", data_cfg.get("max_rows"))
+        feature_cols = entry.get("feature_cols", data_cfg.get("feature_cols"))
+        return SiteSource(
+            site_id=site_id,
+            scada_csv=str(scada_csv),
+            nwp_csv=str(nwp_csv),
+            target_col=str(entry.get("target_col", data_cfg.get("target_col", "Total_Power"))),
+            timestamp_col=str(entry.get("timestamp_col", data_cfg.get("timestamp_col", "Timestamp"))),
+            max_rows=int(max_rows) if max_rows is not None else None,
+            feature_cols=tuple(str(c) for c in feature_cols) if feature_cols else None,
+            cache_dir=cache_dir,
+            cache_hash=bool(data_cfg.get("cache_hash", False)),
+        )
+
+    site_entries = data_cfg.get("sites")
+    if not site_entries:
+        if not data_cfg.get("scada_csv") or not data_cfg.get("nwp_csv"):
+            raise ValueError("For real_csv mode, both data.scada_csv and data.nwp_csv are required")
+        site_id = str(exp_cfg.get("sites", ["site_real_01"])[0])
+        return [_source(site_id, data_cfg)]
+
+    sources: dict[str, SiteSource] = {}
+    for entry in site_entries:
+        site_id = str(entry.get("site_id", "")).strip()
+        if not site_id:
+            raise ValueError("Every data.sites entry needs a site_id")
+        if site_id in sources:
+            raise ValueError(f"Duplicate site_id in data.sites: {site_id}")
+        sources[site_id] = _source(site_id, entry)
+
+    wanted = exp_cfg.get("sites")
+    if not wanted:
+        return list(sources.values())
+    missing = [str(s) for s in wanted if str(s) not in sources]
+    if missing:
+        raise ValueError(f"experiment.sites not found in data.sites: {missing}")
+    return [sources[str(s)] for s in wanted]
+
+
+def _cache_key(source: SiteSource) -> tuple[str, dict]:
+    return dataset_cache_key(
+        [source.scada_csv, source.nwp_csv],
+        target_col=source.target_col,
+        timestamp_col=source.timestamp_col,
+        feature_cols=list(source.feature_cols) if source.feature_cols else None,
+        max_rows=source.max_rows,
+        site_id=source.site_id,
+        hash_content=source.cache_hash,
+    )
+
+
+def load_site(source: SiteSource) -> CSVLoadResult:
+    """Parse one site's CSVs, keep `feature_cols`, and store the result in the cache if enabled."""
+    result = load_scada_nwp_series(
+        scada_csv=source.scada_csv,
+        nwp_csv=source.nwp_csv,
+        site_id=source.site_id,
+        target_col=source.target_col,
+        timestamp_col=source.timestamp_col,
+        max_rows=source.max_rows,
+    )
+    exog = result.exog.select(source.feature_cols) if source.feature_cols else result.exog
+
+    stats = dict(result.stats)
+    if len(exog) and source.feature_cols:
+        first_row = exog.row(0)
+        stats["n_exog_features"] = len(first_row)
+        stats["feature_cols"] = ",".join(sorted(first_row))
+    result = replace(result, exog=exog, stats=stats)
+
+    if source.cache_dir is not None:
+        key, inputs = _cache_key(source)
+        save_cached_dataset(source.cache_dir, key, result, inputs)
+    return result
+
+
+def _load_site_in_worker(source: SiteSource) -> CSVLoadResult | None:
+    # With the cache on, the worker only writes the entry; the parent memory-maps it
+    # rather than receiving a pickled copy of every array.
+    result = load_site(source)
+    return None if source.cache_dir is not None else result
+
+
+def load_sites(sources: list[SiteSource], workers: int = 1) -> dict[str, CSVLoadResult]:
+    """Load every site, serving cache hits directly and parsing misses in a process pool."""
+    results: dict[str, CSVLoadResult] = {}
+    misses: list[SiteSource] = []
+    for source in sources:
+        cached = load_cached_dataset(source.cache_dir, _cache_key(source)[0]) if source.cache_dir else None
+        if cached is None:
+            misses.append(source)
+        else:
+            cached.stats["dataset_cache"] = "hit"
+            results[source.site_id] = cached
+
+    if misses and workers > 1 and len(misses) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(misses))) as ex:
+            loaded = list(ex.map(_load_site_in_worker, misses))
+    else:
+        loaded = [load_site(source) for source in misses]
+
+    for source, result in zip(misses, loaded):
+        if result is None:
+            result = load_cached_dataset(source.cache_dir, _cache_key(source)[0])
+            if result is None:
+                raise RuntimeError(f"Dataset cache entry for site {source.site_id} was not written")
+        if source.cache_dir is not None:
+            result.stats["dataset_cache"] = "miss"
+        results[source.site_id] = result
+    return {source.site_id: results[source.site_id] for source in sources}
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.strptime(value.strip(), "%Y/%m/%d %H:%M")
+
+
+def merge_site_stats(results: dict[str, CSVLoadResult]) -> dict:
+    """Fleet-level profile: totals and ranges across sites, plus each site's own stats."""
+    per_site = {site_id: dict(r.stats) for site_id, r in results.items()}
+    stats = list(per_site.values())
+    rows_final = sum(int(s["rows_final"]) for s in stats)
+    merged: dict = {
+        "source": "real_csv",
+        "site_id": ",".join(per_site),
+        "n_sites": len(per_site),
+    }
+    for key in ("rows_scada", "rows_nwp", "rows_aligned", "rows_final", "rows_dropped_target_parse"):
+        merged[key] = sum(int(s[key]) for s in stats)
+    merged["n_exog_features"] = max(int(s["n_exog_features"]) for s in stats)
+    merged["target_min"] = min(float(s["target_min"]) for s in stats)
+    merged["target_max"] = max(float(s["target_max"]) for s in stats)
+    merged["target_mean"] = round(sum(float(np.sum(r.series)) for r in results.values()) / rows_final, 6)
+    merged["time_start"] = min((str(s["time_start"]) for s in stats), key=_parse_time)
+    merged["time_end"] = max((str(s["time_end"]) for s in stats), key=_parse_time)
+    merged["sites"] = per_site
+    return merged
@@ -1,11 +1,30 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Union
+
+from src.data.exog import ExogMatrix
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Read-only, array-backed history (usually a NumPy slice of the full series); lists still work.
+FloatSeries = Union[Sequence[float], "np.ndarray"]
 
 
 class ForecastModel(ABC):
+    """Forecast model interface.
+
+    Exogenous inputs are `ExogMatrix` row views: `exog_history` is aligned with
+    the training series, and row `step` of `exog_future` holds the features at
+    origin + step (it may be shorter than the horizon at the end of the data).
+    """
+
     def __init__(self, params: dict | None = None) -> None:
         self.params = params or {}
+        # Thread allotment from the orchestrator's CPU budget; None means unmanaged.
+        self.num_threads: int | None = None
 
     @property
     @abstractmethod
@@ -13,15 +32,50 @@ class ForecastModel(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def fit(self, train_series: list[float], exog_history: list[dict[str, float]] | None = None) -> None:
+    def fit(self, train_series: FloatSeries, exog_history: ExogMatrix | None = None) -> None:
         raise NotImplementedError
 
     @abstractmethod
     def predict(
         self,
-        history: list[float],
+        history: FloatSeries,
         horizon: int,
-        exog_future: dict[str, float] | None = None,
-        exog_future_seq: list[dict[str, float] | None] | None = None,
+        exog_future: ExogMatrix | None = None,
     ) -> float:
         raise NotImplementedError
+
+    def set_num_threads(self, n_threads: int) -> None:
+        # Called before each fit with the trial's current share of the CPU budget.
+        # Models with a native thread pool read `num_threads` when building their estimator.
+        self.num_threads = max(1, int(n_threads))
+
+    def predict_path(
+        self,
+        history: FloatSeries,
+        horizon: int,
+        exog_future: ExogMatrix | None = None,
+    ) -> list[float]:
+        # Forecasts for steps 1..horizon from one origin. Recursive models override this
+        # with a single rollout; the default falls back to one predict call per step.
+        return [
+            self.predict(history, h, exog_future=exog_future[:h] if exog_future is not None else None)
+            for h in range(1, horizon + 1)
+        ]
+
+    def predict_batch(
+        self,
+        series: FloatSeries,
+        origins: list[int],
+        horizons: list[int],
+        exog: ExogMatrix | None = None,
+    ) -> dict[int, list[float]]:
+        # Predictions for every origin with a fixed fitted model, keyed by horizon.
+        # Subclasses may override with a vectorised path; results must match this loop.
+        max_h = max(horizons)
+        out: dict[int, list[float]] = {h: [] for h in horizons}
+        for origin in origins:
+            exog_future = exog[origin : origin + max_h] if exog is not None else None
+            path = self.predict_path(series[:origin], max_h, exog_future=exog_future)
+            for h in horizons:
+                out[h].append(path[h - 1])
+        return out
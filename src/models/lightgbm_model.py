@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from src.models.tabular_forecast import TabularAutoregModel
+from src.models.tabular_forecast import TabularAutoregModel, warm_start_rounds
 
 
 class LightGBMModel(TabularAutoregModel):
@@ -8,17 +8,26 @@ class LightGBMModel(TabularAutoregModel):
     def name(self) -> str:
         return "lightgbm"
 
-    def _make_estimator(self):
+    def _make_estimator(self, n_estimators: int | None = None):
         try:
             from lightgbm import LGBMRegressor
         except ImportError as exc:
             raise RuntimeError("lightgbm model requires lightgbm package") from exc
 
         return LGBMRegressor(
-            n_estimators=int(self.params.get("n_estimators", 500)),
+            n_estimators=n_estimators or int(self.params.get("n_estimators", 500)),
             learning_rate=float(self.params.get("learning_rate", 0.05)),
             num_leaves=int(self.params.get("num_leaves", 31)),
             subsample=float(self.params.get("subsample", 0.9)),
             colsample_bytree=float(self.params.get("colsample_bytree", 0.9)),
             random_state=int(self.params.get("random_state", 42)),
+            n_jobs=self._n_jobs(),
         )
+
+    def _fit_estimator(self, x, y, previous):
+        if previous is None:
+            return super()._fit_estimator(x, y, previous)
+        # Continued boosting: add a few trees on top of the previous booster.
+        estimator = self._make_estimator(n_estimators=warm_start_rounds(self.params, 500))
+        estimator.fit(x, y, init_model=previous.booster_)
+        return estimator
@@ -1,21 +1,28 @@
 from __future__ import annotations
 
-from src.models.base import ForecastModel
+from src.data.exog import ExogMatrix
+from src.data.features import design_rows
+from src.models.base import FloatSeries, ForecastModel
+from src.models.recursive_ls import RecursiveLeastSquares, WindowPrefix
 
 
 class LinearARModel(ForecastModel):
     def __init__(self, params: dict | None = None) -> None:
         super().__init__(params=params)
         self.coef: list[float] | None = None
+        self._rls: RecursiveLeastSquares | None = None
+        self._rls_len = 0
+        self._rls_source: WindowPrefix | None = None
 
     @property
     def name(self) -> str:
         return "linear_ar"
 
-    def fit(self, train_series: list[float], exog_history: list[dict[str, float]] | None = None) -> None:
+    def fit(self, train_series: FloatSeries, exog_history: ExogMatrix | None = None) -> None:
         lags = int(self.params.get("lags", 12))
         if lags < 1 or len(train_series) <= lags:
             self.coef = None
+            self._rls = None
             return
 
         try:
@@ -23,36 +30,66 @@ class LinearARModel(ForecastModel):
         except ImportError as exc:
             raise RuntimeError("linear_ar model requires numpy") from exc
 
-        x_rows: list[list[float]] = []
-        y_vals: list[float] = []
-        for t in range(lags, len(train_series)):
-            feat = [1.0]
-            feat.extend(train_series[t - i] for i in range(1, lags + 1))
-            x_rows.append(feat)
-            y_vals.append(train_series[t])
+        if str(self.params.get("refit_mode", "batch")).lower() == "incremental":
+            self._fit_incremental(train_series, lags)
+            return
 
-        x = np.asarray(x_rows, dtype=float)
-        y = np.asarray(y_vals, dtype=float)
+        x, y = self._design(train_series, lags, lags)
         if x.size == 0 or y.size == 0:
             self.coef = None
             return
         coef, *_ = np.linalg.lstsq(x, y, rcond=None)
         self.coef = [float(c) for c in coef]
 
+    def _design(self, train_series: FloatSeries, lags: int, start: int):
+        import numpy as np
+
+        x = design_rows(train_series, lags, start, intercept=True)
+        y = np.asarray(train_series[start:], dtype=float)
+        return x, y
+
+    def _fit_incremental(self, train_series: FloatSeries, lags: int) -> None:
+        # Expanding window: only rows added since the last fit are folded into the QR factor.
+        n = len(train_series)
+        if not (
+            self._rls is not None
+            and lags < self._rls_len <= n
+            and self._rls_source is not None
+            and self._rls_source.extended_by(train_series)
+        ):
+            self._rls = RecursiveLeastSquares(1 + lags, float(self.params.get("forgetting_factor", 1.0)))
+            self._rls_len = lags
+        if n > self._rls_len:
+            x, y = self._design(train_series, lags, self._rls_len)
+            self._rls.update(x, y)
+            self._rls_len = n
+            self._rls_source = WindowPrefix(n, train_series)
+        coef = self._rls.solve()
+        self.coef = None if coef is None else [float(c) for c in coef]
+
     def predict(
         self,
-        history: list[float],
+        history: FloatSeries,
         horizon: int,
-        exog_future: dict[str, float] | None = None,
-        exog_future_seq: list[dict[str, float] | None] | None = None,
+        exog_future: ExogMatrix | None = None,
     ) -> float:
-        if not history:
-            return 0.0
+        return self.predict_path(history, horizon)[-1]
+
+    def predict_path(
+        self,
+        history: FloatSeries,
+        horizon: int,
+        exog_future: ExogMatrix | None = None,
+    ) -> list[float]:
+        if len(history) == 0:
+            return [0.0] * horizon
         if self.coef is None:
-            return history[-1]
+            return [history[-1]] * horizon
 
         lags = int(self.params.get("lags", 12))
-        sim = list(history)
+        # Only the last `lags` values feed the recursion, so roll out in a small scratch buffer.
+        sim = [float(v) for v in history[-max(lags, 1):]]
+        start = len(sim)
         for _ in range(horizon):
             if len(sim) < lags:
                 sim.append(sim[-1])
@@ -61,4 +98,4 @@ class LinearARModel(ForecastModel):
             for i in range(lags):
                 val += self.coef[i + 1] * sim[-1 - i]
             sim.append(float(val))
-        return float(sim[-1])
+        return sim[start:]
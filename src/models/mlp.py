@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from src.models.tabular_forecast import TabularAutoregModel
+from src.models.tabular_forecast import TabularAutoregModel, warm_start_rounds
 
 
 def _parse_hidden_layers(value: object) -> tuple[int, ...]:
@@ -12,6 +12,9 @@ def _parse_hidden_layers(value: object) -> tuple[int, ...]:
 
 
 class MLPModel(TabularAutoregModel):
+    # Batched matmuls may differ from single-row ones in the last ulp; opt in via params.batch_predict.
+    exact_batch_predict = False
+
     @property
     def name(self) -> str:
         return "mlp"
@@ -35,3 +38,11 @@ class MLPModel(TabularAutoregModel):
             alpha=alpha,
             random_state=random_state,
         )
+
+    def _fit_estimator(self, x, y, previous):
+        if previous is None:
+            return super()._fit_estimator(x, y, previous)
+        # Resume from the previous weights for a shorter run of epochs.
+        previous.set_params(warm_start=True, max_iter=warm_start_rounds(self.params, 300, key="max_iter"))
+        previous.fit(x, y)
+        return previous
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from src.models.base import ForecastModel
+from src.data.exog import ExogMatrix
+from src.models.base import FloatSeries, ForecastModel
 
 
 class MovingAverageModel(ForecastModel):
@@ -8,18 +9,26 @@ class MovingAverageModel(ForecastModel):
     def name(self) -> str:
         return "moving_average"
 
-    def fit(self, train_series: list[float], exog_history: list[dict[str, float]] | None = None) -> None:
+    def fit(self, train_series: FloatSeries, exog_history: ExogMatrix | None = None) -> None:
         return
 
     def predict(
         self,
-        history: list[float],
+        history: FloatSeries,
         horizon: int,
-        exog_future: dict[str, float] | None = None,
-        exog_future_seq: list[dict[str, float] | None] | None = None,
+        exog_future: ExogMatrix | None = None,
     ) -> float:
         window = int(self.params.get("window", 6))
-        if not history:
+        if len(history) == 0:
             return 0.0
         segment = history[-window:] if len(history) > window else history
         return sum(segment) / len(segment)
+
+    def predict_path(
+        self,
+        history: FloatSeries,
+        horizon: int,
+        exog_future: ExogMatrix | None = None,
+    ) -> list[float]:
+        # The window mean does not depend on the horizon.
+        return [self.predict(history, 1)] * horizon
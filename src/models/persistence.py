@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from src.models.base import ForecastModel
+from src.data.exog import ExogMatrix
+from src.models.base import FloatSeries, ForecastModel
 
 
 class PersistenceModel(ForecastModel):
@@ -8,18 +9,25 @@ class PersistenceModel(ForecastModel):
     def name(self) -> str:
         return "persistence"
 
-    def fit(self, train_series: list[float], exog_history: list[dict[str, float]] | None = None) -> None:
+    def fit(self, train_series: FloatSeries, exog_history: ExogMatrix | None = None) -> None:
         return
 
     def predict(
         self,
-        history: list[float],
+        history: FloatSeries,
         horizon: int,
-        exog_future: dict[str, float] | None = None,
-        exog_future_seq: list[dict[str, float] | None] | None = None,
+        exog_future: ExogMatrix | None = None,
     ) -> float:
-        if not history:
+        if len(history) == 0:
             return 0.0
         if len(history) >= horizon:
             return history[-horizon]
         return history[-1]
+
+    def predict_path(
+        self,
+        history: FloatSeries,
+        horizon: int,
+        exog_future: ExogMatrix | None = None,
+    ) -> list[float]:
+        return [self.predict(history, h) for h in range(1, horizon + 1)]
@@ -18,7 +18,7 @@ class RandomForestModel(TabularAutoregModel):
         max_depth = self.params.get("max_depth")
         max_features = self.params.get("max_features", "sqrt")
         random_state = int(self.params.get("random_state", 42))
-        n_jobs = int(self.params.get("n_jobs", -1))
+        n_jobs = self._n_jobs()
 
         return RandomForestRegressor(
             n_estimators=n_estimators,
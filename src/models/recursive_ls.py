@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import hashlib
+
+import numpy as np
+
+from src.data.features import readonly_root
+
+
+class RecursiveLeastSquares:
+    """Running QR factor for expanding-window least squares.
+
+    Keeps the triangular factor R and Q'y of the (optionally forgetting-
+    weighted) design matrix and folds each block of new rows into it, so a
+    refit costs O(p^2) per new row plus one p x p triangular solve instead of
+    rebuilding the full design matrix. Unlike the normal equations X'X, R has
+    the condition number of X itself, so coefficients agree with a batch
+    `lstsq` on X to within 1e-8 of their largest magnitude even on
+    ill-conditioned exog designs (raw pressure next to collinear wind speeds).
+    """
+
+    def __init__(self, n_features: int, forgetting_factor: float = 1.0) -> None:
+        if not 0.0 < forgetting_factor <= 1.0:
+            raise ValueError("forgetting_factor must be in (0, 1]")
+        self.forgetting_factor = float(forgetting_factor)
+        self.r = np.zeros((n_features, n_features), dtype=float)
+        self.qty = np.zeros(n_features, dtype=float)
+        self.n_obs = 0
+
+    def update(self, x: np.ndarray, y: np.ndarray) -> None:
+        p = self.r.shape[0]
+        x = np.asarray(x, dtype=float).reshape(-1, p)
+        y = np.asarray(y, dtype=float).reshape(-1)
+        k = len(y)
+        if k == 0:
+            return
+        lam = self.forgetting_factor
+        if lam < 1.0:
+            # Row j of the block is k - 1 - j steps older than the newest one.
+            w = np.sqrt(lam ** np.arange(k - 1, -1, -1, dtype=float))
+            decay = np.sqrt(lam**k)
+            x = x * w[:, None]
+            y = y * w
+            self.r *= decay
+            self.qty *= decay
+        # Re-triangularise [R, Q'y] with the new rows stacked below it.
+        stacked = np.empty((p + k, p + 1), dtype=float)
+        stacked[:p, :p] = self.r
+        stacked[:p, p] = self.qty
+        stacked[p:, :p] = x
+        stacked[p:, p] = y
+        tri = np.linalg.qr(stacked, mode="r")
+        self.r = tri[:p, :p]
+        self.qty = tri[:p, p]
+        self.n_obs += k
+
+    def solve(self) -> np.ndarray | None:
+        if self.n_obs == 0:
+            return None
+        # lstsq on R gives the same minimum-norm solution as on X, also when R is singular.
+        coef, *_ = np.linalg.lstsq(self.r, self.qty, rcond=None)
+        return coef
+
+
+class WindowPrefix:
+    """The first `n_rows` rows an expanding-window fit consumed, to tell whether a later window extends them.
+
+    Read-only arrays (the runner's frozen site series and exog) are recognised
+    by the buffer they view from its first element; other inputs by a checksum
+    of those rows.
+    """
+
+    def __init__(self, n_rows: int, *arrays) -> None:
+        self.n_rows = n_rows
+        self._parts = [self._part(arr) for arr in arrays]
+
+    def _part(self, arr) -> np.ndarray | bytes | None:
+        if arr is None:
+            return None
+        root = readonly_root(arr)
+        if root is not None:
+            return root
+        return hashlib.sha256(np.ascontiguousarray(arr[: self.n_rows], dtype=float).tobytes()).digest()
+
+    def extended_by(self, *arrays) -> bool:
+        if len(arrays) != len(self._parts):
+            return False
+        for part, arr in zip(self._parts, arrays):
+            if arr is not None and len(arr) < self.n_rows:
+                return False
+            new = self._part(arr)
+            if isinstance(part, np.ndarray) or isinstance(new, np.ndarray):
+                if part is not new:
+                    return False
+            elif part != new:
+                return False
+        return True
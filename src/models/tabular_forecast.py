@@ -1,31 +1,38 @@
 from __future__ import annotations
 
-from src.models.base import ForecastModel
+from src.data.exog import ExogMatrix
+from src.data.features import design_rows
+from src.models.base import FloatSeries, ForecastModel
 
 
-def _to_float(value: object, default: float = 0.0) -> float:
-    try:
-        return float(value)  # type: ignore[arg-type]
-    except (TypeError, ValueError):
-        return default
+def _truthy(value: object) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+def warm_start_rounds(params: dict, default: int, key: str = "n_estimators") -> int:
+    # Extra boosting rounds / epochs per warm-started refit (default: a fifth of a full fit).
+    if params.get("warm_start_rounds") is not None:
+        return max(1, int(params["warm_start_rounds"]))
+    return max(1, int(params.get(key, default)) // 5)
 
 
 def _resolve_feature_cols(
-    exog_history: list[dict[str, float]] | None,
+    exog_history: ExogMatrix | None,
     feature_cols_param: object,
 ) -> list[str]:
     if isinstance(feature_cols_param, list) and feature_cols_param:
         return [str(c) for c in feature_cols_param]
-    if not exog_history:
+    if exog_history is None or len(exog_history) == 0:
         return []
-    for row in exog_history:
-        if row:
-            return sorted(str(k) for k in row.keys())
-    return []
+    return sorted(exog_history.first_row_columns())
 
 
 class TabularAutoregModel(ForecastModel):
     estimator_name = "tabular_autoreg"
+    # Whether a multi-row estimator.predict is bit-identical to row-by-row calls.
+    exact_batch_predict = True
 
     def __init__(self, params: dict | None = None) -> None:
         super().__init__(params=params)
@@ -36,51 +43,125 @@ class TabularAutoregModel(ForecastModel):
     def _make_estimator(self):
         raise NotImplementedError
 
-    def _make_row(self, history: list[float], exog_row: dict[str, float] | None) -> list[float]:
+    def _n_jobs(self) -> int:
+        # params.n_jobs (default -1, all cores) capped by the CPU budget allotment, if any.
+        requested = int(self.params.get("n_jobs", -1))
+        if self.num_threads is None:
+            return requested
+        return self.num_threads if requested <= 0 else min(requested, self.num_threads)
+
+    def _exog_block(self, exog: ExogMatrix | None, n_rows: int):
+        # Feature columns as a dense array; absent columns, NaNs and missing rows are 0.0.
+        import numpy as np
+
+        if exog is None:
+            return np.zeros((n_rows, len(self.feature_cols)), dtype=float)
+        return exog.to_array(self.feature_cols, fill=0.0, n_rows=n_rows)
+
+    def _make_row(self, history: FloatSeries, exog_values) -> list[float]:
         row = [history[-i] for i in range(1, self.lags + 1)]
         if self.feature_cols:
-            ex = exog_row or {}
-            row.extend(_to_float(ex.get(c, 0.0), 0.0) for c in self.feature_cols)
+            row.extend(exog_values)
         return row
 
-    def fit(self, train_series: list[float], exog_history: list[dict[str, float]] | None = None) -> None:
+    def fit(self, train_series: FloatSeries, exog_history: ExogMatrix | None = None) -> None:
         if self.lags < 1 or len(train_series) <= self.lags:
             self.estimator = None
             return
 
         self.feature_cols = _resolve_feature_cols(exog_history, self.params.get("feature_cols"))
-        x_rows: list[list[float]] = []
-        y_vals: list[float] = []
-        for t in range(self.lags, len(train_series)):
-            ex_row = exog_history[t] if exog_history and t < len(exog_history) else None
-            x_rows.append(self._make_row(train_series[:t], ex_row))
-            y_vals.append(float(train_series[t]))
-
-        if not x_rows:
-            self.estimator = None
-            return
-
-        self.estimator = self._make_estimator()
-        self.estimator.fit(x_rows, y_vals)
+        try:
+            import numpy as np
+        except ImportError as exc:
+            raise RuntimeError(f"{self.name} requires numpy") from exc
+
+        y = np.asarray(train_series, dtype=float)
+        x = design_rows(
+            train_series,
+            self.lags,
+            self.lags,
+            exog=exog_history if self.feature_cols else None,
+            feature_cols=self.feature_cols,
+        )
+        y_vals = y[self.lags :]
+
+        previous = self.estimator if _truthy(self.params.get("warm_start", False)) else None
+        self.estimator = self._fit_estimator(x, y_vals, previous)
+
+    def _fit_estimator(self, x, y, previous):
+        # `previous` is the last fitted estimator when params.warm_start is on; subclasses
+        # that support continued training start from it instead of training from zero.
+        estimator = self._make_estimator()
+        estimator.fit(x, y)
+        return estimator
 
     def predict(
         self,
-        history: list[float],
+        history: FloatSeries,
         horizon: int,
-        exog_future: dict[str, float] | None = None,
-        exog_future_seq: list[dict[str, float] | None] | None = None,
+        exog_future: ExogMatrix | None = None,
     ) -> float:
-        if not history:
-            return 0.0
+        return self.predict_path(history, horizon, exog_future=exog_future)[-1]
+
+    def predict_path(
+        self,
+        history: FloatSeries,
+        horizon: int,
+        exog_future: ExogMatrix | None = None,
+    ) -> list[float]:
+        if len(history) == 0:
+            return [0.0] * horizon
         if self.estimator is None or len(history) < self.lags:
-            return history[-1]
+            return [history[-1]] * horizon
 
-        sim = list(history)
+        exog_block = self._exog_block(exog_future, horizon) if self.feature_cols else None
+        sim = [float(v) for v in history[-self.lags:]]
         for step in range(horizon):
-            ex_row = exog_future
-            if exog_future_seq and step < len(exog_future_seq):
-                ex_row = exog_future_seq[step]
-            x = self._make_row(sim, ex_row)
+            x = self._make_row(sim, exog_block[step] if exog_block is not None else None)
             y_hat = float(self.estimator.predict([x])[0])
             sim.append(y_hat)
-        return float(sim[-1])
+        return sim[self.lags:]
+
+    def predict_batch(
+        self,
+        series: FloatSeries,
+        origins: list[int],
+        horizons: list[int],
+        exog: ExogMatrix | None = None,
+    ) -> dict[int, list[float]]:
+        # One estimator call per rollout step across all origins instead of one per (origin, step).
+        batch_enabled = bool(self.params.get("batch_predict", self.exact_batch_predict))
+        if not batch_enabled or self.estimator is None or not origins or min(origins) < max(self.lags, 1):
+            return super().predict_batch(series, origins, horizons, exog=exog)
+
+        try:
+            import numpy as np
+        except ImportError as exc:
+            raise RuntimeError(f"{self.name} batched prediction requires numpy") from exc
+
+        max_h = max(horizons)
+        y = np.asarray(series, dtype=float)
+        origin_arr = np.asarray(origins, dtype=np.int64)
+        # Column i holds history[-(i + 1)], matching _make_row.
+        lag_idx = origin_arr[:, None] - np.arange(1, self.lags + 1)[None, :]
+        lag_block = y[lag_idx]
+
+        exog_matrix = None
+        if self.feature_cols:
+            # Only the rows this segment's rollouts read, so a refit cadence does not copy the
+            # whole site's exog once per segment.
+            first, stop = int(origin_arr.min()), int(origin_arr.max()) + max_h
+            exog_matrix = self._exog_block(exog[first:stop] if exog is not None else None, stop - first)
+            exog_offset = origin_arr - first
+
+        steps: list = []
+        for step in range(max_h):
+            if exog_matrix is not None:
+                x = np.hstack([lag_block, exog_matrix[exog_offset + step]])
+            else:
+                x = lag_block
+            y_hat = np.asarray(self.estimator.predict(x), dtype=float)
+            steps.append(y_hat)
+            lag_block = np.hstack([y_hat[:, None], lag_block[:, :-1]])
+
+        return {h: [float(v) for v in steps[h - 1]] for h in horizons}
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from src.models.tabular_forecast import TabularAutoregModel
+from src.models.tabular_forecast import TabularAutoregModel, warm_start_rounds
 
 
 class XGBoostModel(TabularAutoregModel):
@@ -8,14 +8,14 @@ class XGBoostModel(TabularAutoregModel):
     def name(self) -> str:
         return "xgboost"
 
-    def _make_estimator(self):
+    def _make_estimator(self, n_estimators: int | None = None):
         try:
             from xgboost import XGBRegressor
         except ImportError as exc:
             raise RuntimeError("xgboost model requires xgboost package") from exc
 
         return XGBRegressor(
-            n_estimators=int(self.params.get("n_estimators", 500)),
+            n_estimators=n_estimators or int(self.params.get("n_estimators", 500)),
             learning_rate=float(self.params.get("learning_rate", 0.05)),
             max_depth=int(self.params.get("max_depth", 6)),
             subsample=float(self.params.get("subsample", 0.9)),
@@ -23,5 +23,13 @@ class XGBoostModel(TabularAutoregModel):
             reg_lambda=float(self.params.get("reg_lambda", 1.0)),
             objective="reg:squarederror",
             random_state=int(self.params.get("random_state", 42)),
-            n_jobs=int(self.params.get("n_jobs", -1)),
+            n_jobs=self._n_jobs(),
         )
+
+    def _fit_estimator(self, x, y, previous):
+        if previous is None:
+            return super()._fit_estimator(x, y, previous)
+        # Continued boosting: add a few trees on top of the previous booster.
+        estimator = self._make_estimator(n_estimators=warm_start_rounds(self.params, 500))
+        estimator.fit(x, y, xgb_model=previous.get_booster())
+        return estimator
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import csv
+import gzip
 import json
+import os
 from pathlib import Path
+import tempfile
 from typing import Any
 
 
@@ -34,6 +37,30 @@ def write_json(path: str | Path, data: Any) -> None:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
+def write_json_gz(path: str | Path, data: Any) -> Path:
+    """Gzipped JSON, written to a temp file and renamed so readers never see half an entry."""
+    target = Path(path)
+    ensure_dir(target.parent)
+    fd, tmp = tempfile.mkstemp(prefix=f".{target.name}.", dir=target.parent)
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=3) as f:
+            f.write(json.dumps(data).encode("utf-8"))
+        os.replace(tmp, target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return target
+
+
+def read_json_gz(path: str | Path) -> Any | None:
+    """Contents of a `write_json_gz` file, or None if it is absent or unreadable."""
+    try:
+        with gzip.open(path, "rb") as f:
+            return json.loads(f.read().decode("utf-8"))
+    except (OSError, ValueError, EOFError):
+        return None
+
+
 def write_csv(path: str | Path, rows: list[dict[str, Any]]) -> None:
     target = Path(path)
     ensure_dir(target.parent)
@@ -47,3 +74,54 @@ def write_csv(path: str | Path, rows: list[dict[str, Any]]) -> None:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         writer.writerows(rows)
+
+
+class CsvRowWriter:
+    """Append dict rows to a CSV as they arrive; the header comes from the first row.
+
+    Produces the same file as `write_csv` on the concatenated rows without
+    holding them all in memory. Nothing is created until the first row, and
+    every batch is flushed, so a crash loses at most the batch being written.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.n_rows = 0
+        self._file = None
+        self._writer: csv.DictWriter | None = None
+
+    def _open(self, fieldnames: list[str]) -> csv.DictWriter:
+        if self._writer is None:
+            ensure_dir(self.path.parent)
+            self._file = self.path.open("w", encoding="utf-8", newline="")
+            self._writer = csv.DictWriter(self._file, fieldnames=fieldnames)
+            self._writer.writeheader()
+        return self._writer
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        self._open(list(rows[0].keys())).writerows(rows)
+        self._file.flush()
+        self.n_rows += len(rows)
+
+    def write_columns(self, columns: dict[str, list[Any]]) -> None:
+        """Append rows given column-wise (equal-length lists), skipping the per-row dicts."""
+        n = len(next(iter(columns.values()), []))
+        if n == 0:
+            return
+        writer = self._open(list(columns))
+        writer.writer.writerows(zip(*(columns[name] for name in writer.fieldnames)))
+        self._file.flush()
+        self.n_rows += n
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> CsvRowWriter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import unittest
+
+from src.core.model_specs import budget_series_length, expand_model_specs
+from src.core.search import (
+    Range,
+    TPESampler,
+    build_search,
+    build_tpe,
+    halving_rungs,
+    hyperband_brackets,
+    parse_space,
+    rung_params,
+    run_search,
+)
+
+
+def _model_cfg(method: str, **search) -> dict:
+    return {
+        "name": "xgboost",
+        "search": {"method": method, **search},
+        "params_grid": {"max_depth": [2, 4, 6], "n_estimators": [30, 60, 90]},
+    }
+
+
+def _score(params: dict, budget: float) -> float:
+    # Deeper is better; a small budget adds noise that favours shallow trees.
+    return 10.0 - params["max_depth"] - params["n_estimators"] / 100 + (1.0 - budget) * params["max_depth"] * 0.1
+
+
+class AdaptiveSearchTest(unittest.TestCase):
+    def test_rungs_promote_a_third_and_end_at_full_budget(self) -> None:
+        rungs = halving_rungs(27, eta=3)
+        self.assertEqual([r.n_candidates for r in rungs], [27, 9, 3, 1])
+        self.assertAlmostEqual(rungs[0].budget, 1 / 27)
+        self.assertEqual(rungs[-1].budget, 1.0)
+        self.assertEqual([r.n_candidates for r in halving_rungs(27, 3, min_budget=0.2)], [27, 9])
+
+        brackets = hyperband_brackets(3, 1 / 9)
+        self.assertEqual([n for n, _ in brackets], [9, 5, 3])
+        self.assertEqual([len(rungs) for _, rungs in brackets], [3, 2, 1])
+
+    def test_halving_finds_the_best_candidate_for_part_of_the_cost(self) -> None:
+        spec = build_search(_model_cfg("halving"), seed=1)
+        evaluated: list[float] = []
+
+        def evaluate(work: list[tuple[dict, float]]) -> list[float]:
+            evaluated.extend(budget for _, budget in work)
+            return [_score(params, budget) for params, budget in work]
+
+        finalists, history, timed_out = run_search(spec, evaluate)
+        self.assertFalse(timed_out)
+        self.assertEqual(finalists, [{"max_depth": 6, "n_estimators": 90}])
+        self.assertEqual(len(history), 9 + 3)
+        # Partial rungs cost 9/9 + 3/3 full trials instead of 9.
+        self.assertAlmostEqual(sum(evaluated), 2.0)
+
+    def test_time_budget_stops_promotion(self) -> None:
+        spec = build_search(_model_cfg("hyperband", min_budget=1 / 9, time_budget_s=0), seed=1)
+        finalists, history, timed_out = run_search(spec, lambda work: [0.0] * len(work))
+        self.assertTrue(timed_out)
+        self.assertEqual(history, [])
+        self.assertEqual(len(finalists), len({str(sorted(p.items())) for p in finalists}))
+
+    def test_budget_scales_the_resource(self) -> None:
+        self.assertEqual(rung_params({"n_estimators": 90}, "n_estimators", 1 / 3), {"n_estimators": 30})
+        self.assertEqual(rung_params({"n_estimators": 90}, "origins", 1 / 3), {"n_estimators": 90})
+        # 100 points, train 40, max horizon 4: 57 origins; a third keeps 19.
+        self.assertEqual(budget_series_length(100, 40, [1, 4], 1 / 3), 40 + 3 + 19)
+        with self.assertRaises(ValueError):
+            build_search(_model_cfg("halving", resource="learning_rate"), seed=1)
+
+    def test_adaptive_entries_are_not_expanded_up_front(self) -> None:
+        specs = expand_model_specs([{"name": "persistence"}, _model_cfg("halving")], seed=1)
+        self.assertEqual([s["name"] for s in specs], ["persistence"])
+
+    def test_tpe_space_mixes_lists_and_ranges(self) -> None:
+        space = parse_space({"lags": [4, 8], "learning_rate": {"low": 0.01, "high": 0.3, "log": True}})
+        self.assertEqual(space["lags"], [4, 8])
+        self.assertEqual(space["learning_rate"], Range(0.01, 0.3, log=True))
+        with self.assertRaises(ValueError):
+            parse_space({"learning_rate": {"low": 0.0, "high": 0.3, "log": True}})
+        with self.assertRaises(ValueError):
+            build_search({**_model_cfg("halving"), "params_grid": {"learning_rate": {"low": 0.1, "high": 0.3}}}, seed=1)
+        # A discrete space caps max_trials at its size.
+        self.assertEqual(build_tpe({**_model_cfg("tpe", max_trials=50)}, seed=1).max_trials, 9)
+
+    def test_tpe_concentrates_on_the_good_region(self) -> None:
+        space = parse_space(
+            {"x": {"low": 0.001, "high": 1.0, "log": True}, "n": {"low": 1, "high": 100, "type": "int"}, "c": [1, 2, 3]}
+        )
+
+        def objective(p: dict) -> float:
+            return abs(p["x"] - 0.01) * 100 + abs(p["n"] - 60) / 10 + (p["c"] != 2)
+
+        sampler = TPESampler(space, seed=3, n_startup=8)
+        scores = []
+        for _ in range(40):
+            params = sampler.suggest()
+            self.assertIsInstance(params["n"], int)
+            self.assertTrue(0.001 <= params["x"] <= 1.0)
+            scores.append(objective(params))
+            sampler.tell(params, scores[-1])
+        self.assertLess(min(scores[8:]), min(scores[:8]))
+        self.assertLess(sorted(scores[-10:])[5], sorted(scores[:8])[4])
+
+    def test_tpe_does_not_repeat_discrete_points(self) -> None:
+        sampler = TPESampler(parse_space({"a": [1, 2], "b": [1, 2, 3]}), seed=0, n_startup=2)
+        seen: list[dict] = []
+        for _ in range(6):
+            params = sampler.suggest(exclude=seen)
+            seen.append(params)
+            sampler.tell(params, float(params["a"] + params["b"]))
+        self.assertEqual(len({(p["a"], p["b"]) for p in seen}), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import unittest
+
+from src.core.runner import run_backtest
+from src.data.exog import ExogMatrix
+from src.models.base import ForecastModel
+from src.models.tabular_forecast import TabularAutoregModel
+
+
+class _WeightedSumEstimator:
+    def fit(self, x_rows, y_vals) -> None:
+        return
+
+    def predict(self, x_rows) -> list[float]:
+        out = []
+        for row in x_rows:
+            val = 0.0
+            for i, v in enumerate(row):
+                val += float(v) * (0.5 / (i + 1))
+            out.append(val)
+        return out
+
+
+class _WeightedSumModel(TabularAutoregModel):
+    @property
+    def name(self) -> str:
+        return "weighted_sum"
+
+    def _make_estimator(self):
+        return _WeightedSumEstimator()
+
+
+class TabularBatchPredictTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.series = [((t * 37) % 17) / 17.0 for t in range(80)]
+        # Some rows are empty or missing a column to exercise the zero fallback.
+        self.exog = ExogMatrix.from_rows([{"f": float(t % 5), "g": t / 80.0} if t % 7 else {} for t in range(78)])
+
+    def test_predict_batch_matches_row_by_row_loop(self) -> None:
+        model = _WeightedSumModel(params={"lags": 3, "feature_cols": ["f", "g"]})
+        model.fit(self.series[:40], exog_history=self.exog[:40])
+        horizons = [1, 2, 4, 8]
+
+        # A whole run and a mid-series refit segment, whose exog rows start past row 0.
+        for origins in (list(range(40, 73)), list(range(55, 61))):
+            fast = model.predict_batch(self.series, origins, horizons, exog=self.exog)
+            slow = ForecastModel.predict_batch(model, self.series, origins, horizons, exog=self.exog)
+            for h in horizons:
+                self.assertEqual(fast[h], slow[h])
+
+    def test_run_backtest_without_refit_matches_per_origin_predict(self) -> None:
+        model = _WeightedSumModel(params={"lags": 4, "feature_cols": ["f"]})
+        rows = run_backtest(
+            series=self.series,
+            site_id="s1",
+            model=model,
+            model_label="weighted_sum",
+            horizons=[1, 3],
+            train_size=50,
+            exog=self.exog,
+            refit_each_origin=False,
+        )
+
+        for row in rows:
+            origin = row["origin_index"]
+            h = row["horizon"]
+            expected = model.predict(self.series[:origin], h, exog_future=self.exog[origin : origin + h])
+            self.assertEqual(row["y_pred"], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.checkpoint import RunCheckpoint
+from src.core.orchestrator import run_experiment
+from src.core.predictions import PredictionBlock
+
+
+def _config() -> dict:
+    return {
+        "experiment": {
+            "name": "ckpt",
+            "sites": ["s1", "s2"],
+            "horizons": [1, 2],
+            "train_size": 40,
+            "refit_every": 5,
+            "timing_history": None,
+            "result_cache": None,
+        },
+        "models": [
+            {"name": "persistence"},
+            {"name": "linear_ar", "params_grid": {"lags": [2, 3]}},
+        ],
+    }
+
+
+def _dataset() -> dict:
+    return {
+        "s1": [((t * 37) % 17) / 17.0 for t in range(60)],
+        "s2": [((t * 11) % 13) / 13.0 for t in range(70)],
+    }
+
+
+class RunCheckpointTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self._cwd = os.getcwd()
+        os.chdir(self._tmp.name)
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_tasks_and_searches_round_trip(self) -> None:
+        ckpt = RunCheckpoint("run")
+        self.assertFalse(ckpt.exists())
+        with self.assertRaises(FileNotFoundError):
+            ckpt.manifest()
+
+        ckpt.start({"experiment": {"name": "x"}}, {"s1": "abc"})
+        block = PredictionBlock("s1", "m", [5, 5], [1, 2], [1.0, 2.0], [1.5, 2.5], timestamps=None)
+        ckpt.save_task(block, {"total_s": 1.0})
+        ckpt.save_search(0, {"model_name": "m", "finalists": []})
+
+        self.assertEqual(ckpt.manifest()["fingerprints"], {"s1": "abc"})
+        [(restored, timings)] = ckpt.load_tasks()
+        self.assertEqual(restored, block)
+        self.assertEqual(timings, {"total_s": 1.0})
+        self.assertEqual(ckpt.load_search(0)["model_name"], "m")
+        self.assertIsNone(ckpt.load_search(1))
+
+    def test_resume_reruns_only_missing_tasks(self) -> None:
+        first = run_experiment(_config(), _dataset())
+        out_dir = Path(first["output_dir"])
+        expected = sorted((out_dir / "predictions.csv").read_text().splitlines())
+
+        # Lose two backtests, as if the run had died before they finished.
+        tasks = sorted((out_dir / "checkpoints").glob("task-*.json.gz"))
+        self.assertEqual(len(tasks), 6)
+        for path in tasks[:2]:
+            path.unlink()
+        (out_dir / "predictions.csv").unlink()
+
+        resumed = run_experiment(_config(), _dataset(), resume_dir=str(out_dir))
+        self.assertEqual(resumed["output_dir"], str(out_dir))
+        self.assertEqual(sorted((out_dir / "predictions.csv").read_text().splitlines()), expected)
+        self.assertEqual(resumed["metrics"], first["metrics"])
+
+        changed = _dataset()
+        changed["s2"] = changed["s2"][:-1]
+        with self.assertRaises(ValueError):
+            run_experiment(_config(), changed, resume_dir=str(out_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
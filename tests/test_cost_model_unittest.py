@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.cost_model import TaskTimingStore, task_signature
+from src.core.runner import count_backtest_work
+
+
+def _signature(model_name: str = "xgboost", n_series: int = 1000, n_fits: int = 10) -> dict:
+    return task_signature(
+        model_name,
+        {"lags": 8},
+        n_series=n_series,
+        n_origins=100,
+        n_fits=n_fits,
+        n_horizons=2,
+        refit="every:10",
+    )
+
+
+class CostModelTest(unittest.TestCase):
+    def test_estimates_prefer_history_and_scale_it(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = TaskTimingStore(Path(tmp) / "timings.jsonl")
+            expected, source = store.estimate(_signature(), "boost")
+            self.assertEqual(source, "prior")
+            self.assertGreater(expected, store.estimate(_signature("persistence"), "baseline")[0])
+
+            store.append([{**_signature(), "fit_s": 4.0, "predict_s": 1.0}])
+            reloaded = TaskTimingStore(Path(tmp) / "timings.jsonl")
+            self.assertEqual(reloaded.estimate(_signature(), "boost"), (5.0, "history"))
+
+            # Twice the fits on a series twice as long: fit cost x4, predict cost unchanged.
+            expected, source = reloaded.estimate(_signature(n_series=2000, n_fits=20), "boost")
+            self.assertEqual(source, "history_scaled")
+            self.assertAlmostEqual(expected, 17.0)
+
+    def test_history_is_compacted_without_changing_estimates(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "timings.jsonl"
+            with path.open("w", encoding="utf-8") as f:
+                for i in range(1200):
+                    record = {**_signature(n_series=1000 + 100 * (i % 3)), "fit_s": float(i % 7), "predict_s": 1.0}
+                    f.write(json.dumps(record) + "\n")
+            signatures = [_signature(), _signature(n_series=5000), _signature(model_name="lightgbm")]
+            store = TaskTimingStore(path)
+            before = [store.estimate(sig, "boost") for sig in signatures]
+            self.assertEqual(len(store.records()), 15)
+
+            store.append([{**_signature(model_name="lightgbm"), "fit_s": 2.0, "predict_s": 1.0}])
+            self.assertEqual(len(path.read_text(encoding="utf-8").splitlines()), 16)
+            reloaded = TaskTimingStore(path)
+            self.assertEqual([reloaded.estimate(sig, "boost") for sig in signatures[:2]], before[:2])
+            self.assertEqual(reloaded.estimate(signatures[2], "boost"), (3.0, "history"))
+
+    def test_count_backtest_work_matches_refit_cadence(self) -> None:
+        self.assertEqual(count_backtest_work(120, 100, [1, 4], refit_each_origin=True), (17, 17))
+        self.assertEqual(count_backtest_work(120, 100, [1, 4], refit_each_origin=False), (17, 1))
+        self.assertEqual(count_backtest_work(120, 100, [1, 4], refit_every=5), (17, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
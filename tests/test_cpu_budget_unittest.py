@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import unittest
+
+from src.core.cpu_budget import CpuBudget, resolve_cpu_budget
+from src.core.runner import run_backtest
+from src.models.base import ForecastModel
+from src.models.random_forest import RandomForestModel
+
+
+class _ThreadRecordingModel(ForecastModel):
+    def __init__(self, budget: CpuBudget | None = None) -> None:
+        super().__init__()
+        self.budget = budget
+        self.fit_threads: list[int | None] = []
+        self.predict_leases: list[int] = []
+
+    @property
+    def name(self) -> str:
+        return "thread_recording"
+
+    def fit(self, train_series, exog_history=None) -> None:
+        self.fit_threads.append(self.num_threads)
+
+    def predict(self, history, horizon, exog_future=None) -> float:
+        if self.budget is not None:
+            self.predict_leases.append(sum(self.budget._leases.values()))
+        return float(history[-1])
+
+
+class CpuBudgetTest(unittest.TestCase):
+    def test_shares_split_budget_and_grow_as_trials_finish(self) -> None:
+        budget = CpuBudget(8)
+        for key in ("a", "b", "c"):
+            budget.start(key)
+        leases = [budget.acquire(k) for k in ("a", "b", "c")]
+        self.assertEqual(leases, [3, 3, 2])
+        self.assertLessEqual(sum(leases), 8)
+
+        budget.finish("b")
+        budget.finish("c")
+        budget.release("a")
+        self.assertEqual(budget.acquire("a"), 8)
+
+    def test_leases_never_exceed_free_threads(self) -> None:
+        budget = CpuBudget(4)
+        budget.start("a")
+        self.assertEqual(budget.acquire("a"), 4)
+        budget.start("b")
+        # "a" still holds its lease from before "b" started, so "b" gets the minimum.
+        self.assertEqual(budget.acquire("b"), 1)
+
+    def test_runner_holds_lease_for_each_fit_and_its_predictions(self) -> None:
+        budget = CpuBudget(6)
+        budget.start("only")
+        for refit_every in (2, None):
+            model = _ThreadRecordingModel(budget)
+            run_backtest(
+                series=[float(i) for i in range(30)],
+                site_id="s1",
+                model=model,
+                model_label="m",
+                horizons=[1],
+                train_size=25,
+                refit_every=refit_every,
+                thread_lease=budget.leaser("only"),
+            )
+            self.assertEqual(model.fit_threads, [6] * (3 if refit_every else 5))
+            # Fitted estimators predict with the n_jobs they were fitted with, so the lease covers predictions too.
+            self.assertEqual(model.predict_leases, [6] * 5)
+
+    def test_allotment_caps_estimator_n_jobs(self) -> None:
+        model = RandomForestModel(params={"n_estimators": 5})
+        self.assertEqual(model._n_jobs(), -1)
+        model.set_num_threads(3)
+        self.assertEqual(model._n_jobs(), 3)
+        self.assertEqual(RandomForestModel(params={"n_jobs": 2, "n_estimators": 5})._n_jobs(), 2)
+        self.assertEqual(resolve_cpu_budget(5), 5)
+        with self.assertRaises(ValueError):
+            resolve_cpu_budget(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
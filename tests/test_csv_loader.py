@@ -15,7 +15,7 @@ def test_csv_loader_aligns_scada_and_nwp() -> None:
 
     assert len(result.series) == 1000
     assert len(result.timestamps) == 1000
-    assert len(result.exog_rows) == 1000
+    assert len(result.exog) == 1000
     assert result.stats["rows_aligned"] == 1000
     assert int(result.stats["n_exog_features"]) > 0
     assert float(result.stats["target_max"]) >= float(result.stats["target_min"])
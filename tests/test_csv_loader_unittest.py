@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import tempfile
 import unittest
+from pathlib import Path
 
 from src.data.csv_loader import load_scada_nwp_series
 
 
+def _write(path: Path, lines: list[str]) -> None:
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
 class CsvLoaderTest(unittest.TestCase):
     def test_csv_loader_aligns_scada_and_nwp(self) -> None:
         result = load_scada_nwp_series(
@@ -18,11 +24,44 @@ class CsvLoaderTest(unittest.TestCase):
 
         self.assertEqual(len(result.series), 1000)
         self.assertEqual(len(result.timestamps), 1000)
-        self.assertEqual(len(result.exog_rows), 1000)
+        self.assertEqual(len(result.exog), 1000)
         self.assertEqual(result.stats["rows_aligned"], 1000)
         self.assertGreater(int(result.stats["n_exog_features"]), 0)
         self.assertGreaterEqual(float(result.stats["target_max"]), float(result.stats["target_min"]))
 
+    def test_streaming_join_stops_at_max_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            scada = Path(tmp) / "scada.csv"
+            nwp = Path(tmp) / "nwp.csv"
+            times = [f"2023/1/{1 + i // 96} {(i % 96) // 4}:{(i % 4) * 15}" for i in range(200)]
+            _write(scada, ["Timestamp,Total_Power"] + [f"{t},{i}" if i != 3 else f"{t}," for i, t in enumerate(times)])
+            # NWP starts later and has a gap, so only part of SCADA aligns.
+            _write(nwp, ["Timestamp,ws,note"] + [f"{t},{i / 10},x" for i, t in enumerate(times) if i >= 2 and i != 6])
+
+            result = load_scada_nwp_series(scada, nwp, max_rows=10)
+
+        self.assertEqual(result.stats["load_mode"], "streaming")
+        self.assertEqual(result.stats["rows_aligned"], 10)
+        self.assertEqual(result.stats["rows_dropped_target_parse"], 1)
+        self.assertLess(int(result.stats["rows_scada"]), 20)
+        self.assertEqual(result.series.tolist(), [2.0, 4.0, 5.0, 7.0, 8.0, 9.0, 10.0, 11.0, 12.0])
+        self.assertEqual(result.timestamps[0], "2023/1/1 0:30")
+        self.assertEqual(result.exog.columns, ["ws"])
+        self.assertAlmostEqual(float(result.exog.values[-1, 0]), 1.2)
+
+    def test_unsorted_files_fall_back_to_full_join(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            scada = Path(tmp) / "scada.csv"
+            nwp = Path(tmp) / "nwp.csv"
+            _write(scada, ["Timestamp,Total_Power", "2023/1/2 0:00,3", "2023/1/1 23:45,2", "2023/1/1 0:15,1"])
+            _write(nwp, ["ws,Timestamp", "5,2023/1/1 0:15", "6,2023/1/1 23:45", "7,2023/01/02 00:00"])
+
+            result = load_scada_nwp_series(scada, nwp)
+
+        self.assertEqual(result.stats["load_mode"], "full")
+        self.assertEqual(result.series.tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(result.exog.column("ws").tolist(), [5.0, 6.0, 7.0])
+
 
 if __name__ == "__main__":
     unittest.main()
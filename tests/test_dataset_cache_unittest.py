@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.data.csv_loader import CSVLoadResult
+from src.data.dataset_cache import dataset_cache_key, load_cached_dataset, save_cached_dataset
+from src.data.exog import ExogMatrix
+
+
+class DatasetCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.source = self.tmp / "scada.csv"
+        self.source.write_text("Timestamp,Total_Power\n2023/1/1 0:15,1\n", encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _key(self, **overrides) -> str:
+        kwargs = {
+            "target_col": "Total_Power",
+            "timestamp_col": "Timestamp",
+            "feature_cols": ["ws"],
+            "max_rows": 100,
+            "site_id": "s1",
+        }
+        kwargs.update(overrides)
+        return dataset_cache_key([self.source], **kwargs)[0]
+
+    def test_round_trip_is_memory_mapped(self) -> None:
+        exog = ExogMatrix(np.array([[1.0, np.nan], [2.0, 3.0]]), ["ws", "t"])
+        result = CSVLoadResult("s1", np.array([0.5, 0.25]), ["2023/1/1 0:15", "2023/1/1 0:30"], exog, {"rows_final": 2})
+        key, inputs = dataset_cache_key([self.source], "Total_Power", "Timestamp", None, None, "s1")
+        save_cached_dataset(self.tmp / "cache", key, result, inputs)
+
+        cached = load_cached_dataset(self.tmp / "cache", key)
+
+        self.assertIsNotNone(cached)
+        self.assertIsInstance(cached.series, np.memmap)
+        self.assertEqual(cached.series.tolist(), [0.5, 0.25])
+        self.assertEqual(cached.timestamps, result.timestamps)
+        self.assertEqual(cached.exog.columns, ["ws", "t"])
+        self.assertTrue(np.array_equal(cached.exog.values, exog.values, equal_nan=True))
+        self.assertEqual(cached.stats, {"rows_final": 2})
+        self.assertIsNone(load_cached_dataset(self.tmp / "cache", "missing"))
+
+    def test_key_tracks_options_and_source_changes(self) -> None:
+        key = self._key()
+        self.assertEqual(key, self._key())
+        self.assertNotEqual(key, self._key(max_rows=200))
+        self.assertNotEqual(key, self._key(feature_cols=["ws", "t"]))
+        self.assertNotEqual(key, self._key(target_col="Power"))
+
+        st = self.source.stat()
+        os.utime(self.source, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertNotEqual(key, self._key())
+        # With content hashing, touching the file alone keeps the key.
+        hashed = self._key(hash_content=True)
+        os.utime(self.source, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000_000))
+        self.assertEqual(hashed, self._key(hash_content=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
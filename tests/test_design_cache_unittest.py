@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+from src.data.exog import ExogMatrix
+from src.data.features import DesignMatrixCache, _build_design
+
+
+def _frozen(arr: np.ndarray) -> np.ndarray:
+    arr.flags.writeable = False
+    return arr
+
+
+class DesignMatrixCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.series = _frozen(rng.random(50))
+        self.exog = ExogMatrix(_frozen(rng.random((50, 2))), ["a", "b"])
+
+    def test_training_slices_share_one_build(self) -> None:
+        cache = DesignMatrixCache()
+        for n, start in ((30, 3), (40, 5), (50, 3)):
+            rows = cache.rows(self.series[:n], 3, start, exog=self.exog[:n], feature_cols=["b", "x"], intercept=True)
+            expected = _build_design(self.series[:n], 3, start, n, self.exog[:n], ("b", "x"), True)
+            np.testing.assert_array_equal(rows, expected)
+            self.assertFalse(rows.flags.writeable)
+        self.assertEqual((cache.builds, cache.hits), (1, 2))
+
+    def test_lag_counts_and_features_share_one_build_per_site(self) -> None:
+        cache = DesignMatrixCache()
+        layouts = [
+            (5, (), True),
+            (3, (), True),
+            (2, (), False),
+            (3, ("a",), True),
+            (5, ("b", "a"), False),
+            (4, ("a",), False),
+        ]
+        for lags, cols, intercept in layouts:
+            rows = cache.rows(
+                self.series[:40], lags, lags + 1, exog=self.exog[:40], feature_cols=cols, intercept=intercept
+            )
+            expected = _build_design(self.series[:40], lags, lags + 1, 40, self.exog[:40], cols, intercept)
+            np.testing.assert_array_equal(rows, expected)
+            self.assertFalse(rows.flags.writeable)
+        # One build at five lags; each exog column asked for first widens it once.
+        self.assertEqual((cache.builds, cache.hits), (3, 3))
+        # Lag-only variants are column slices of the shared matrix, not copies.
+        self.assertTrue(np.shares_memory(cache.rows(self.series[:40], 3, 3), cache.rows(self.series[:40], 5, 5)))
+
+        cache = DesignMatrixCache()
+        cache.rows(self.series[:40], 2, 2)
+        cache.rows(self.series[:40], 4, 4)
+        cache.rows(self.series[:40], 3, 3, intercept=True)
+        self.assertEqual((cache.builds, cache.hits), (2, 1))
+
+    def test_writable_inputs_are_not_cached(self) -> None:
+        cache = DesignMatrixCache()
+        writable = np.array(self.series)
+        rows = cache.rows(writable[:40], 3, 3)
+        np.testing.assert_array_equal(rows, _build_design(writable[:40], 3, 3, 40, None, (), False))
+        self.assertEqual(cache.builds, 0)
+
+    def test_entries_go_with_their_series(self) -> None:
+        cache = DesignMatrixCache()
+        series = _frozen(np.arange(20, dtype=float))
+        cache.rows(series, 2, 2)
+        self.assertEqual(len(cache._entries), 1)
+        del series
+        self.assertEqual(len(cache._entries), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
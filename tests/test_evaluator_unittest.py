@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.evaluator import MetricAccumulator, evaluate
+from src.utils.io import CsvRowWriter, write_csv
+
+
+def _rows() -> list[dict]:
+    rows = []
+    for i in range(40):
+        rows.append(
+            {
+                "site_id": "s1",
+                "model_name": "m1" if i % 2 else "m2",
+                "origin_index": i,
+                "horizon": 1 + i % 3,
+                "timestamp": f"2023/{1 + i % 12}/1 0:00",
+                "wind_speed": "" if i % 5 == 0 else float(i % 11),
+                "y_true": float(i % 7),
+                "y_pred": float(i % 5),
+            }
+        )
+    return rows
+
+
+class StreamingEvaluationTest(unittest.TestCase):
+    def test_chunked_accumulation_matches_evaluate(self) -> None:
+        rows = _rows()
+        acc = MetricAccumulator()
+        for i in range(0, len(rows), 7):
+            acc.update(rows[i : i + 7])
+        self.assertEqual(acc.n_rows, len(rows))
+        self.assertEqual(acc.metric_rows(), evaluate(rows))
+
+        overall = [m for m in evaluate(rows) if m["segment_key"] == "overall"]
+        self.assertEqual(sum(m["samples"] for m in overall), len(rows))
+        self.assertIn("unknown", {m["segment_value"] for m in evaluate(rows) if m["segment_key"] == "wind_bin"})
+
+    def test_segment_codes_follow_the_scalar_rules(self) -> None:
+        cases = [
+            ("2023/4/1 0:00", 3.9, ("spring", "low")),
+            ("2023/8/31 23:00", "4.0", ("summer", "mid")),
+            ("2023/11/1 0:00", 8.0, ("autumn", "high")),
+            ("2023/1/1 0:00", float("nan"), ("winter", "high")),
+            ("2023/13/1 0:00", "", ("unknown", "unknown")),
+            ("", None, ("unknown", "unknown")),
+            (None, "calm", ("unknown", "unknown")),
+        ]
+        for ts, wind, (season, wind_bin) in cases:
+            row = {"site_id": "s", "model_name": "m", "horizon": 1, "timestamp": ts, "wind_speed": wind}
+            metrics = evaluate([{**row, "y_true": 2.0, "y_pred": 1.5}])
+            segments = {m["segment_key"]: m["segment_value"] for m in metrics}
+            self.assertEqual((segments["season"], segments["wind_bin"]), (season, wind_bin), (ts, wind))
+            self.assertEqual([m["MAE"] for m in metrics], [0.5, 0.5, 0.5])
+            self.assertEqual(metrics[0]["nMAE"], 0.25)
+
+    def test_row_writer_matches_write_csv(self) -> None:
+        rows = _rows()
+        with tempfile.TemporaryDirectory() as tmp:
+            write_csv(Path(tmp) / "a.csv", rows)
+            with CsvRowWriter(Path(tmp) / "sub" / "b.csv") as writer:
+                writer.write(rows[:10])
+                # Each batch is on disk before the writer closes.
+                self.assertEqual(len((Path(tmp) / "sub" / "b.csv").read_text().splitlines()), 11)
+                writer.write([])
+                writer.write(rows[10:])
+            self.assertEqual(writer.n_rows, len(rows))
+            self.assertEqual((Path(tmp) / "a.csv").read_text(), (Path(tmp) / "sub" / "b.csv").read_text())
+
+            with CsvRowWriter(Path(tmp) / "none.csv"):
+                pass
+            self.assertFalse((Path(tmp) / "none.csv").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.core.orchestrator import _run_single_task, _run_tasks_parallel, _task_backend
+
+
+def _task(model_name: str, site_id: str, params: dict | None = None) -> dict:
+    series = [((t * 37) % 17) / 17.0 for t in range(60)]
+    return {
+        "model_name": model_name,
+        "params": params or {},
+        "model_label": model_name,
+        "site_id": site_id,
+        "series": series,
+        "exog": None,
+        "timestamps": None,
+        "horizons": [1, 2],
+        "train_size": 40,
+        "refit_each_origin": True,
+        "refit_every": None,
+    }
+
+
+class ExecutorTest(unittest.TestCase):
+    def test_auto_sends_gil_bound_categories_to_processes(self) -> None:
+        self.assertEqual(_task_backend("auto", "linear"), "process")
+        self.assertEqual(_task_backend("auto", "baseline"), "process")
+        self.assertEqual(_task_backend("auto", "boost"), "thread")
+        self.assertEqual(_task_backend("thread", "linear"), "thread")
+
+    def test_process_pool_matches_serial_and_reports_failures(self) -> None:
+        tasks = [
+            _task("persistence", "s1"),
+            _task("linear_ar", "s1", {"lags": 3}),
+            _task("no_such_model", "s1"),
+            _task("moving_average", "s2", {"window": 4}),
+        ]
+        limits = {"linear": 1, "baseline": 1}
+        finished = list(_run_tasks_parallel(tasks, max_workers=2, category_limits=limits, executor="process"))
+
+        self.assertEqual(len(finished), len(tasks))
+        failed = [task["model_name"] for res, task, exc in finished if exc is not None]
+        self.assertEqual(failed, ["no_such_model"])
+        for res, task, exc in finished:
+            if exc is None:
+                self.assertEqual(res["preds"], _run_single_task(task)["preds"])
+
+    def test_more_feeds_tasks_as_workers_free_up(self) -> None:
+        fed: list[dict] = []
+        lock = threading.Lock()
+        running = [0, 0]  # now, peak
+
+        def more() -> list[dict]:
+            # One task per call, like a single-site TPE proposal.
+            if len(fed) >= 6:
+                return []
+            fed.append(_task("linear_ar", "s1", {"lags": len(fed) + 1}))
+            return [fed[-1]]
+
+        def slow_task(task: dict, thread_lease=None) -> dict:
+            with lock:
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return {"ok": True}
+
+        with mock.patch("src.core.orchestrator._run_single_task", slow_task):
+            finished = list(_run_tasks_parallel([], max_workers=3, category_limits={}, executor="thread", more=more))
+        self.assertEqual(len(finished), 6)
+        self.assertTrue(all(exc is None for _, _, exc in finished))
+        self.assertEqual(running[1], 3)
+
+if __name__ == "__main__":
+    unittest.main()
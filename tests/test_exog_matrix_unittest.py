@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import math
+import unittest
+
+import numpy as np
+
+from src.data.exog import ExogMatrix, as_exog_matrix
+
+
+class ExogMatrixTest(unittest.TestCase):
+    def test_from_rows_marks_missing_values_as_nan(self) -> None:
+        exog = ExogMatrix.from_rows([{"a": 1.0}, {}, {"a": 3.0, "b": 4.0}])
+        self.assertEqual(exog.columns, ["a", "b"])
+        self.assertEqual(len(exog), 3)
+        self.assertTrue(math.isnan(exog.values[1, 0]))
+        self.assertEqual(exog.row(2), {"a": 3.0, "b": 4.0})
+        self.assertEqual(exog.first_row_columns(), ["a"])
+
+    def test_row_slices_are_views_and_projection_fills_gaps(self) -> None:
+        exog = ExogMatrix(np.arange(12, dtype=float).reshape(4, 3), ["a", "b", "c"])
+        window = exog[1:3]
+        self.assertTrue(np.shares_memory(window.values, exog.values))
+        self.assertEqual(window.select(["c", "missing", "a"]).columns, ["c", "a"])
+
+        dense = window.to_array(["c", "missing"], fill=0.0, n_rows=3)
+        np.testing.assert_array_equal(dense, [[5.0, 0.0], [8.0, 0.0], [0.0, 0.0]])
+
+    def test_as_exog_matrix_passes_through_and_converts(self) -> None:
+        exog = ExogMatrix.from_rows([{"a": 1.0}])
+        self.assertIs(as_exog_matrix(exog), exog)
+        self.assertIsNone(as_exog_matrix([]))
+        self.assertEqual(as_exog_matrix([{"a": 2.0}]).row(0), {"a": 2.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
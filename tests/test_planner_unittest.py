@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.cost_model import TaskTimingStore
+from src.core.orchestrator import _run_single_task
+from src.core.planner import build_plan, simulate_wall_time
+
+
+def _config() -> dict:
+    return {
+        "experiment": {
+            "sites": ["s1", "s2"],
+            "horizons": [1, 2],
+            "train_size": 40,
+            "refit_every": 5,
+            "max_workers": 2,
+            "search_seed": 7,
+        },
+        "models": [
+            {"name": "persistence"},
+            {"name": "linear_ar", "params_grid": {"lags": [2, 3]}},
+        ],
+    }
+
+
+def _dataset() -> dict:
+    return {
+        "s1": [((t * 37) % 17) / 17.0 for t in range(60)],
+        "s2": [((t * 11) % 13) / 13.0 for t in range(80)],
+    }
+
+
+class PlannerTest(unittest.TestCase):
+    def test_wall_time_respects_workers_and_category_limits(self) -> None:
+        tasks = [
+            {"category": "boost", "expected_s": 4.0},
+            {"category": "boost", "expected_s": 3.0},
+            {"category": "linear", "expected_s": 1.0},
+        ]
+        self.assertEqual(simulate_wall_time(tasks, 1, {}), 8.0)
+        self.assertEqual(simulate_wall_time(tasks, 2, {"boost": 2}), 4.0)
+        # One boost slot: the second boost trial waits for the first.
+        self.assertEqual(simulate_wall_time(tasks, 2, {"boost": 1}), 7.0)
+
+    def test_plan_counts_match_an_actual_backtest(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            plan = build_plan(_config(), _dataset(), TaskTimingStore(Path(tmp) / "timings.jsonl"))
+
+        self.assertEqual(plan["n_model_variants"], 3)
+        self.assertEqual(plan["n_tasks"], 6)
+        self.assertEqual(plan["tasks_with_history"], 0)
+        expected_s = [t["expected_s"] for t in plan["tasks"]]
+        self.assertEqual(expected_s, sorted(expected_s, reverse=True))
+
+        task = next(t for t in plan["tasks"] if t["site_id"] == "s2" and t["model_name"] == "linear_ar")
+        res = _run_single_task(
+            {
+                "model_name": "linear_ar",
+                "params": {"lags": 2},
+                "model_label": task["model_label"],
+                "site_id": "s2",
+                "series": _dataset()["s2"],
+                "exog": None,
+                "timestamps": None,
+                "horizons": [1, 2],
+                "train_size": 40,
+                "refit_each_origin": True,
+                "refit_every": 5,
+            }
+        )
+        self.assertTrue(res["ok"])
+        self.assertEqual(len(res["preds"]), task["n_predictions"])
+        self.assertEqual(res["timings"]["n_fits"], task["n_fits"])
+
+
+if __name__ == "__main__":
+    unittest.main()
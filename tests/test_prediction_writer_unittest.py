@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.prediction_writer import PREDICTION_COLUMNS, open_prediction_writer
+from src.utils.io import CsvRowWriter
+
+
+def _rows(site_id: str, model_name: str, n: int = 4) -> list[dict]:
+    return [
+        {
+            "site_id": site_id,
+            "model_name": model_name,
+            "origin_index": 10 + i,
+            "horizon": 1 + i % 2,
+            "timestamp": f"2023/1/1 0:{i:02d}",
+            "wind_speed": "" if i == 0 else float(i),
+            "y_true": float(i),
+            "y_pred": i + 0.5,
+        }
+        for i in range(n)
+    ]
+
+
+class PredictionWriterTest(unittest.TestCase):
+    def test_csv_is_the_default(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = open_prediction_writer(tmp)
+            self.assertIsInstance(writer, CsvRowWriter)
+            self.assertEqual(writer.path, Path(tmp) / "predictions.csv")
+        with self.assertRaises(ValueError):
+            open_prediction_writer("unused", "xlsx")
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+    def test_columnar_parts_are_partitioned_and_dictionary_encoded(self) -> None:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        for fmt in ("parquet", "arrow"):
+            with tempfile.TemporaryDirectory() as tmp, open_prediction_writer(tmp, fmt) as writer:
+                writer.write(_rows("s1", "linear_ar[lags=3]"))
+                writer.write(_rows("s2", "persistence", n=2) + _rows("s1", "persistence", n=3))
+                self.assertEqual(writer.n_rows, 9)
+
+                parts = sorted(p.relative_to(writer.path).as_posix() for p in writer.path.rglob("*") if p.is_file())
+                self.assertEqual(
+                    parts,
+                    [
+                        f"site_id=s1/model_name=linear_ar%5Blags%3D3%5D/part-00000.{fmt}",
+                        f"site_id=s1/model_name=persistence/part-00002.{fmt}",
+                        f"site_id=s2/model_name=persistence/part-00001.{fmt}",
+                    ],
+                )
+
+                if fmt == "parquet":
+                    table = pq.read_table(writer.path)
+                else:
+                    table = ds.dataset(writer.path, format="arrow").to_table()
+                self.assertEqual(table.column_names, list(PREDICTION_COLUMNS))
+                self.assertTrue(pa.types.is_dictionary(table.schema.field("model_name").type))
+                rows = sorted(table.to_pylist(), key=lambda r: (r["site_id"], r["model_name"], r["origin_index"]))
+                self.assertEqual(rows[0]["model_name"], "linear_ar[lags=3]")
+                self.assertIsNone(rows[0]["wind_speed"])
+                self.assertEqual(rows[1]["wind_speed"], 1.0)
+
+                partitioned = ds.dataset(
+                    writer.path, format=fmt, partitioning=ds.HivePartitioning.discover(infer_dictionary=True)
+                )
+                only = partitioned.to_table(columns=["y_pred"], filter=ds.field("site_id") == "s2")
+                self.assertEqual(only.column("y_pred").to_pylist(), [0.5, 1.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import math
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.evaluator import evaluate
+from src.core.prediction_writer import open_prediction_writer
+from src.core.predictions import PredictionBlock
+from src.core.runner import run_backtest
+from src.core.search import score_predictions
+from src.data.exog import ExogMatrix
+from src.models.registry import create_model
+from src.utils.io import write_csv
+
+
+def _backtest() -> PredictionBlock:
+    n = 80
+    series = [((t * 37) % 17) / 17.0 for t in range(n)]
+    wind = [[float("nan") if t % 9 == 0 else (t % 12) * 1.0] for t in range(n - 5)]
+    return run_backtest(
+        series,
+        "s1",
+        create_model("linear_ar", {"lags": 3}),
+        "linear_ar[lags=3]",
+        horizons=[2, 1],
+        train_size=60,
+        exog=ExogMatrix(wind, ["wind_speed100_10"]),
+        timestamps=[f"2023/{1 + t % 12}/1 0:00" for t in range(n - 2)],
+        refit_each_origin=False,
+    )
+
+
+class PredictionBlockTest(unittest.TestCase):
+    def test_backtest_rows_keep_their_layout(self) -> None:
+        block = _backtest()
+        rows = block.to_rows()
+        self.assertEqual(len(block), (80 - 2 + 1 - 60) * 2)
+        self.assertEqual([(r["origin_index"], r["horizon"]) for r in rows[:3]], [(60, 2), (60, 1), (61, 2)])
+        self.assertEqual(rows[0]["timestamp"], "2023/2/1 0:00")
+        self.assertEqual((rows[4]["origin_index"], rows[4]["wind_speed"]), (62, ""))
+        # Targets past the end of the exog matrix or timestamps have no wind speed or timestamp.
+        self.assertEqual((rows[-2]["wind_speed"], rows[-2]["timestamp"]), ("", ""))
+        self.assertEqual([block[i] for i in (0, -1)], [rows[0], rows[-1]])
+        self.assertEqual(list(block), rows)
+        self.assertEqual(block.nbytes / len(block), 36)
+
+    def test_round_trips_and_consumers_agree_with_rows(self) -> None:
+        block = _backtest()
+        rows = block.to_rows()
+        self.assertEqual(PredictionBlock.from_dict(block.to_dict()), block)
+        self.assertEqual(PredictionBlock.from_rows(rows), block)
+        self.assertEqual(evaluate(block), evaluate(rows))
+
+        by_h: dict[int, list[float]] = {}
+        for r in rows:
+            by_h.setdefault(r["horizon"], []).append(abs(r["y_true"] - r["y_pred"]))
+        self.assertEqual(score_predictions(block), sum(sum(v) / len(v) for v in by_h.values()) / len(by_h))
+        self.assertTrue(math.isinf(score_predictions(PredictionBlock("s", "m", [], [], [], []))))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            write_csv(Path(tmp) / "rows.csv", rows)
+            with open_prediction_writer(Path(tmp) / "run") as writer:
+                writer.write(block)
+            self.assertEqual((Path(tmp) / "rows.csv").read_text(), writer.path.read_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
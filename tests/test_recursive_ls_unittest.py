@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import math
+import unittest
+
+import numpy as np
+
+from src.data.exog import ExogMatrix
+from src.models.linear_ar import LinearARModel
+from src.models.linear_exog import LinearExogModel
+from src.models.recursive_ls import RecursiveLeastSquares
+
+
+def _series(n: int) -> list[float]:
+    vals = [0.3]
+    for t in range(1, n):
+        vals.append(0.7 * vals[-1] + 0.2 * math.sin(t / 5.0) + 0.05 * math.cos(t * 1.3))
+    return vals
+
+
+class RecursiveLeastSquaresTest(unittest.TestCase):
+    def test_incremental_refit_matches_batch_solve(self) -> None:
+        series = _series(120)
+        exog = ExogMatrix.from_rows([{"f": math.sin(t / 3.0)} for t in range(120)])
+        cases = [
+            (LinearARModel, {"lags": 3}, None),
+            (LinearExogModel, {"lags": 2, "feature_cols": ["f"]}, exog),
+        ]
+        for cls, params, case_exog in cases:
+            inc = cls(params={**params, "refit_mode": "incremental"})
+            for origin in range(40, 120, 7):
+                exog_history = case_exog[:origin] if case_exog is not None else None
+                inc.fit(series[:origin], exog_history=exog_history)
+                batch = cls(params=params)
+                batch.fit(series[:origin], exog_history=exog_history)
+                for a, b in zip(inc.coef, batch.coef):
+                    self.assertAlmostEqual(a, b, places=8)
+
+    def test_incremental_exog_refit_is_stable_on_ill_conditioned_features(self) -> None:
+        # Raw surface pressure next to two nearly collinear wind speeds: the Gram
+        # matrix of this design is too ill-conditioned for the normal equations.
+        rng = np.random.default_rng(3)
+        wind = 5 + 3 * np.sin(np.arange(600) / 20.0) + rng.normal(scale=0.3, size=600)
+        exog = ExogMatrix.from_rows(
+            [
+                {
+                    "ws10": float(w),
+                    "ws100": float(1.3 * w + rng.normal(scale=0.01)),
+                    "pressure": 101325 + 50 * math.sin(t / 40.0),
+                }
+                for t, w in enumerate(wind)
+            ]
+        )
+        series = [float(min(1.0, (w / 12) ** 3)) for w in wind]
+        params = {"lags": 3, "feature_cols": ["ws10", "ws100", "pressure"]}
+
+        inc = LinearExogModel(params={**params, "refit_mode": "incremental"})
+        for origin in range(100, 600, 25):
+            inc.fit(series[:origin], exog_history=exog[:origin])
+            batch = LinearExogModel(params=params)
+            batch.fit(series[:origin], exog_history=exog[:origin])
+            expected = np.array(batch.coef)
+            np.testing.assert_allclose(inc.coef, expected, rtol=0, atol=1e-8 * np.abs(expected).max())
+
+    def test_state_is_not_reused_for_a_different_series(self) -> None:
+        series = _series(80)
+        # Shares the value at the last fitted index, and nothing else.
+        other = [v + 0.1 for v in series]
+        other[49] = series[49]
+        frozen = np.array(series)
+        frozen.flags.writeable = False
+        frozen_other = np.array(other)
+        frozen_other.flags.writeable = False
+        for first, second in ((series, other), (frozen, frozen_other)):
+            inc = LinearARModel(params={"lags": 3, "refit_mode": "incremental"})
+            inc.fit(first[:50])
+            inc.fit(second[:60])
+            batch = LinearARModel(params={"lags": 3})
+            batch.fit(second[:60])
+            np.testing.assert_allclose(inc.coef, batch.coef, rtol=1e-8, atol=1e-10)
+
+    def test_forgetting_factor_matches_weighted_least_squares(self) -> None:
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=(50, 3))
+        y = x @ np.array([0.5, -1.0, 2.0]) + rng.normal(scale=0.1, size=50)
+        lam = 0.95
+
+        rls = RecursiveLeastSquares(3, forgetting_factor=lam)
+        rls.update(x[:20], y[:20])
+        for i in range(20, 50):
+            rls.update(x[i : i + 1], y[i : i + 1])
+
+        w = np.sqrt(lam ** np.arange(49, -1, -1, dtype=float))
+        expected, *_ = np.linalg.lstsq(x * w[:, None], y * w, rcond=None)
+        np.testing.assert_allclose(rls.solve(), expected, rtol=1e-8, atol=1e-10)
+
+
+if __name__ == "__main__":
+    unittest.main()
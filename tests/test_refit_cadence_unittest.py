@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import unittest
+
+from src.core.runner import parse_refit_every, run_backtest
+from src.models.persistence import PersistenceModel
+
+
+class _FitCountingModel(PersistenceModel):
+    def __init__(self, params: dict | None = None) -> None:
+        super().__init__(params=params)
+        self.fit_lengths: list[int] = []
+
+    def fit(self, train_series, exog_history=None) -> None:
+        self.fit_lengths.append(len(train_series))
+
+
+class RefitCadenceTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # 15-minute data over three days.
+        self.series = [float(t % 9) for t in range(288)]
+        self.timestamps = [f"2023/1/{1 + t // 96} {(t % 96) // 4}:{(t % 4) * 15:02d}" for t in range(288)]
+
+    def test_parse_refit_every(self) -> None:
+        self.assertEqual(parse_refit_every(96), ("origins", 96.0))
+        self.assertEqual(parse_refit_every("48"), ("origins", 48.0))
+        self.assertEqual(parse_refit_every("12h"), ("seconds", 43200.0))
+        self.assertEqual(parse_refit_every("1d"), ("seconds", 86400.0))
+        with self.assertRaises(ValueError):
+            parse_refit_every("soon")
+
+    def test_refit_every_origins(self) -> None:
+        model = _FitCountingModel()
+        rows = run_backtest(self.series, "s1", model, "p", [1, 2], train_size=100, refit_every=50)
+        self.assertEqual(model.fit_lengths, [100, 150, 200, 250])
+        self.assertEqual(len(rows), (288 - 2 + 1 - 100) * 2)
+
+    def test_refit_every_wall_clock(self) -> None:
+        model = _FitCountingModel()
+        run_backtest(
+            self.series,
+            "s1",
+            model,
+            "p",
+            [1],
+            train_size=90,
+            timestamps=self.timestamps,
+            refit_every="1d",
+        )
+        self.assertEqual(model.fit_lengths, [90, 186, 282])
+
+
+if __name__ == "__main__":
+    unittest.main()
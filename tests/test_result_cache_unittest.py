@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from src.core.orchestrator import _run_single_task
+from src.core.predictions import PredictionBlock
+from src.core.result_cache import (
+    has_cached_result,
+    load_cached_result,
+    prune_result_cache,
+    result_cache_key,
+    save_cached_result,
+    site_fingerprint,
+)
+from src.data.exog import ExogMatrix
+
+
+def _key(**overrides) -> str:
+    args = {
+        "model_name": "linear_ar",
+        "params": {"lags": 3},
+        "model_label": "linear_ar[lags=3]",
+        "site_id": "s1",
+        "dataset_fingerprint": "abc",
+        "horizons": [1, 2],
+        "train_size": 40,
+        "refit_each_origin": True,
+        "refit_every": None,
+    }
+    args.update(overrides)
+    return result_cache_key(**args)
+
+
+class ResultCacheTest(unittest.TestCase):
+    def test_key_covers_every_input(self) -> None:
+        base = _key()
+        self.assertEqual(base, _key())
+        for change in (
+            {"params": {"lags": 4}},
+            {"dataset_fingerprint": "abd"},
+            {"horizons": [1, 4]},
+            {"train_size": 41},
+            {"refit_each_origin": False},
+            {"refit_every": 5},
+            {"series_length": 50},
+        ):
+            self.assertNotEqual(_key(**change), base, change)
+        upgraded = {"numpy": "0.0", "scikit-learn": None, "lightgbm": None, "xgboost": None}
+        with mock.patch("src.core.result_cache.library_versions", return_value=upgraded):
+            self.assertNotEqual(_key(), base)
+
+        series = np.arange(10, dtype=float)
+        exog = ExogMatrix(np.ones((10, 1)), ["ws"])
+        fp = site_fingerprint(series, exog, None)
+        self.assertNotEqual(fp, site_fingerprint(series, ExogMatrix(np.zeros((10, 1)), ["ws"]), None))
+        self.assertNotEqual(fp, site_fingerprint(series, None, None))
+
+    def test_second_run_is_served_from_the_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            key = _key()
+            task = {
+                "model_name": "linear_ar",
+                "params": {"lags": 3},
+                "model_label": "linear_ar[lags=3]",
+                "site_id": "s1",
+                "series": [((t * 37) % 17) / 17.0 for t in range(60)],
+                "horizons": [1, 2],
+                "train_size": 40,
+                "refit_each_origin": True,
+                "result_cache": (tmp, key),
+            }
+            first = _run_single_task(task)
+            self.assertEqual(first["result_cache"], "miss")
+            self.assertTrue(has_cached_result(tmp, key))
+            self.assertEqual(load_cached_result(tmp, key), first["preds"])
+
+            # A hit never builds the model, so even an unknown name returns the stored rows.
+            second = _run_single_task({**task, "model_name": "no_such_model"})
+            self.assertEqual(second["result_cache"], "hit")
+            self.assertEqual(second["preds"], first["preds"])
+
+    def test_prune_drops_least_recently_used_entries(self) -> None:
+        row = {"site_id": "s1", "model_name": "m", "horizon": 1, "y_true": 0.0, "y_pred": 0.0}
+        preds = PredictionBlock.from_rows([{**row, "origin_index": t, "timestamp": str(t)} for t in range(200)])
+        with tempfile.TemporaryDirectory() as tmp:
+            keys = [_key(train_size=40 + i) for i in range(4)]
+            now = time.time()
+            for age, key in zip((40, 30, 20, 10), keys):
+                path = save_cached_result(tmp, key, preds, {})
+                os.utime(path, (now - age * 86400, now - age * 86400))
+            # A hit makes the oldest entry the most recently used.
+            load_cached_result(tmp, keys[0])
+            entry_mb = Path(tmp, keys[0][:2], f"{keys[0]}.json.gz").stat().st_size / 2**20
+
+            pruned = prune_result_cache(tmp, max_age_days=25)
+            self.assertEqual(pruned["removed"], 1)
+            self.assertFalse(has_cached_result(tmp, keys[1]))
+
+            pruned = prune_result_cache(tmp, max_mb=2.5 * entry_mb)
+            self.assertEqual(pruned["removed"], 1)
+            self.assertEqual([has_cached_result(tmp, k) for k in keys], [True, False, False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,9 @@ from __future__ import annotations
 import unittest
 
 from src.core.runner import run_backtest
+from src.data.exog import ExogMatrix
 from src.models.base import ForecastModel
+from src.models.linear_ar import LinearARModel
 from src.models.linear_exog import LinearExogModel
 
 
@@ -12,15 +14,14 @@ class _RecordingModel(ForecastModel):
     def name(self) -> str:
         return "recording"
 
-    def fit(self, train_series: list[float], exog_history: list[dict[str, float]] | None = None) -> None:
+    def fit(self, train_series: list[float], exog_history: ExogMatrix | None = None) -> None:
         return
 
     def predict(
         self,
         history: list[float],
         horizon: int,
-        exog_future: dict[str, float] | None = None,
-        exog_future_seq: list[dict[str, float] | None] | None = None,
+        exog_future: ExogMatrix | None = None,
     ) -> float:
         if not hasattr(self, "calls"):
             self.calls = []
@@ -29,10 +30,9 @@ class _RecordingModel(ForecastModel):
                 "origin": len(history),
                 "horizon": horizon,
                 "exog_future": exog_future,
-                "exog_future_seq": exog_future_seq,
             }
         )
-        return float(history[-1]) if history else 0.0
+        return float(history[-1]) if len(history) else 0.0
 
 
 class RunnerExogFutureSeqTest(unittest.TestCase):
@@ -48,15 +48,16 @@ class RunnerExogFutureSeqTest(unittest.TestCase):
             model_label="recording",
             horizons=[1, 2],
             train_size=3,
-            exog_rows=exog_rows,
+            exog=exog_rows,
             timestamps=None,
             refit_each_origin=True,
         )
 
         calls = getattr(model, "calls")
         first_h2 = next(c for c in calls if c["origin"] == 3 and c["horizon"] == 2)
-        self.assertEqual(first_h2["exog_future"], {"f": 4.0})
-        self.assertEqual(first_h2["exog_future_seq"], [{"f": 3.0}, {"f": 4.0}])
+        self.assertEqual(len(first_h2["exog_future"]), 2)
+        self.assertEqual(first_h2["exog_future"].row(0), {"f": 3.0})
+        self.assertEqual(first_h2["exog_future"].row(1), {"f": 4.0})
 
     def test_linear_exog_uses_exog_future_sequence_for_multistep(self) -> None:
         model = LinearExogModel(params={"lags": 1, "feature_cols": ["f"]})
@@ -66,11 +67,25 @@ class RunnerExogFutureSeqTest(unittest.TestCase):
         y = model.predict(
             history=[10.0],
             horizon=2,
-            exog_future={"f": 9.0},
-            exog_future_seq=[{"f": 1.0}, {"f": 2.0}],
+            exog_future=ExogMatrix.from_rows([{"f": 1.0}, {"f": 2.0}]),
         )
         self.assertAlmostEqual(y, 2.0, places=6)
 
+    def test_predict_path_matches_per_horizon_predict(self) -> None:
+        series = [float((t * 7) % 11) for t in range(40)]
+        exog = ExogMatrix.from_rows([{"f": float(t % 3)} for t in range(40)])
+        ar = LinearARModel(params={"lags": 3})
+        ar.fit(series[:30])
+        exog_model = LinearExogModel(params={"lags": 2, "feature_cols": ["f"]})
+        exog_model.fit(series[:30], exog_history=exog[:30])
+
+        future = exog[30:38]
+        ar_path = ar.predict_path(series[:30], 8)
+        exog_path = exog_model.predict_path(series[:30], 8, exog_future=future)
+        for h in range(1, 9):
+            self.assertEqual(ar_path[h - 1], ar.predict(series[:30], h))
+            self.assertEqual(exog_path[h - 1], exog_model.predict(series[:30], h, exog_future=future[:h]))
+
 
 if __name__ == "__main__":
     unittest.main()
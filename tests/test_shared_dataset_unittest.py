@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import multiprocessing
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.core.shared_dataset import SharedDataset, attach_site
+from src.data.exog import ExogMatrix
+
+
+def _site_summary(handle, site_id: str) -> tuple[float, float, str]:
+    series, exog, timestamps = attach_site(handle, site_id)
+    return float(series.sum()), float(np.nansum(exog.values)), timestamps[-1]
+
+
+class SharedDatasetTest(unittest.TestCase):
+    def setUp(self) -> None:
+        n = 5000
+        self.series = np.linspace(0.0, 1.0, n)
+        self.exog = ExogMatrix(np.arange(2 * n, dtype=float).reshape(n, 2), ["ws", "t"])
+        self.timestamps = [f"t{i}" for i in range(n)]
+        self.payloads = {
+            "s1": (self.series, self.exog, self.timestamps),
+            "s2": (self.series[:10] * 2, None, None),
+        }
+
+    def test_views_are_read_only_and_handle_is_small(self) -> None:
+        with SharedDataset(self.payloads) as shared:
+            series, exog, timestamps = attach_site(shared.handle, "s1")
+            self.assertEqual(series.tolist(), self.series.tolist())
+            self.assertEqual(exog.columns, ["ws", "t"])
+            self.assertTrue(np.array_equal(exog.values, self.exog.values))
+            self.assertEqual(timestamps, self.timestamps)
+            self.assertFalse(series.flags.writeable)
+            self.assertEqual(attach_site(shared.handle, "s2")[1:], (None, None))
+            self.assertLess(len(pickle.dumps(shared.handle)), 2000)
+            del series, exog
+
+    def test_worker_processes_attach_by_handle(self) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        with SharedDataset(self.payloads) as shared, ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+            got = ex.submit(_site_summary, shared.handle, "s1").result()
+        self.assertAlmostEqual(got[0], float(self.series.sum()))
+        self.assertEqual(got[1], float(self.exog.values.sum()))
+        self.assertEqual(got[2], "t4999")
+
+
+if __name__ == "__main__":
+    unittest.main()
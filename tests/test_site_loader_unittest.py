@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.data.site_loader import load_sites, merge_site_stats, site_sources_from_config
+
+
+def _write_site(root: Path, name: str, offset: float, n: int) -> dict:
+    times = [f"2023/1/{1 + i // 96} {(i % 96) // 4}:{(i % 4) * 15}" for i in range(n)]
+    scada = root / f"{name}_scada.csv"
+    nwp = root / f"{name}_nwp.csv"
+    scada.write_text("Timestamp,Total_Power\n" + "".join(f"{t},{offset + i}\n" for i, t in enumerate(times)))
+    nwp.write_text("Timestamp,ws,temp\n" + "".join(f"{t},{i / 10},{i}\n" for i, t in enumerate(times)))
+    return {"site_id": name, "scada_csv": str(scada), "nwp_csv": str(nwp)}
+
+
+class SiteLoaderTest(unittest.TestCase):
+    def test_loads_sites_in_pool_and_merges_profile(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            data_cfg = {
+                "max_rows": 50,
+                "feature_cols": ["ws"],
+                "sites": [
+                    _write_site(root, "farm_a", 0.0, 60),
+                    dict(_write_site(root, "farm_b", 100.0, 120), max_rows=100),
+                ],
+            }
+            sources = site_sources_from_config({}, data_cfg, cache_dir=str(root / "cache"))
+            results = load_sites(sources, workers=2)
+            again = load_sites(sources, workers=2)
+
+        self.assertEqual(list(results), ["farm_a", "farm_b"])
+        self.assertEqual(len(results["farm_a"].series), 50)
+        self.assertEqual(len(results["farm_b"].series), 100)
+        self.assertEqual(results["farm_b"].exog.columns, ["ws"])
+        self.assertEqual(results["farm_a"].stats["dataset_cache"], "miss")
+        self.assertEqual(again["farm_b"].stats["dataset_cache"], "hit")
+        self.assertEqual(again["farm_b"].series.tolist(), results["farm_b"].series.tolist())
+
+        profile = merge_site_stats(results)
+        self.assertEqual(profile["n_sites"], 2)
+        self.assertEqual(profile["rows_final"], 150)
+        self.assertEqual(profile["target_min"], 0.0)
+        self.assertEqual(profile["target_max"], 199.0)
+        self.assertAlmostEqual(profile["target_mean"], (sum(range(50)) + sum(range(100, 200))) / 150, places=6)
+        self.assertEqual(profile["time_end"], results["farm_b"].timestamps[-1])
+        self.assertEqual(profile["sites"]["farm_a"]["rows_final"], 50)
+
+    def test_experiment_sites_select_from_data_sites(self) -> None:
+        data_cfg = {"sites": [{"site_id": s, "scada_csv": "a.csv", "nwp_csv": "b.csv"} for s in ("x", "y")]}
+        sources = site_sources_from_config({"sites": ["y"]}, data_cfg, cache_dir=None)
+        self.assertEqual([s.site_id for s in sources], ["y"])
+        with self.assertRaises(ValueError):
+            site_sources_from_config({"sites": ["z"]}, data_cfg, cache_dir=None)
+
+
+if __name__ == "__main__":
+    unittest.main()
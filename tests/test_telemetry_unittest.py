@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.core.orchestrator import run_experiment
+from src.core.runner import run_backtest
+from src.core.telemetry import RSS_SAMPLE_INTERVAL_S, RssWatch, summarize_task_timings
+from src.models.registry import create_model
+
+
+def _timing(label: str, category: str, **measured: float) -> dict:
+    row = {"model_label": label, "site_id": "s", "category": category, "predict_s": 0.5, "n_predictions": 100}
+    return {**row, "n_predicts": measured["n_fits"], **measured}
+
+
+class TelemetryTest(unittest.TestCase):
+    def test_backtest_counts_fit_and_predict_calls(self) -> None:
+        series = [((t * 37) % 17) / 17.0 for t in range(60)]
+        for refit_every, n_fits, n_predicts in ((None, 16, 16), (5, 4, 4)):
+            timings: dict = {}
+            run_backtest(
+                series,
+                "s1",
+                create_model("linear_ar", {"lags": 3}),
+                "linear_ar[lags=3]",
+                horizons=[1, 5],
+                train_size=40,
+                refit_every=refit_every,
+                timings=timings,
+            )
+            self.assertEqual((timings["n_fits"], timings["n_predicts"], timings["n_origins"]), (n_fits, n_predicts, 16))
+
+    def test_rss_watch_sees_allocations_inside_the_block(self) -> None:
+        with RssWatch() as watch:
+            before = watch.peak_bytes
+            block = bytearray(64 * 2**20)
+            block[::4096] = b"x" * len(block[::4096])
+            # Held past a few sampler ticks; the sampler, not the exit reading, must see it.
+            time.sleep(4 * RSS_SAMPLE_INTERVAL_S)
+            del block
+        if before is None:
+            self.skipTest("RSS is not readable on this platform")
+        self.assertGreater(watch.peak_bytes - before, 32 * 2**20)
+
+    def test_category_summary(self) -> None:
+        rows = [
+            _timing("a", "linear", actual_s=2.0, fit_s=1.0, n_fits=3, queue_wait_s=0.0, peak_rss_mb=10.0),
+            _timing("b", "linear", actual_s=4.0, fit_s=3.0, n_fits=1, queue_wait_s=2.0, peak_rss_mb=30.0),
+            {"model_label": "c", "site_id": "s", "category": "boost", "actual_s": None},
+            # A result-cache hit: rows returned without predicting.
+            _timing("d", "linear", actual_s=0.0, fit_s=0.0, n_fits=0, predict_s=0.0),
+        ]
+        summary = summarize_task_timings(rows)
+        self.assertEqual(list(summary), ["boost", "linear"])
+        linear = summary["linear"]
+        self.assertEqual((linear["tasks"], linear["actual_s"], linear["n_fits"], linear["preds_per_s"]), (3, 6.0, 4, 200.0))
+        self.assertEqual((linear["mean_queue_wait_s"], linear["max_peak_rss_mb"]), (1.0, 30.0))
+        self.assertEqual(linear["slowest_task"]["model_label"], "b")
+        self.assertIsNone(summary["boost"]["slowest_task"])
+
+    def test_run_writes_task_timings(self) -> None:
+        config = {
+            "experiment": {
+                "name": "telemetry",
+                "sites": ["s1"],
+                "horizons": [1, 2],
+                "train_size": 40,
+                "max_workers": 2,
+                "timing_history": None,
+                "result_cache": None,
+            },
+            "models": [{"name": "persistence"}, {"name": "linear_ar", "params": {"lags": 2}}, {"name": "nope"}],
+        }
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                result = run_experiment(config, {"s1": [((t * 37) % 17) / 17.0 for t in range(60)]})
+                out_dir = Path(result["output_dir"])
+                with (out_dir / "task_timings.csv").open(newline="") as f:
+                    rows = {r["model_label"]: r for r in csv.DictReader(f)}
+                summary = json.loads((out_dir / "run_summary.json").read_text())
+            finally:
+                os.chdir(cwd)
+
+        self.assertEqual(set(rows), {"persistence", "linear_ar[lags=2]", "nope"})
+        linear = rows["linear_ar[lags=2]"]
+        self.assertEqual((linear["category"], linear["n_fits"], linear["n_predictions"]), ("linear", "19", "38"))
+        self.assertGreaterEqual(float(linear["queue_wait_s"]), 0.0)
+        self.assertEqual(rows["nope"]["actual_s"], "")
+        self.assertEqual(summary["task_timings_by_category"]["linear"]["tasks"], 1)
+        self.assertEqual(summary["task_timings_by_category"]["baseline"]["tasks"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
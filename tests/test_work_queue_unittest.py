@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from src.core.orchestrator import _run_single_task, run_experiment
+from src.core.work_queue import WorkQueue, lease_task_id, serve
+
+
+def _config(**exp) -> dict:
+    return {
+        "experiment": {
+            "name": "queue",
+            "sites": ["s1", "s2"],
+            "horizons": [1, 2],
+            "train_size": 40,
+            "refit_every": 5,
+            "timing_history": None,
+            "result_cache": None,
+            **exp,
+        },
+        "models": [
+            {"name": "persistence"},
+            {"name": "linear_ar", "params_grid": {"lags": [2, 3]}},
+            {"name": "no_such_model"},
+        ],
+    }
+
+
+def _dataset() -> dict:
+    return {
+        "s1": [((t * 37) % 17) / 17.0 for t in range(60)],
+        "s2": {
+            "series": [((t * 11) % 13) / 13.0 for t in range(70)],
+            "exog": [{"wind_speed100_10": float(t % 9)} for t in range(70)],
+            "timestamps": [f"2023/1/{1 + t // 24} {t % 24}:00" for t in range(70)],
+        },
+    }
+
+
+class WorkQueueTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self._cwd = os.getcwd()
+        os.chdir(self._tmp.name)
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_expired_lease_is_requeued(self) -> None:
+        queue = WorkQueue("q", lease_timeout=30)
+        task_id = queue.publish({"site_id": "s1", "dataset": "none"})
+        lost_lease, task = queue.claim()
+        self.assertEqual((lease_task_id(lost_lease), task["site_id"]), (task_id, "s1"))
+        self.assertIsNone(queue.claim())
+
+        self.assertEqual(queue.requeue_expired(), [])
+        self.assertEqual(queue.requeue_expired(now=time.time() + 31), [task_id])
+        self.assertFalse(queue.heartbeat(lost_lease))
+
+        lease, _ = queue.claim()
+        self.assertNotEqual(lease, lost_lease)
+        # The first worker finishing late must not deliver or drop the second worker's lease.
+        self.assertFalse(queue.complete(lost_lease, {"ok": False, "error": "late"}))
+        self.assertIsNone(queue.take_result(task_id))
+        self.assertTrue(queue.heartbeat(lease))
+
+        self.assertTrue(queue.complete(lease, {"ok": False, "error": "boom"}))
+        self.assertEqual(queue.take_result(task_id), {"ok": False, "error": "boom"})
+        self.assertIsNone(queue.take_result(task_id))
+
+    def test_queue_run_matches_local_run_despite_lost_worker(self) -> None:
+        local = run_experiment(_config(), _dataset())
+
+        queue = WorkQueue("q")
+        stop = threading.Event()
+        lost = threading.Event()
+
+        def lose_one_task() -> None:
+            # Claims a task and dies without finishing it or renewing the lease.
+            while not stop.is_set() and queue.claim() is None:
+                time.sleep(0.01)
+            lost.set()
+
+        def worker() -> None:
+            lost.wait()
+            serve(queue, _run_single_task, stop=stop, poll_interval=0.05)
+
+        threads = [threading.Thread(target=lose_one_task)] + [threading.Thread(target=worker) for _ in range(2)]
+        for t in threads:
+            t.start()
+        try:
+            remote = run_experiment(_config(name="queue_remote", executor="queue", queue_dir="q", queue_lease_timeout=0.5), _dataset())
+        finally:
+            stop.set()
+            lost.set()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(remote["leaderboard"], local["leaderboard"])
+        self.assertEqual(remote["metrics"], local["metrics"])
+        failed = json.loads(Path(remote["output_dir"], "failed_models.json").read_text())["failed_models"]
+        local_failed = json.loads(Path(local["output_dir"], "failed_models.json").read_text())["failed_models"]
+        self.assertEqual(failed, local_failed)
+        self.assertEqual(
+            sorted(Path(remote["output_dir"], "predictions.csv").read_text().splitlines()),
+            sorted(Path(local["output_dir"], "predictions.csv").read_text().splitlines()),
+        )
+        self.assertEqual(os.listdir("q/pending") + os.listdir("q/leased") + os.listdir("q/results"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
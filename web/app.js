@@ -16,6 +16,7 @@ const toggleLogBtn = document.getElementById("toggleLogBtn");
 const metricsHintEl = document.getElementById("metricsHint");
 const configInput = document.getElementById("configPath");
 const runBtn = document.getElementById("runBtn");
+const planBtn = document.getElementById("planBtn");
 const refreshBtn = document.getElementById("refreshBtn");
 const runStatusEl = document.getElementById("runStatus");
 const runIdTextEl = document.getElementById("runIdText");
@@ -37,6 +38,9 @@ const cleanupExecuteBtn = document.getElementById("cleanupExecuteBtn");
 const cleanupLogEl = document.getElementById("cleanupLog");
 const reloadReportBtn = document.getElementById("reloadReportBtn");
 const runSummaryEl = document.getElementById("runSummary");
+const taskTimingsHintEl = document.getElementById("taskTimingsHint");
+const taskCategoriesEl = document.getElementById("taskCategories");
+const slowestTasksEl = document.getElementById("slowestTasks");
 const reportTextEl = document.getElementById("reportText");
 const artifactsEl = document.getElementById("artifacts");
 const downloadReportBtn = document.getElementById("downloadReportBtn");
@@ -57,6 +61,7 @@ const state = {
   leaderboardRows: [],
   metricRows: [],
   stabilityRows: [],
+  taskTimings: {},
   selectedSite: "ALL",
   leaderMetric: "avg_MAE",
   segmentFilter: "overall",
@@ -66,6 +71,7 @@ const state = {
     metrics: false,
     failed: false,
     summary_models: false,
+    slowest_tasks: false,
   },
   tableSort: {
     leaderboard: { key: "avg_MAE", dir: "asc" },
@@ -73,6 +79,8 @@ const state = {
     failed: { key: "model_name", dir: "asc" },
     stability: { key: "cv_MAE", dir: "asc" },
     summary_models: { key: "label", dir: "asc" },
+    task_categories: { key: "actual_s", dir: "desc" },
+    slowest_tasks: { key: "actual_s", dir: "desc" },
   },
   lastReportText: "",
 };
@@ -223,6 +231,7 @@ function renderTable(target, rows, opts = {}) {
       state.tableSort[tableKey] = { key: col, dir: nextDir };
       renderCurrentView();
       renderRunSummary(state.lastSummary || {});
+      renderTaskTimings(state.taskTimings);
     });
   });
 
@@ -233,6 +242,7 @@ function renderTable(target, rows, opts = {}) {
         state.tableExpanded[key] = !state.tableExpanded[key];
         renderCurrentView();
         renderRunSummary(state.lastSummary || {});
+        renderTaskTimings(state.taskTimings);
       });
     }
   }
@@ -511,6 +521,47 @@ function renderRunSummary(summary) {
   `;
 }
 
+function renderTaskTimings(payload) {
+  const rows = (payload && payload.rows) || [];
+  const byCategory = (payload && payload.by_category) || {};
+  const categoryRows = Object.entries(byCategory).map(([category, s]) => ({
+    category,
+    tasks: s.tasks,
+    actual_s: s.actual_s,
+    fit_s: s.fit_s,
+    predict_s: s.predict_s,
+    n_fits: s.n_fits,
+    preds_per_s: s.preds_per_s ?? "",
+    mean_queue_wait_s: s.mean_queue_wait_s ?? "",
+    max_peak_rss_mb: s.max_peak_rss_mb ?? "",
+  }));
+  taskTimingsHintEl.textContent = payload && payload.task_count ? `共 ${payload.task_count} 个任务，显示最慢 ${rows.length} 个` : "";
+  if (categoryRows.length === 0) {
+    taskCategoriesEl.innerHTML = '<p class="empty">暂无耗时汇总 (旧运行)。</p>';
+  } else {
+    renderTable(taskCategoriesEl, categoryRows, { key: "task_categories" });
+  }
+  const taskRows = rows.map((r) => ({
+    model_label: r.model_label,
+    site_id: r.site_id,
+    category: r.category ?? "",
+    stage: r.stage,
+    actual_s: r.actual_s ?? "",
+    fit_s: r.fit_s ?? "",
+    predict_s: r.predict_s ?? "",
+    n_fits: r.n_fits ?? "",
+    preds_per_s: r.preds_per_s ?? "",
+    queue_wait_s: r.queue_wait_s ?? "",
+    peak_rss_mb: r.peak_rss_mb ?? "",
+    result_cache: r.result_cache ?? "",
+  }));
+  if (taskRows.length === 0) {
+    slowestTasksEl.innerHTML = '<p class="empty">暂无任务耗时。</p>';
+    return;
+  }
+  renderTable(slowestTasksEl, taskRows, { key: "slowest_tasks", limit: 10 });
+}
+
 function renderReport(text) {
   reportTextEl.textContent = text || "暂无报告，请先运行包含 report.md 的实验。";
 }
@@ -846,6 +897,37 @@ async function runWithConfig(configPath) {
   }
 }
 
+function formatPlan(plan) {
+  const lines = [
+    `实验: ${plan.experiment}`,
+    `站点数: ${plan.n_sites}，模型变体: ${plan.n_model_variants}，任务数: ${plan.n_tasks}（并发 ${plan.max_workers}）`,
+    `预测起点: ${plan.total_origins}，拟合次数: ${plan.total_fits}，预测条数: ${plan.total_predictions}`,
+    `预估耗时: 串行 ${plan.estimated_serial_s}s，并行 ${plan.estimated_wall_s}s（${plan.tasks_with_history}/${plan.n_tasks} 个任务有历史耗时）`,
+    `预估峰值内存: ${plan.estimated_peak_mb} MB（数据集 ${plan.dataset_mb} MB）`,
+    "",
+    "耗时最长的任务:",
+  ];
+  const top = [...(plan.tasks || [])].sort((a, b) => b.expected_s - a.expected_s).slice(0, 10);
+  top.forEach((t) => {
+    lines.push(`  ${t.expected_s}s  ${t.site_id}  ${t.model_label}  (${t.estimate_source})`);
+  });
+  return lines.join("\n");
+}
+
+async function planConfig(configPath) {
+  planBtn.disabled = true;
+  setLog("正在预估运行开销...");
+  try {
+    const path = configPath || configInput.value.trim() || "configs/experiments/model_zoo_smoke.yaml";
+    const data = await fetchJson(`/api/plan?config_path=${encodeURIComponent(path)}`);
+    setLog(formatPlan(data.plan || {}));
+  } catch (err) {
+    setLog(`预估失败: ${err.message}`, true);
+  } finally {
+    planBtn.disabled = false;
+  }
+}
+
 async function waitForTask(taskId, timeoutMs = 6 * 60 * 60 * 1000) {
   const startedAt = Date.now();
   while (true) {
@@ -897,7 +979,17 @@ async function loadRuns() {
 async function loadRunResult(runId) {
   try {
     currentRunId = runId;
-    const [datasetProfileData, failedModelsData, leaderboardPayload, metricsPayload, stabilityPayload, summaryPayload, reportPayload, artifactsPayload] =
+    const [
+      datasetProfileData,
+      failedModelsData,
+      leaderboardPayload,
+      metricsPayload,
+      stabilityPayload,
+      summaryPayload,
+      reportPayload,
+      artifactsPayload,
+      taskTimingsPayload,
+    ] =
       await Promise.all([
         fetchJson(`/api/dataset_profile?run_id=${encodeURIComponent(runId)}`),
         fetchJson(`/api/failed_models?run_id=${encodeURIComponent(runId)}`),
@@ -907,6 +999,7 @@ async function loadRunResult(runId) {
         fetchJson(`/api/run_summary?run_id=${encodeURIComponent(runId)}`),
         fetchJson(`/api/report?run_id=${encodeURIComponent(runId)}`),
         fetchJson(`/api/artifacts?run_id=${encodeURIComponent(runId)}`),
+        fetchJson(`/api/task_timings?run_id=${encodeURIComponent(runId)}&limit=50`),
       ]);
 
     state.leaderboardRows = leaderboardPayload.rows || [];
@@ -914,6 +1007,7 @@ async function loadRunResult(runId) {
     state.stabilityRows = stabilityPayload.rows || [];
     state.lastSummary = summaryPayload.summary || {};
     state.lastReportText = reportPayload.report || "";
+    state.taskTimings = taskTimingsPayload || {};
 
     updateSiteFilter();
     renderCurrentView();
@@ -922,6 +1016,7 @@ async function loadRunResult(runId) {
     renderRunSummary(summaryPayload.summary || {});
     renderReport(reportPayload.report || "");
     renderArtifacts(artifactsPayload.artifacts || []);
+    renderTaskTimings(state.taskTimings);
 
     renderRuns((await fetchJson("/api/runs")).runs || []);
     setStatus("ready", runId);
@@ -971,6 +1066,10 @@ runBtn.addEventListener("click", async () => {
   await runWithConfig(configInput.value.trim());
 });
 
+planBtn.addEventListener("click", async () => {
+  await planConfig(configInput.value.trim());
+});
+
 refreshBtn.addEventListener("click", loadRuns);
 
 reloadConfigsBtn.addEventListener("click", loadConfigs);